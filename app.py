@@ -1,21 +1,45 @@
+from src import startup
 import os
 import sys
-from flask import Flask, render_template, request, jsonify, redirect, url_for, make_response
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, make_response
 from flask_wtf.csrf import CSRFProtect
+startup.mark("flask")
 
 from src.utils import resource_path
 from src.config import Config
-from src.auth.utils import login_required, get_current_user, role_required
+startup.mark("config")
+from src.auth.utils import login_required, get_current_user, role_required, get_request_token, invalidate_session
 from src.SupaClient import get_supabase
 from src.api import api
-from flaskwebgui import FlaskUI
+startup.mark("api")
+from src.json_provider import init_json_provider
+from src.compression import init_compression
+from src.metrics import init_metrics, registry
+from src.profiling import init_profiling
+from src.replica import start_replica
+from src.journal import get_journal
 
 app = Flask(__name__, template_folder=resource_path('templates'), static_folder=resource_path('static'))
 app.config.from_object(Config)
+init_json_provider(app, Config.JSON_PROVIDER)
+if Config.METRICS_ENABLED:
+    init_metrics(app, server_timing_header=Config.SERVER_TIMING)
+init_compression(app, Config.COMPRESS_MIN_SIZE, Config.GZIP_LEVEL, Config.BROTLI_QUALITY)
+init_profiling(app, Config.PROFILE_SAMPLE_RATE)
 csrf = CSRFProtect(app)
 app.register_blueprint(api)
 csrf.exempt(api)
 
+if Config.LOCAL_REPLICA == "on":
+    start_replica()
+if Config.SAVE_MODE == "journal":
+    get_journal()  # drain saves left over from a previous run
+startup.mark("app setup")
+
+@app.before_request
+def first_request():
+    startup.first_request(Config.STARTUP_REPORT, os.path.join(Config.DATA_DIR, "startup_times.jsonl"))
+
 @app.route("/rfq-entry")
 @role_required("admin", "sales", "pricing")
 def rfq(user):
@@ -48,6 +72,14 @@ def admin(user):
     user_name = user.email.split('@')[0] if user.email else 'User'
     return render_template("admin.html", user_name=user_name)
 
+@app.route("/metrics")
+@role_required("admin")
+def metrics(user):
+    # Prometheus scrapes with an admin access token: Authorization: Bearer <token>
+    if not Config.METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route("/report")
 @role_required("admin", "pricing")
 def report(user):
@@ -60,6 +92,7 @@ def report(user):
 def logout(user):
     supabase = get_supabase()
     supabase.auth.sign_out()
+    invalidate_session(get_request_token())
     
     response = make_response(redirect(url_for('login')))
     response.set_cookie('access_token', '', expires=0)
@@ -74,4 +107,8 @@ def rfq_list(user):
     return render_template("rfqList.html", user=user, role=role, user_name=user_name)
 
 if __name__ == "__main__":
+    if Config.LOCAL_REPLICA == "desktop":
+        start_replica()
+    from flaskwebgui import FlaskUI
+    startup.mark("window")
     FlaskUI(app=app, server="flask", width=800, height=600).run()
@@ -0,0 +1,75 @@
+"""Synthetic RFQ data shaped like list-rfq-entry rows (RFQ-Tracker + Part_details)."""
+import random
+from datetime import datetime, timedelta
+
+COMPANIES = ["Acme Components", "Globex Electronics", "Initech Systems", "Umbrella Devices",
+             "Stark Industries", "Wayne Microsystems", "Tyrell Semiconductors", "Cyberdyne Labs"]
+SALES = ["asha", "ravi", "meera", "john", "kim"]
+PURPOSES = ["Bidding", "Buying", "Budgetary"]
+MAKES = ["TI", "ADI", "ST", "NXP", "Microchip", "Infineon"]
+CITIES = ["Bengaluru", "Pune", "Chennai", "Hyderabad", "Mumbai"]
+
+
+def make_rfqs(n, parts_per_rfq=(1, 6), seed=42):
+    """Returns `n` RFQ rows with embedded Part_details, ids from 1."""
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rfqs, part_id = [], 0
+    for rfq_id in range(1, n + 1):
+        created = start + timedelta(minutes=rnd.randint(0, 60 * 24 * 700))
+        company = rnd.choice(COMPANIES)
+        rfq = {
+            "id": rfq_id,
+            "created_at": created.isoformat() + "+00:00",
+            "updated_at": created.isoformat() + "+00:00",
+            "created_by": None,
+            "RFQ-no": f"RFQ-{created:%y%m}-{rfq_id:06d}",
+            "Company_name": company,
+            "Sales_person": rnd.choice(SALES),
+            "Customer_name": f"Buyer {rnd.randint(1, 900)}",
+            "Customer_email": f"buyer{rnd.randint(1, 900)}@{company.split()[0].lower()}.com",
+            "Customer_phone": f"+91 9{rnd.randint(100000000, 999999999)}",
+            "Customer_address_1": f"{rnd.randint(1, 300)} Industrial Area",
+            "Customer_address_2": None,
+            "Customer_city": rnd.choice(CITIES),
+            "Customer_state": "KA",
+            "Customer_pincode": str(rnd.randint(560001, 560100)),
+            "Customer_country": "India",
+            "RFQ_purpose": rnd.choice(PURPOSES),
+            "Tentative_date": (created + timedelta(days=rnd.randint(5, 60))).date().isoformat(),
+            "Part_details": [],
+        }
+        for _ in range(rnd.randint(*parts_per_rfq)):
+            part_id += 1
+            usd = round(rnd.uniform(0.05, 80), 4)
+            fx = round(rnd.uniform(82, 93), 2)
+            qty = rnd.choice([10, 50, 100, 250, 1000, 5000])
+            rfq["Part_details"].append({
+                "id": part_id,
+                "rfq_id": rfq_id,
+                "created_at": rfq["created_at"],
+                "updated_at": rfq["updated_at"],
+                "RFQ-part-no": f"{rnd.choice(['LM', 'TPS', 'STM32F', 'ATMEGA', 'AD'])}{rnd.randint(100, 9999)}",
+                "Quoted-part-no": None if rnd.random() < 0.3 else f"Q{rnd.randint(1000, 9999)}",
+                "Supplier": rnd.choice(["Mouser", "Digikey", "Arrow", "Avnet", None]),
+                "Date Code": None if rnd.random() < 0.5 else f"{rnd.randint(18, 25)}+",
+                "RFQ Qty": qty,
+                "Quoted Qty": qty,
+                "Make": rnd.choice(MAKES),
+                "Lead": f"{rnd.randint(1, 16)} weeks",
+                "Source": rnd.choice(["Import", "Local"]),
+                "Unit$": usd,
+                "Unit₹": round(usd * fx, 2),
+                "Exchange_rate": fx,
+                "Freight": round(rnd.uniform(0, 50), 2),
+                "Insurance": round(usd * fx * 0.01125, 2),
+                "BCD": round(usd * fx * 0.165, 2),
+                "Bank": round(10 * fx / qty, 2),
+                "Clearance": round(6500 / qty, 2),
+                "Margin": round(usd * fx * 0.15, 2),
+                "Resale": round(usd * fx * 1.4, 2),
+                "TP": str(round(usd * fx * 1.45, 2)),
+                "Remarks": None if rnd.random() < 0.7 else "Alt part offered",
+            })
+        rfqs.append(rfq)
+    return rfqs
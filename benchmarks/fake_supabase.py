@@ -0,0 +1,578 @@
+"""In-process stand-in for the Supabase client, for benchmarks.
+
+Implements the subset of the supabase-py / postgrest-py API the app uses:
+table().select/insert/upsert/update/delete with eq, neq, gt/gte/lt/lte,
+is_, in_, filter, or_ (PostgREST logic trees), order, limit, range,
+maybe_single, count="exact", embedded relations (`Part_details(*)`,
+`Part_details(count)`), rpc("sync_part_details") and the auth calls made by
+src/auth/utils.py and src/api.py. Every execute() can sleep for an injected
+latency to stand in for the network.
+
+Primary keys, the Part_details.rfq_id foreign key and sorted orders are
+indexed so 100k-RFQ datasets measure the app rather than the fake.
+"""
+import itertools
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# (parent table, embedded table) -> (parent key, child foreign key)
+RELATIONS = {("RFQ-Tracker", "Part_details"): ("id", "rfq_id")}
+FOREIGN_KEYS = {"Part_details": "rfq_id"}
+
+
+class APIError(Exception):
+    pass
+
+
+class Response:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def split_top(text, sep=","):
+    """Splits on `sep` outside parentheses and double quotes."""
+    out, depth, current, quoted = [], 0, [], False
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            out.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        out.append("".join(current).strip())
+    return out
+
+
+def unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _compare(a, b):
+    if a is None or b is None:
+        return None
+    if isinstance(a, (int, float)) and not isinstance(a, bool):
+        try:
+            b = float(b)
+        except (TypeError, ValueError):
+            a = str(a)
+    else:
+        a, b = str(a), str(b)
+    return (a > b) - (a < b)
+
+
+def match(row, column, op, value):
+    x = row.get(column)
+    if op == "is":
+        return x is None if value in ("null", None) else x == value
+    if op == "in":
+        return x in value or str(x) in {str(v) for v in value}
+    if op == "eq":
+        return x is not None and _compare(x, value) == 0
+    if op == "neq":
+        return x is not None and _compare(x, value) != 0
+    c = _compare(x, value)
+    if c is None:
+        return False
+    return {"lt": c < 0, "lte": c <= 0, "gt": c > 0, "gte": c >= 0}[op]
+
+
+def compile_tree(expr):
+    """Compiles an or_() expression such as 'a.lt.1,and(b.eq.2,c.gt.3)' into a
+    predicate, once per query rather than once per row."""
+    items = [_compile_item(item) for item in split_top(expr)]
+    return lambda row: any(test(row) for test in items)
+
+
+def _compile_item(item):
+    if item.startswith("and(") and item.endswith(")"):
+        tests = [_compile_item(sub) for sub in split_top(item[4:-1])]
+        return lambda row: all(test(row) for test in tests)
+    if item.startswith("or(") and item.endswith(")"):
+        return compile_tree(item[3:-1])
+    if item.startswith('"'):
+        end = item.index('"', 1)
+        column, rest = item[:end + 1], item[end + 2:]
+    else:
+        column, rest = item.split(".", 1)
+    op, value = rest.split(".", 1)
+    column, value = unquote(column), unquote(value)
+    return lambda row: match(row, column, op, value)
+
+
+class Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.columns = "*"
+        self.count = None
+        self.head = False
+        self.filters = []     # ("cmp", column, op, value) | ("or", predicate)
+        self.orders = []
+        self._limit = None
+        self._offset = 0
+        self.payload = None
+        self.single = False
+
+    # --- builders ---
+
+    def select(self, *columns, count=None, head=None):
+        if self.op == "select":
+            self.columns = ",".join(columns) or "*"
+        self.count = count
+        self.head = bool(head)
+        return self
+
+    def insert(self, data, **kwargs):
+        self.op, self.payload = "insert", data
+        return self
+
+    def upsert(self, data, on_conflict="id", **kwargs):
+        self.op, self.payload = "upsert", data
+        return self
+
+    def update(self, data, **kwargs):
+        self.op, self.payload = "update", data
+        return self
+
+    def delete(self, **kwargs):
+        self.op = "delete"
+        return self
+
+    def _cmp(self, column, op, value):
+        self.filters.append(("cmp", unquote(column), op, value))
+        return self
+
+    def eq(self, column, value):
+        return self._cmp(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._cmp(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._cmp(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._cmp(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._cmp(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._cmp(column, "lte", value)
+
+    def is_(self, column, value):
+        return self._cmp(column, "is", value)
+
+    def in_(self, column, values):
+        return self._cmp(column, "in", list(values))
+
+    def filter(self, column, op, value):
+        return self._cmp(column, op, value)
+
+    def or_(self, expr, reference_table=None):
+        self.filters.append(("or", compile_tree(expr)))
+        return self
+
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        if foreign_table is None:
+            self.orders.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, n, foreign_table=None):
+        if foreign_table is None:
+            self._limit = n
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def maybe_single(self):
+        self.single, self._limit = True, 1
+        return self
+
+    # --- execution ---
+
+    def _matches(self, row):
+        for f in self.filters:
+            if f[0] == "cmp":
+                if not match(row, f[1], f[2], f[3]):
+                    return False
+            elif not f[1](row):
+                return False
+        return True
+
+    def _candidates(self):
+        """Rows that may match, narrowed by a primary/foreign key filter when there is one."""
+        rows = self.db.tables.setdefault(self.table, {})
+        fk = FOREIGN_KEYS.get(self.table)
+        for f in self.filters:
+            if f[0] != "cmp" or f[2] not in ("eq", "in"):
+                continue
+            keys = f[3] if f[2] == "in" else [f[3]]
+            if f[1] == "id":
+                return [rows[k] for k in (_as_id(k) for k in keys) if k in rows]
+            if f[1] == fk:
+                index = self.db.children(self.table, fk)
+                return [row for k in keys for row in index.get(_as_id(k), {}).values()]
+        return None
+
+    def _rows(self):
+        candidates = self._candidates()
+        if self.orders:
+            ordered = self.db.sorted_rows(self.table, tuple(self.orders))
+            if candidates is not None:
+                wanted = {id(row) for row in candidates}
+                ordered = [row for row in ordered if id(row) in wanted]
+        else:
+            ordered = candidates if candidates is not None else list(self.db.tables[self.table].values())
+
+        if not self.filters:
+            total = len(ordered)
+            end = None if self._limit is None else self._offset + self._limit
+            return ordered[self._offset:end], total
+
+        need = None if self.count or self._limit is None else self._offset + self._limit
+        matched = []
+        for row in ordered:
+            if self._matches(row):
+                matched.append(row)
+                if need is not None and len(matched) >= need:
+                    break
+        end = None if self._limit is None else self._offset + self._limit
+        return matched[self._offset:end], len(matched)
+
+    def _project(self, row, columns=None):
+        out = {}
+        for column in split_top(columns or self.columns):
+            embedded = re.match(r'^([\w-]+)\((.*)\)$', column, re.S)
+            if embedded:
+                relation, inner = embedded.group(1), embedded.group(2).strip()
+                parent_key, fk = RELATIONS[(self.table, relation)]
+                children = sorted(self.db.children(relation, fk).get(row.get(parent_key), {}).values(),
+                                  key=lambda r: r["id"])
+                if inner == "count":
+                    out[relation] = [{"count": len(children)}]
+                else:
+                    sub = Query(self.db, relation)
+                    out[relation] = [sub._project(child, inner) for child in children]
+            elif column == "*":
+                out.update(row)
+            else:
+                name = unquote(column)
+                if name not in row and name not in self.db.known_columns(self.table):
+                    raise APIError(f"column {self.table}.{name} does not exist")
+                out[name] = row.get(name)
+        return out
+
+    def execute(self):
+        self.db.wait()
+        with self.db.lock:
+            return self._execute()
+
+    def _execute(self):
+        if self.op == "select":
+            rows, total = self._rows()
+            data = [] if self.head else [self._project(row) for row in rows]
+            count = total if self.count else None
+            if self.single:
+                return Response(data[0], count) if data else None
+            return Response(data, count)
+
+        table = self.db.tables.setdefault(self.table, {})
+        if self.op in ("insert", "upsert"):
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            out, added = [], []
+            try:
+                for record in payload:
+                    record = dict(record)
+                    if self.op == "upsert" and record.get("id") in table:
+                        out.append(self.db.write(self.table, table[record["id"]], record))
+                    else:
+                        out.append(self.db.add(self.table, record))
+                        added.append(out[-1]["id"])
+            except Exception:
+                # One statement: a failing row undoes the rows inserted before it
+                for row_id in added:
+                    self.db.remove(self.table, row_id)
+                raise
+            return Response(out)
+
+        rows = [row for row in (self._candidates() or table.values()) if self._matches(row)]
+        if self.op == "update":
+            return Response([self.db.write(self.table, row, self.payload) for row in rows])
+        for row in rows:
+            self.db.remove(self.table, row["id"])
+        return Response([dict(row) for row in rows])
+
+
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class _RPC:
+    def __init__(self, db, name, params):
+        self.db, self.name, self.params = db, name, params
+
+    def execute(self):
+        fn = self.db.rpcs.get(self.name)
+        if fn is None:
+            raise APIError(f"PGRST202 Could not find the function public.{self.name}")
+        self.db.wait()
+        with self.db.lock:
+            return Response(fn(self.db, self.params))
+
+
+def _sync_part_details(db, params):
+    """Mirror of sql/sync_part_details.sql."""
+    for part_id in params.get("p_delete_ids") or []:
+        db.remove("Part_details", part_id)
+    rows = db.tables["Part_details"]
+    for update in params.get("p_updates") or []:
+        if update["id"] in rows:
+            db.write("Part_details", rows[update["id"]], update)
+    for insert in params.get("p_inserts") or []:
+        db.add("Part_details", dict(insert, rfq_id=params["p_rfq_id"]))
+    return None
+
+
+# --- auth ---
+
+class _User:
+    def __init__(self, id, email):
+        self.id, self.email = id, email
+
+
+class _Session:
+    def __init__(self, access_token):
+        self.access_token = access_token
+
+
+class _AuthResponse:
+    def __init__(self, user, session=None):
+        self.user, self.session = user, session
+
+
+class _AuthAdmin:
+    def __init__(self, db):
+        self.db = db
+
+    def list_users(self, page=None, per_page=None):
+        self.db.wait()
+        users = [_User(uid, email) for uid, email in self.db.users.items()]
+        per_page = per_page or 50
+        page = page or 1
+        return users[(page - 1) * per_page:page * per_page]
+
+    def create_user(self, attributes):
+        self.db.wait()
+        if attributes["email"] in self.db.users.values():
+            raise APIError("A user with this email address has already been registered")
+        uid = self.db.add_user(attributes["email"])
+        return _AuthResponse(_User(uid, attributes["email"]))
+
+
+class _Auth:
+    def __init__(self, db):
+        self.db = db
+        self.admin = _AuthAdmin(db)
+
+    def get_user(self, token):
+        self.db.wait()
+        uid = self.db.tokens.get(token)
+        return _AuthResponse(_User(uid, self.db.users[uid])) if uid else None
+
+    def sign_in_with_password(self, credentials):
+        self.db.wait()
+        for uid, email in self.db.users.items():
+            if email == credentials["email"]:
+                return _AuthResponse(_User(uid, email), _Session(self.db.issue_token(uid)))
+        raise APIError("Invalid login credentials")
+
+    def sign_up(self, credentials):
+        uid = self.db.add_user(credentials["email"])
+        return _AuthResponse(_User(uid, credentials["email"]), _Session(self.db.issue_token(uid)))
+
+    def sign_out(self):
+        pass
+
+
+class FakeSupabase:
+    """The fake client. Shared by every request; one lock serialises data access."""
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=0):
+        self.tables = {"RFQ-Tracker": {}, "Part_details": {}, "profiles": {}}
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self.lock = threading.RLock()
+        self.rpcs = {"sync_part_details": _sync_part_details}
+        self.users = {}
+        self.tokens = {}
+        self.auth = _Auth(self)
+        self._ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._clock = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self._versions = {}
+        self._sorted = {}
+        self._children = {}
+        self._columns = {}
+
+    # --- client API ---
+
+    def table(self, name):
+        return Query(self, name)
+
+    def rpc(self, name, params=None):
+        return _RPC(self, name, params or {})
+
+    def wait(self):
+        self.calls += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    # --- storage ---
+
+    def now(self):
+        # Strictly increasing, and close to the wall clock like the database's now()
+        self._clock = max(self._clock + timedelta(milliseconds=1), datetime.now(timezone.utc))
+        return self._clock.isoformat()
+
+    def _touch(self, table):
+        self._versions[table] = self._versions.get(table, 0) + 1
+
+    def known_columns(self, table):
+        if table not in self._columns:
+            columns = set()
+            for row in itertools.islice(self.tables.get(table, {}).values(), 100):
+                columns.update(row)
+            self._columns[table] = columns
+        return self._columns[table]
+
+    def add(self, table, record):
+        record.setdefault("id", next(self._ids))
+        stamp = self.now()
+        record.setdefault("created_at", stamp)
+        record["updated_at"] = stamp
+        self.tables.setdefault(table, {})[record["id"]] = record
+        fk = FOREIGN_KEYS.get(table)
+        if fk and (table, fk) in self._children:
+            self._children[(table, fk)].setdefault(record.get(fk), {})[record["id"]] = record
+        self._touch(table)
+        return dict(record)
+
+    def write(self, table, row, values):
+        fk = FOREIGN_KEYS.get(table)
+        old_parent = row.get(fk) if fk else None
+        row.update({k: v for k, v in values.items() if k != "id"})
+        row["updated_at"] = self.now()
+        if fk and row.get(fk) != old_parent and (table, fk) in self._children:
+            index = self._children[(table, fk)]
+            index.get(old_parent, {}).pop(row["id"], None)
+            index.setdefault(row.get(fk), {})[row["id"]] = row
+        self._touch(table)
+        return dict(row)
+
+    def remove(self, table, row_id):
+        row = self.tables.get(table, {}).pop(row_id, None)
+        if row is None:
+            return
+        fk = FOREIGN_KEYS.get(table)
+        if fk and (table, fk) in self._children:
+            self._children[(table, fk)].get(row.get(fk), {}).pop(row_id, None)
+        if table == "RFQ-Tracker":
+            # ON DELETE CASCADE, and the tombstone trigger from sql/rfq_tombstones.sql
+            for part_id in list(self.children("Part_details", "rfq_id").get(row_id, {})):
+                self.remove("Part_details", part_id)
+            self.tables.setdefault("rfq_tombstones", {})[row_id] = {"rfq_id": row_id, "deleted_at": self.now()}
+            self._touch("rfq_tombstones")
+        self._touch(table)
+
+    def children(self, table, fk):
+        key = (table, fk)
+        if key not in self._children:
+            index = {}
+            for row in self.tables.get(table, {}).values():
+                index.setdefault(row.get(fk), {})[row["id"]] = row
+            self._children[key] = index
+        return self._children[key]
+
+    def sorted_rows(self, table, orders):
+        """Rows of `table` in `orders`, cached until the table changes."""
+        key = (table, orders)
+        version = self._versions.get(table, 0)
+        cached = self._sorted.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        rows = list(self.tables.get(table, {}).values())
+        for column, desc, nullsfirst in reversed(orders):
+            nulls = [r for r in rows if r.get(column) is None]
+            values = sorted((r for r in rows if r.get(column) is not None), key=lambda r: r[column], reverse=desc)
+            first = nullsfirst if nullsfirst is not None else desc
+            rows = nulls + values if first else values + nulls
+        self._sorted[key] = (version, rows)
+        return rows
+
+    # --- auth data ---
+
+    def add_user(self, email, role=None):
+        uid = f"user-{next(self._ids)}"
+        self.users[uid] = email
+        if role:
+            self.add("profiles", {"user_id": uid, "role": role, "first_name": email.split("@")[0], "last_name": ""})
+        return uid
+
+    def issue_token(self, uid):
+        token = f"token-{uid}-{len(self.tokens)}"
+        self.tokens[token] = uid
+        return token
+
+    # --- loading ---
+
+    def load_rfqs(self, rfqs):
+        """Loads rows shaped like benchmarks.datasets.make_rfqs() output."""
+        rfq_table, part_table = self.tables["RFQ-Tracker"], self.tables["Part_details"]
+        top, latest = 0, ""
+        for rfq in rfqs:
+            parts = rfq.get("Part_details") or []
+            header = {k: v for k, v in rfq.items() if k != "Part_details"}
+            rfq_table[header["id"]] = header
+            for part in parts:
+                part_table[part["id"]] = dict(part)
+                top = max(top, part["id"])
+                latest = max(latest, part.get("updated_at") or "")
+            top = max(top, header["id"])
+            latest = max(latest, header.get("updated_at") or header.get("created_at") or "")
+        self._ids = itertools.count(top + 1)
+        if latest:
+            # Writes during the run must sort after the loaded rows (updated_at cursors)
+            self._clock = max(self._clock, datetime.fromisoformat(latest))
+        self._children.clear()
+        self._columns.clear()
+        self._touch("RFQ-Tracker")
+        self._touch("Part_details")
+
+
+def install(fake):
+    """Makes every get_supabase()/get_supabase_admin() in the app return `fake`."""
+    import src.SupaClient as supa_client
+    supa_client.create_supabase = lambda: fake
+    return fake
@@ -0,0 +1,75 @@
+"""Serialisation time and bytes on the wire for a list-rfq-entry payload.
+
+Compares Flask's stdlib provider with the orjson provider, then gzip and
+brotli at the levels the app uses, on a synthetic dataset:
+
+    python benchmarks/json_compression.py --rfqs 10000 [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from benchmarks.datasets import make_rfqs  # noqa: E402
+from src.json_provider import OrjsonProvider, orjson  # noqa: E402
+from src.compression import brotli, compress  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def run(n_rfqs, repeat):
+    payload = {"success": True, "data": make_rfqs(n_rfqs), "next_cursor": None}
+    app = Flask(__name__)
+    providers = [("stdlib", app.json)]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider(app)))
+
+    results = {"rfqs": n_rfqs, "parts": sum(len(r["Part_details"]) for r in payload["data"]),
+               "serialise": [], "compress": []}
+    body = None
+    with app.app_context():
+        for name, provider in providers:
+            response, ms = timed(lambda: provider.response(payload), repeat)
+            body = response.get_data()
+            results["serialise"].append({"provider": name, "median_ms": round(ms, 2), "bytes": len(body)})
+
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    for encoding in encodings:
+        data, ms = timed(lambda: compress(body, encoding), repeat)
+        results["compress"].append({"encoding": encoding, "median_ms": round(ms, 2), "bytes": len(data),
+                                    "ratio": round(len(body) / len(data), 1)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rfqs", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rfqs, args.repeat)
+    print(f"{results['rfqs']} RFQs / {results['parts']} part lines")
+    for row in results["serialise"]:
+        print(f"  {row['provider']:<8} {row['median_ms']:>9.1f} ms  {row['bytes']:>12,} bytes")
+    for row in results["compress"]:
+        print(f"  +{row['encoding']:<7} {row['median_ms']:>9.1f} ms  {row['bytes']:>12,} bytes  ({row['ratio']}x)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
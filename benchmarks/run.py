@@ -0,0 +1,264 @@
+"""HTTP benchmark for the API against the in-process Supabase fake.
+
+For each dataset size, loads synthetic RFQs into the fake, drives every
+scenario through Flask's test client from `--concurrency` threads and
+reports p50/p99 latency, throughput, peak traced memory and upstream
+calls per request. Results are written as JSON; pass `--compare` with an
+earlier file to print the change per scenario.
+
+    python benchmarks/run.py --sizes 1000,10000 --requests 200 --latency-ms 20 \\
+        --out bench.json [--compare baseline.json] [--only list,get]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The app refuses to import without credentials; nothing is sent anywhere
+os.environ.setdefault("SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("LOCAL_REPLICA", "off")
+
+from benchmarks.datasets import make_rfqs  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, install  # noqa: E402
+
+TOKEN_COOKIE = "access_token"
+
+
+class Scenario:
+    def __init__(self, name, method, path, body=None, headers=None, weight=1.0):
+        self.name = name
+        self.method = method
+        self.path = path            # str or callable(rnd) -> str
+        self.body = body            # None, dict or callable(rnd) -> dict
+        self.headers = headers or {}
+        self.weight = weight        # fraction of --requests to run (exports are heavy)
+
+    def request(self, client, rnd):
+        path = self.path(rnd) if callable(self.path) else self.path
+        body = self.body(rnd) if callable(self.body) else self.body
+        headers = self.headers(rnd) if callable(self.headers) else self.headers
+        return client.open(path, method=self.method, json=body, headers=headers)
+
+
+def build_scenarios(app, fake, token, rfq_ids, part_numbers):
+    client = app.test_client()
+    client.set_cookie(TOKEN_COOKIE, token)
+    # Values that depend on a warmed-up server: a deep cursor and an ETag
+    cursor = None
+    for _ in range(10):
+        page = client.get(f"/api/list-rfq-entry?limit=50{'&cursor=' + cursor if cursor else ''}").get_json()
+        cursor = page.get("next_cursor") or cursor
+    etag = client.get("/api/list-rfq-entry?limit=50").headers.get("ETag", "")
+
+    def edit_payload(rnd):
+        rfq = fake.tables["RFQ-Tracker"][rnd.choice(rfq_ids)]
+        parts = sorted(fake.children("Part_details", "rfq_id").get(rfq["id"], {}).values(), key=lambda p: p["id"])
+        items = [{"id": p["id"], "rfq_part_no": p["RFQ-part-no"], "rfq_qty": p["RFQ Qty"],
+                  "quoted_qty": p["Quoted Qty"], "make": p["Make"], "lead_time": p["Lead"],
+                  "source": p["Source"], "unit_price_usd": p["Unit$"], "exchange_rate": p["Exchange_rate"],
+                  "remarks": f"bench {rnd.random():.6f}"} for p in parts]
+        return {"id": rfq["id"], "rfq_no": rfq["RFQ-no"], "company_name": rfq["Company_name"],
+                "sales_person": rfq["Sales_person"], "rfq_purpose": rfq["RFQ_purpose"], "items": items}
+
+    return [
+        Scenario("list", "GET", "/api/list-rfq-entry?limit=50"),
+        Scenario("list_deep_page", "GET", f"/api/list-rfq-entry?limit=50&cursor={cursor}"),
+        Scenario("list_fields", "GET", "/api/list-rfq-entry?limit=50&fields=RFQ-no,Company_name,Part_details.RFQ-part-no"),
+        Scenario("list_304", "GET", "/api/list-rfq-entry?limit=50", headers={"If-None-Match": etag}),
+        Scenario("get", "GET", lambda rnd: f"/api/get-rfq/{rnd.choice(rfq_ids)}"),
+        Scenario("search", "GET", lambda rnd: f"/api/search-rfq?q={rnd.choice(part_numbers)[:5]}"),
+        Scenario("report", "GET", "/api/report-summary"),
+        Scenario("price_items", "POST", "/api/price-items",
+                 body=lambda rnd: {"rfq_ids": rnd.sample(rfq_ids, min(20, len(rfq_ids)))}),
+        Scenario("list_users", "GET", "/api/list-users"),
+        Scenario("save", "POST", "/api/make-rfq-entry", body=edit_payload),
+        Scenario("export_csv", "GET", "/api/export?format=csv", weight=0.02),
+    ]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_scenario(app, token, scenario, requests, concurrency, seed):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+            client.set_cookie(TOKEN_COOKIE, token)
+        rnd = random.Random(seed * 100003 + i)
+        start = time.perf_counter()
+        response = scenario.request(client, rnd)
+        response.get_data()  # drain streamed bodies
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    return latencies, errors, wall
+
+
+def measure_memory(app, token, scenario, seed):
+    """Peak traced memory of a single request (kept out of the timed runs)."""
+    client = app.test_client()
+    client.set_cookie(TOKEN_COOKIE, token)
+    tracemalloc.start()
+    try:
+        scenario.request(client, random.Random(seed)).get_data()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_size(size, args):
+    fake = FakeSupabase(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, seed=size)
+    install(fake)
+    import app as app_module
+    from src.auth import utils as auth_utils
+    from src.search import search_index
+    from src.reports import report_rollups
+    from src.etag import data_version
+    from src.directory import invalidate_directory
+
+    # Fresh in-process state for each dataset
+    auth_utils._session_cache.clear()
+    auth_utils._role_cache.clear()
+    search_index._built_at = None
+    report_rollups._built_at = None
+    data_version.bump()
+    invalidate_directory()
+
+    started = time.perf_counter()
+    rfqs = make_rfqs(size, seed=size)
+    part_numbers = [p["RFQ-part-no"] for r in rfqs[:2000] for p in r["Part_details"]]
+    fake.load_rfqs(rfqs)
+    del rfqs
+    uid = fake.add_user("bench@example.com", role=args.role)
+    for i in range(args.users):
+        fake.add_user(f"user{i}@example.com", role="sales")
+    token = fake.issue_token(uid)
+    load_seconds = time.perf_counter() - started
+
+    app = app_module.app
+    rfq_ids = list(fake.tables["RFQ-Tracker"])
+    scenarios = build_scenarios(app, fake, token, rfq_ids, part_numbers)
+    if args.only:
+        scenarios = [s for s in scenarios if s.name in args.only]
+
+    results = []
+    for scenario in scenarios:
+        requests = max(1, int(args.requests * scenario.weight))
+        # Warm-up builds lazy indexes and caches outside the measurement
+        run_scenario(app, token, scenario, min(requests, 3), 1, seed=1)
+        calls_before = fake.calls
+        latencies, errors, wall = run_scenario(app, token, scenario, requests, args.concurrency, seed=2)
+        calls = fake.calls - calls_before
+        peak = measure_memory(app, token, scenario, seed=3) if not args.no_memory else None
+        result = {
+            "size": size,
+            "scenario": scenario.name,
+            "requests": requests,
+            "errors": len(errors),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "rps": round(requests / wall, 1),
+            "upstream_calls_per_request": round(calls / requests, 2),
+            "peak_kib": round(peak / 1024, 1) if peak is not None else None,
+        }
+        results.append(result)
+        print(f"{size:>7} {scenario.name:<16} p50 {result['p50_ms']:>9.2f} ms  p99 {result['p99_ms']:>9.2f} ms  "
+              f"{result['rps']:>8.1f} req/s  {result['upstream_calls_per_request']:>5} calls/req  "
+              f"peak {result['peak_kib'] or 0:>9.1f} KiB" + (f"  {len(errors)} errors" if errors else ""))
+    return {"size": size, "load_seconds": round(load_seconds, 2), "results": results}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["size"], r["scenario"]): r for run in baseline["runs"] for r in run["results"]}
+    print(f"\nchange vs {baseline_path} ({baseline['meta'].get('revision')}):")
+    for run in current["runs"]:
+        for r in run["results"]:
+            old = before.get((r["size"], r["scenario"]))
+            if not old:
+                continue
+            delta = (r["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+            flag = "  <-- slower" if delta > 10 else ""
+            print(f"{r['size']:>7} {r['scenario']:<16} p50 {old['p50_ms']:>9.2f} -> {r['p50_ms']:>9.2f} ms "
+                  f"({delta:+.1f}%)  p99 {old['p99_ms']:>9.2f} -> {r['p99_ms']:>9.2f} ms{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated RFQ counts (default: 1000,10000,100000)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected latency per upstream call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra random latency, 0..jitter")
+    parser.add_argument("--role", default="admin", choices=("admin", "pricing", "sales"))
+    parser.add_argument("--users", type=int, default=200, help="extra accounts for list-users")
+    parser.add_argument("--only", type=lambda s: set(s.split(",")), help="comma-separated scenario names")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "role": args.role,
+            "requests": args.requests,
+        },
+        "runs": [],
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        report["runs"].append(run_size(size, args))
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {args.out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
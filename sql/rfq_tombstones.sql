@@ -0,0 +1,29 @@
+-- Tombstones behind the RFQ change feed (src/changes.py, /api/rfq-changes).
+-- Run once in the Supabase SQL editor, after sql/updated_at.sql. Without it
+-- the feed still reports new and edited RFQs, but not deletions.
+
+create table if not exists rfq_tombstones (
+  rfq_id bigint primary key,
+  deleted_at timestamptz not null default now()
+);
+
+create index if not exists rfq_tombstones_deleted_at_idx on rfq_tombstones (deleted_at);
+
+create or replace function record_rfq_tombstone()
+returns trigger
+language plpgsql
+as $$
+begin
+  insert into rfq_tombstones (rfq_id, deleted_at) values (old.id, now())
+  on conflict (rfq_id) do update set deleted_at = excluded.deleted_at;
+  return null;
+end;
+$$;
+
+drop trigger if exists rfq_tracker_tombstone on "RFQ-Tracker";
+create trigger rfq_tracker_tombstone
+  after delete on "RFQ-Tracker"
+  for each row execute function record_rfq_tombstone();
+
+-- Clients more than 30 days behind reload the whole list instead; prune with e.g.
+--   delete from rfq_tombstones where deleted_at < now() - interval '30 days';
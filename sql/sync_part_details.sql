@@ -0,0 +1,55 @@
+-- Applies a Part_details diff computed by make_entry (src/parts.py) in one call.
+-- Run once in the Supabase SQL editor. The API falls back to batched
+-- insert/upsert/delete requests when this function is missing.
+
+create or replace function sync_part_details(
+    p_rfq_id bigint,
+    p_inserts jsonb default '[]',
+    p_updates jsonb default '[]',
+    p_delete_ids bigint[] default '{}'
+) returns jsonb
+language plpgsql
+as $$
+declare
+    v_inserted int;
+    v_updated int;
+    v_deleted int;
+begin
+    delete from "Part_details"
+    where rfq_id = p_rfq_id and id = any(p_delete_ids);
+    get diagnostics v_deleted = row_count;
+
+    update "Part_details" p set
+        "RFQ-part-no" = r."RFQ-part-no",
+        "Quoted-part-no" = r."Quoted-part-no",
+        "Supplier" = r."Supplier",
+        "Date Code" = r."Date Code",
+        "RFQ Qty" = r."RFQ Qty",
+        "Quoted Qty" = r."Quoted Qty",
+        "Make" = r."Make",
+        "Lead" = r."Lead",
+        "Source" = r."Source",
+        "Unit$" = r."Unit$",
+        "Unit₹" = r."Unit₹",
+        "Freight" = r."Freight",
+        "Insurance" = r."Insurance",
+        "BCD" = r."BCD",
+        "Bank" = r."Bank",
+        "Clearance" = r."Clearance",
+        "Margin" = r."Margin",
+        "Resale" = r."Resale",
+        "TP" = r."TP",
+        "Remarks" = r."Remarks",
+        "Exchange_rate" = r."Exchange_rate"
+    from jsonb_populate_recordset(null::"Part_details", p_updates) r
+    where p.id = r.id and p.rfq_id = p_rfq_id;
+    get diagnostics v_updated = row_count;
+
+    insert into "Part_details" ("rfq_id", "RFQ-part-no", "Quoted-part-no", "Supplier", "Date Code", "RFQ Qty", "Quoted Qty", "Make", "Lead", "Source", "Unit$", "Unit₹", "Freight", "Insurance", "BCD", "Bank", "Clearance", "Margin", "Resale", "TP", "Remarks", "Exchange_rate")
+    select r."rfq_id", r."RFQ-part-no", r."Quoted-part-no", r."Supplier", r."Date Code", r."RFQ Qty", r."Quoted Qty", r."Make", r."Lead", r."Source", r."Unit$", r."Unit₹", r."Freight", r."Insurance", r."BCD", r."Bank", r."Clearance", r."Margin", r."Resale", r."TP", r."Remarks", r."Exchange_rate"
+    from jsonb_populate_recordset(null::"Part_details", p_inserts) r;
+    get diagnostics v_inserted = row_count;
+
+    return jsonb_build_object('inserted', v_inserted, 'updated', v_updated, 'deleted', v_deleted);
+end;
+$$;
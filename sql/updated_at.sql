@@ -0,0 +1,88 @@
+-- Modification timestamps behind the ETags on the RFQ read endpoints (src/etag.py).
+-- Run once in the Supabase SQL editor. Without it the server only sends
+-- ETags when the local replica serves the reads (desktop build); otherwise
+-- responses carry no ETag, and the change feed and replica sync cannot work.
+
+alter table "RFQ-Tracker" add column if not exists updated_at timestamptz not null default now();
+alter table "Part_details" add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists rfq_tracker_updated_at_idx on "RFQ-Tracker" (updated_at desc);
+create index if not exists part_details_updated_at_idx on "Part_details" (updated_at desc);
+
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at := now();
+  return new;
+end;
+$$;
+
+drop trigger if exists rfq_tracker_set_updated_at on "RFQ-Tracker";
+create trigger rfq_tracker_set_updated_at
+  before update on "RFQ-Tracker"
+  for each row execute function set_updated_at();
+
+drop trigger if exists part_details_set_updated_at on "Part_details";
+create trigger part_details_set_updated_at
+  before update on "Part_details"
+  for each row execute function set_updated_at();
+
+-- A part change also touches its RFQ, so the RFQ row alone tells whether it changed.
+-- Statement-level with transition tables: a bulk insert of 10k lines (import)
+-- touches each RFQ once, not once per line. Postgres allows transition tables
+-- on single-event triggers only, hence one trigger per event.
+create or replace function touch_parent_rfq_inserted()
+returns trigger
+language plpgsql
+as $$
+begin
+  update "RFQ-Tracker" set updated_at = now()
+  where id in (select distinct rfq_id from new_rows);
+  return null;
+end;
+$$;
+
+create or replace function touch_parent_rfq_updated()
+returns trigger
+language plpgsql
+as $$
+begin
+  update "RFQ-Tracker" set updated_at = now()
+  where id in (select rfq_id from new_rows union select rfq_id from old_rows);
+  return null;
+end;
+$$;
+
+create or replace function touch_parent_rfq_deleted()
+returns trigger
+language plpgsql
+as $$
+begin
+  update "RFQ-Tracker" set updated_at = now()
+  where id in (select distinct rfq_id from old_rows);
+  return null;
+end;
+$$;
+
+drop trigger if exists part_details_touch_rfq on "Part_details";
+drop function if exists touch_parent_rfq();
+
+drop trigger if exists part_details_touch_rfq_insert on "Part_details";
+create trigger part_details_touch_rfq_insert
+  after insert on "Part_details"
+  referencing new table as new_rows
+  for each statement execute function touch_parent_rfq_inserted();
+
+drop trigger if exists part_details_touch_rfq_update on "Part_details";
+create trigger part_details_touch_rfq_update
+  after update on "Part_details"
+  referencing old table as old_rows new table as new_rows
+  for each statement execute function touch_parent_rfq_updated();
+
+drop trigger if exists part_details_touch_rfq_delete on "Part_details";
+create trigger part_details_touch_rfq_delete
+  after delete on "Part_details"
+  referencing old table as old_rows
+  for each statement execute function touch_parent_rfq_deleted();
@@ -1,33 +1,103 @@
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-import sys 
+"""Supabase clients on one shared, metered HTTP pool.
 
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+Nothing heavy happens at import: httpx and supabase are imported, and the
+credentials checked, when the first client is created. Credentials come
+from Config (the single .env load) so a missing .env no longer stops the
+desktop window from opening; the first Supabase call reports it instead.
+"""
+import threading
+import time
+from typing import TYPE_CHECKING
+from flask import g, has_app_context
+from src.config import Config
+from src.metrics import record_upstream
+from src.utils import resource_path
 
-# Load the .env from the bundle's internal path
-load_dotenv(resource_path(".env"))
+if TYPE_CHECKING:
+    from supabase import Client
 
-# Now these will work inside the EXE
-url = os.environ.get("SUPABASE_URL")
-key = os.environ.get("SUPABASE_KEY")
+def upstream_target(path):
+    """Metrics label for a Supabase URL path: the table, rpc or auth endpoint, without ids."""
+    segments = [s for s in path.strip("/").split("/") if s]
+    if segments[:2] == ["rest", "v1"] and len(segments) > 2:
+        return "/".join(segments[2:4]) if segments[2] == "rpc" else segments[2]
+    if segments[:2] == ["auth", "v1"]:
+        # admin/users/<uuid> -> admin/users
+        return "auth/" + "/".join(s for s in segments[2:4] if not (len(s) == 36 and s.count("-") == 4))
+    return "/".join(segments[:2]) or "/"
 
-if not url or not key:
-    raise ValueError(f"Supabase credentials missing. Looked in: {resource_path('.env')}")
+def _metered_client_class():
+    import httpx
 
+    class MeteredClient(httpx.Client):
+        """httpx.Client that records each call (body included) in src.metrics."""
 
-supabase: Client = create_client(url, key)
-supabase_admin: Client = create_client(url, key)
+        def send(self, request, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                record_upstream("supabase", upstream_target(request.url.path), request.method, "error",
+                                time.perf_counter() - start)
+                raise
+            record_upstream("supabase", upstream_target(request.url.path), request.method, response.status_code,
+                            time.perf_counter() - start, response.num_bytes_downloaded)
+            return response
 
-def get_supabase() -> Client:
-    return supabase
+    return MeteredClient
 
-def get_supabase_admin() -> Client:
-    return supabase_admin
\ No newline at end of file
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client():
+    """One keep-alive connection pool shared by every client; httpx.Client is thread-safe."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            import httpx
+            _http_client = _metered_client_class()(
+                limits=httpx.Limits(
+                    max_connections=Config.SUPABASE_POOL_SIZE,
+                    max_keepalive_connections=Config.SUPABASE_POOL_KEEPALIVE,
+                    keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    connect=Config.SUPABASE_CONNECT_TIMEOUT,
+                    read=Config.SUPABASE_READ_TIMEOUT,
+                    write=Config.SUPABASE_READ_TIMEOUT,
+                    pool=Config.SUPABASE_POOL_TIMEOUT,
+                ),
+                http2=Config.SUPABASE_HTTP2,
+                follow_redirects=True,
+            )
+    return _http_client
+
+_local = threading.local()
+
+def create_supabase() -> "Client":
+    """A fresh client on the shared pool. Its auth state (sign_in_with_password,
+    sign_up, ...) stays private to it, nothing is persisted or refreshed."""
+    if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
+        raise ValueError(f"Supabase credentials missing. Looked in: {resource_path('.env')}")
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+    return create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY, options=SyncClientOptions(
+        httpx_client=get_http_client(),
+        persist_session=False,
+        auto_refresh_token=False,
+    ))
+
+def _scoped(name) -> "Client":
+    # One client per request, or per thread for background work outside one
+    scope = g if has_app_context() else _local
+    client = getattr(scope, name, None)
+    if client is None:
+        client = create_supabase()
+        setattr(scope, name, client)
+    return client
+
+def get_supabase() -> "Client":
+    return _scoped("supabase")
+
+def get_supabase_admin() -> "Client":
+    return _scoped("supabase_admin")
@@ -1,8 +1,32 @@
-from flask import Blueprint, make_response, request, jsonify
-from src.auth.utils import login_required
+from flask import Blueprint, Response, current_app, make_response, request, jsonify, send_file, stream_with_context
+from datetime import date
+from src.auth.utils import login_required, role_required, invalidate_user
 from src.SupaClient import get_supabase, get_supabase_admin
-import requests
 from src.config import Config
+from src.pagination import PageRequest
+from src.hooks import notify_rfq_saved, notify_rfq_deleted
+from src.search import search_index
+from src.reports import report_rollups
+from src.part_history import part_history
+from src.suggest import suggest_index, FIELDS as SUGGEST_FIELDS
+from src.fx import usd_inr_cache
+from src.saves import save_rfq
+from src.bulk import parse_bulk_request, bulk_delete, bulk_update
+from src.journal import get_journal
+from src.pricing import price_items, parse_request, request_items
+from src.export import iter_export_rows, export_titles, stream_csv, stream_xlsx
+from src.importer import RFQImporter, iter_records, iter_csv, iter_xlsx
+from src.projection import build_select, project_rows
+from src.replica import get_replica
+from src.etag import conditional, current_version
+from src.changes import feed, decode_feed_cursor
+from src.directory import get_directory, invalidate_directory
+from src.profiling import profile_store, SORT_KEYS
+from src.jobs import get_runner, JobQueueFull, FINISHED
+import os
+import threading
+import time
+import uuid
 import traceback
 
 api = Blueprint('api', __name__, url_prefix='/api')
@@ -15,145 +39,552 @@ def get_user_info(user):
 @api.route('/get-usd-inr', methods=['GET'])
 def get_usd_inr():
     try:
-        api_key = Config.EXCHANGE_RATE_API_KEY 
-        url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/USD"
-        
-        # 2. Fetch data (Only runs on cache miss)
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()
-
-        inr_rate = data.get("conversion_rates", {}).get("INR")
+        # Served from the in-process cache; the provider is only hit in the background
+        rate, stale = usd_inr_cache.get()
 
         response = make_response(jsonify({
             "success": True,
             "pair": "USD/INR",
-            "rate": inr_rate,
-            "updated": data.get("time_last_update_utc")
+            "rate": rate["rate"],
+            "updated": rate.get("updated"),
+            "stale": stale
         }))
 
-        # 4. Cache globally on Vercel for 24 hours
-        response.headers['Cache-Control'] = 'public, s-maxage=86400, stale-while-revalidate'
+        response.headers['Cache-Control'] = 'public, max-age=300, s-maxage=86400, stale-while-revalidate'
         
         return response, 200
     except Exception as e:
         return jsonify({"error": "Could not fetch rate", "details": str(e)}), 500
 
+def parse_id_list(raw):
+    """'1,2,3' -> [1, 2, 3]; None when the parameter is absent."""
+    if raw is None:
+        return None
+    try:
+        ids = [int(x) for x in raw.split(',') if x.strip()]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers")
+    if len(ids) > Config.LIST_MAX_PAGE_SIZE:
+        raise ValueError(f"At most {Config.LIST_MAX_PAGE_SIZE} ids per request")
+    return ids
+
+def wants_async():
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+def submit_job(user, kind, params):
+    """Queues a background job for `user`; the 202 response points at its status."""
+    role, u_id = get_user_info(user)
+    try:
+        job_id = get_runner().submit(kind, params, u_id, role)
+    except KeyError:
+        return jsonify({"error": f"Unknown job kind: {kind}"}), 400
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 403
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"success": True, "job_id": job_id, "status_url": f"/api/jobs/{job_id}"}), 202
+
 # --- RFQ ROUTES ---
 
 @api.route('/make-rfq-entry', methods=['POST'])
 @login_required
 def make_entry(user):
-    supabase = get_supabase()
     data = request.get_json()
-    existing_rfq_id = data.get('id') 
     role, u_id = get_user_info(user)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+
+    if Config.SAVE_MODE == "journal":
+        # Write-behind: durable locally now, applied to Supabase by the flusher
+        try:
+            save_id = get_journal().append(data, role, u_id)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        return jsonify({
+            "success": True,
+            "queued": True,
+            "save_id": save_id,
+            "rfq_id": int(data['id']) if data.get('id') else None,
+            "status_url": f"/api/save-status/{save_id}"
+        }), 202
 
     try:
-        header_data = {
-            "RFQ-no": data.get('rfq_no'),
-            "Company_name": data.get('company_name'),
-            "Sales_person": data.get('sales_person'),
-            "Customer_name": data.get('customer_name'),
-            "Customer_email": data.get('customer_email'),
-            "Customer_phone": data.get('customer_phone'),
-            "Customer_address_1": data.get('customer_address_1'),
-            "Customer_address_2": data.get('customer_address_2'),
-            "Customer_city": data.get('customer_city'),
-            "Customer_state": data.get('customer_state'),
-            "Customer_pincode": data.get('customer_pincode'),
-            "Customer_country": data.get('customer_country'),
-            "RFQ_purpose": data.get('rfq_purpose'),
-            "Tentative_date": data.get('tentative_date') or None,
-            "created_by": u_id
-        }
-        
-        if existing_rfq_id:
-            supabase.table("RFQ-Tracker").update(header_data).eq("id", existing_rfq_id).execute()
-            supabase.table("Part_details").delete().eq("rfq_id", existing_rfq_id).execute()
-            new_rfq_id = existing_rfq_id
-        else:
-            header_res = supabase.table("RFQ-Tracker").insert(header_data).execute()
-            new_rfq_id = header_res.data[0]['id']
-
-        items = data.get('items', [])
-        if items:
-            items_to_insert = [{
-                "rfq_id": new_rfq_id,
-                "RFQ-part-no": item.get('rfq_part_no'),
-                "Quoted-part-no": item.get('quoted_part_no'),
-                "Supplier": item.get('supplier'),
-                "Date Code": item.get('date_code') or None,
-                "RFQ Qty": item.get('rfq_qty'),
-                "Quoted Qty": item.get('quoted_qty'),
-                "Make": item.get('make'),
-                "Lead": item.get('lead_time'),
-                "Source": item.get('source'),
-                "Unit$": item.get('unit_price_usd'),
-                "Unit₹": item.get('unit_price_inr'),
-                "Freight": item.get('freight'),
-                "Insurance": item.get('insurance'),
-                "BCD": item.get('bcd'),
-                "Bank": item.get('bank'),
-                "Clearance": item.get('clearance'),
-                "Margin": item.get('margin'),
-                "Resale": item.get('resale'),
-                "TP": item.get('tp'),
-                "Remarks": item.get('remarks'),
-                "Exchange_rate": item.get('exchange_rate')
-            } for item in items]
-            
-            supabase.table("Part_details").insert(items_to_insert).execute()
+        rfq_id, parts = save_rfq(get_supabase(), data, role, u_id)
+        return jsonify({"success": True, "rfq_id": rfq_id, "parts": parts}), 201
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/save-status/<int:save_id>', methods=['GET'])
+@login_required
+def save_status(user, save_id):
+    role, u_id = get_user_info(user)
+    if Config.SAVE_MODE != "journal":
+        return jsonify({"error": "Saves are not journaled (SAVE_MODE=direct)"}), 404
+    try:
+        journal = get_journal()
+        status = journal.status(save_id)
+        if status is None or (role != "admin" and status.pop("user_id") != str(u_id)):
+            return jsonify({"error": "Save not found"}), 404
+        status.pop("user_id", None)
+        return jsonify({"success": True, "data": status, "pending": journal.pending_count()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/profiles', methods=['GET'])
+@role_required("admin")
+def list_profiles(user):
+    try:
+        return jsonify({"success": True, "data": profile_store.list()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/profiles/<profile_id>', methods=['GET'])
+@role_required("admin")
+def get_profile(user, profile_id):
+    try:
+        if request.args.get('format') == 'text':
+            sort = request.args.get('sort', 'cumulative')
+            if sort not in SORT_KEYS:
+                return jsonify({"error": f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+            text = profile_store.text(profile_id, sort, request.args.get('limit', 60, type=int))
+            if text is None:
+                return jsonify({"error": "Profile not found"}), 404
+            return Response(text, mimetype="text/plain")
 
-        return jsonify({"success": True, "rfq_id": new_rfq_id}), 201
+        path = profile_store.prof_path(profile_id)
+        if path is None:
+            return jsonify({"error": "Profile not found"}), 404
+        return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                         download_name=f"profile-{profile_id}.prof")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/list-rfq-entry', methods=['GET'])
 @login_required
+@conditional
 def list_entry(user):
     supabase = get_supabase()
     role, u_id = get_user_info(user)
     try:
-        res = supabase.table("RFQ-Tracker").select('*, Part_details(*)').order("created_at", desc=True).execute()
-        processed_data = res.data
-        
-        # Only hide sensitive info for sales/users - admin and pricing can see everything
-        if role not in ["admin", "pricing"]:
-            sensitive_fields = ["Unit$", "Unit₹", "Margin", "BCD", "Freight", "Insurance", "Clearance"]
-            for rfq in processed_data:
-                for part in rfq.get('Part_details', []):
-                    for field in sensitive_fields:
-                        if field in part:
-                            part[field] = "---"
-
-        return jsonify({"success": True, "data": processed_data}), 200
+        page = PageRequest.from_args(request.args)
+        ids = parse_id_list(request.args.get('ids'))
+        # Sales never receive pricing columns; ?fields= narrows further
+        columns = build_select(role, request.args.get('fields'), required=("id", page.sort))
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        local = get_replica(role)
+        if local is not None:
+            # Desktop build: answered from the local SQLite replica
+            fields, required = request.args.get('fields'), ("id", page.sort)
+            if ids is not None:
+                rows, total, next_cursor = local.get_many(ids), None, None
+            else:
+                rows, total = local.list_rfqs(page)
+                rows, next_cursor = page.split(rows)
+            processed_data = project_rows(rows, role, fields, required)
+        elif ids is not None:
+            # Explicit id list (e.g. search hits): returned in the order asked for
+            res = supabase.table("RFQ-Tracker").select(columns).in_("id", ids).execute()
+            by_id = {row['id']: row for row in res.data or []}
+            processed_data, next_cursor, total = [by_id[i] for i in ids if i in by_id], None, None
+        else:
+            # Exact count only on the first page; later pages are narrowed by the cursor
+            query = supabase.table("RFQ-Tracker").select(columns, count="exact" if page.is_first else None)
+            res = page.apply(query).execute()
+            processed_data, next_cursor = page.split(res.data)
+            total = res.count
+
+        response = make_response(jsonify({"success": True, "data": processed_data, "next_cursor": next_cursor}))
+        if total is not None:
+            response.headers['X-Total-Count'] = str(total)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# --- CHANGE FEED ---
+
+_stream_slots = threading.BoundedSemaphore(Config.CHANGE_STREAM_MAX_CLIENTS)
+
+def change_feed_args(user, since):
+    """(columns, limit) for a change feed request; raises like build_select()."""
+    role, u_id = get_user_info(user)
+    if since:
+        decode_feed_cursor(since)
+    columns = build_select(role, request.args.get('fields'), required=("id", "updated_at"))
+    try:
+        limit = max(1, min(int(request.args.get('limit', 200)), Config.LIST_MAX_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    return columns, limit
+
+@api.route('/rfq-changes', methods=['GET'])
+@login_required
+def rfq_changes(user):
+    """RFQs created or changed, and ids deleted, since `since`. Without `since`
+    only the current cursor is returned, to follow from."""
+    since = request.args.get('since')
+    try:
+        columns, limit = change_feed_args(user, since)
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        supabase = get_supabase()
+        if not since:
+            return jsonify({"success": True, "changed": [], "deleted": [], "cursor": feed.head(supabase),
+                            "more": False}), 200
+        rows, deleted, cursor, more = feed.changes(supabase, since, columns, limit)
+        return jsonify({"success": True, "changed": rows, "deleted": deleted, "cursor": cursor, "more": more}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def sse(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {current_app.json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+@api.route('/rfq-changes/stream', methods=['GET'])
+@login_required
+def rfq_changes_stream(user):
+    """Server-Sent Events: a `changes` event ({changed, deleted, cursor}) whenever
+    there are any. EventSource resumes from the last event id on reconnect."""
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        columns, limit = change_feed_args(user, since)
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not _stream_slots.acquire(blocking=False):
+        response = jsonify({"error": "Too many open change streams, poll /api/rfq-changes instead"})
+        response.headers['Retry-After'] = str(int(Config.CHANGE_STREAM_POLL))
+        return response, 503
+
+    def events():
+        supabase = get_supabase()
+        cursor = since or feed.head(supabase)
+        yield "retry: 3000\n\n"
+        yield sse("ready", {"cursor": cursor}, cursor)
+        version, seq = None, feed.seq
+        deadline = time.monotonic() + Config.CHANGE_STREAM_MAX_SECONDS
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            # The shared data version moves on any write, here or elsewhere
+            try:
+                latest = current_version()
+            except Exception as e:
+                print(f"Change stream version probe failed: {e}")
+                latest = None
+            if latest is None or latest != version:
+                version, more = latest, True
+                while more:
+                    rows, deleted, cursor, more = feed.changes(supabase, cursor, columns, limit)
+                    if rows or deleted:
+                        yield sse("changes", {"changed": rows, "deleted": deleted, "cursor": cursor}, cursor)
+                        last_sent = time.monotonic()
+            if time.monotonic() - last_sent >= Config.CHANGE_STREAM_HEARTBEAT:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            seq = feed.wait(seq, Config.CHANGE_STREAM_POLL)
+        # Ends after CHANGE_STREAM_MAX_SECONDS; the browser reconnects with Last-Event-ID
+
+    response = Response(stream_with_context(events()), mimetype='text/event-stream')
+    response.call_on_close(_stream_slots.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@api.route('/search-rfq', methods=['GET'])
+@login_required
+def search_rfq(user):
+    query = request.args.get('q', '')
+    try:
+        limit = max(1, min(int(request.args.get('limit', Config.LIST_PAGE_SIZE)), Config.LIST_MAX_PAGE_SIZE))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    try:
+        total, ids = search_index.search(query, limit=limit, offset=offset)
+        return jsonify({"success": True, "ids": ids, "total": total, "offset": offset}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/suggest', methods=['GET'])
+@login_required
+def suggest(user):
+    field = request.args.get('field')
+    if field not in SUGGEST_FIELDS:
+        return jsonify({"error": f"field must be one of: {', '.join(SUGGEST_FIELDS)}"}), 400
+    limit = max(1, min(request.args.get('limit', 10, type=int), Config.SUGGEST_MAX_RESULTS))
+    try:
+        ranked = suggest_index.suggest(field, request.args.get('prefix', ''), limit)
+        response = make_response(jsonify({
+            "success": True,
+            "field": field,
+            "data": [{"value": value, "count": count} for value, count in ranked]
+        }))
+        # Keystrokes repeat prefixes (typing, then deleting); a short private cache absorbs them
+        response.headers['Cache-Control'] = 'private, max-age=30'
+        return response, 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/report-summary', methods=['GET'])
+@role_required("admin", "pricing")
+@conditional
+def report_summary(user):
+    args = request.args
+    try:
+        summary = report_rollups.summary(
+            date_from=args.get('date_from') or None,
+            date_to=args.get('date_to') or None,
+            sales_person=args.get('sales_person') or None,
+            purpose=args.get('purpose') or None,
+        )
+        return jsonify({"success": True, "data": summary}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/part-history/<path:part_no>', methods=['GET'])
+@role_required("admin", "pricing")
+def get_part_history(user, part_no):
+    try:
+        exclude = request.args.get('exclude_rfq', type=int)
+        history = part_history.lookup(part_no, exclude_rfq=exclude)
+        return jsonify({"success": True, "part_no": part_no, "data": history}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/part-history', methods=['POST'])
+@role_required("admin", "pricing")
+def part_history_batch(user):
+    """Every line of an RFQ in one call: {"part_nos": [...], "exclude_rfq": id}."""
+    data = request.get_json(silent=True)
+    part_nos = data.get('part_nos') if isinstance(data, dict) else None
+    if not isinstance(part_nos, list) or not all(isinstance(p, str) for p in part_nos):
+        return jsonify({"error": "part_nos must be a list of part numbers"}), 400
+    if len(part_nos) > Config.LIST_MAX_PAGE_SIZE:
+        return jsonify({"error": f"At most {Config.LIST_MAX_PAGE_SIZE} part numbers per request"}), 400
+    try:
+        exclude = int(data['exclude_rfq']) if data.get('exclude_rfq') else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "exclude_rfq must be an RFQ id"}), 400
+    try:
+        return jsonify({"success": True, "data": part_history.lookup_many(part_nos, exclude_rfq=exclude)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/price-items', methods=['POST'])
+@role_required("admin", "pricing")
+def price_items_route(user):
+    """Reprices a batch of lines: explicit `items`, the stored lines of `rfq_ids`,
+    or every open (Bidding) RFQ with `"open": true`. Optional `exchange_rate`
+    overrides each line's FX and `rates` overrides the pricing constants."""
+    data = request.get_json() or {}
+    try:
+        rates, exchange_rate = parse_request(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if wants_async():
+        return submit_job(user, "reprice", data)
+
+    try:
+        items = request_items(get_supabase(), data)
+        priced = price_items(items, rates, exchange_rate)
+        return jsonify({"success": True, "count": len(priced), "items": priced}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/export', methods=['GET'])
+@login_required
+def export_rfqs(user):
+    role, u_id = get_user_info(user)
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt in ('csv', 'xlsx') and wants_async():
+        return submit_job(user, "export", {"format": fmt})
+    if fmt == 'csv':
+        body, mimetype = stream_csv(iter_export_rows(get_supabase(), role), export_titles(role)), 'text/csv; charset=utf-8'
+    elif fmt == 'xlsx':
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return jsonify({"error": "XLSX export needs openpyxl installed; use format=csv"}), 501
+        body = stream_xlsx(iter_export_rows(get_supabase(), role), export_titles(role))
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        return jsonify({"error": "format must be csv or xlsx"}), 400
+
+    filename = f"RFQ_History_{date.today().isoformat()}.{fmt}"
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@api.route('/import-rfqs', methods=['POST'])
+@role_required("admin", "pricing")
+def import_rfqs(user):
+    role, u_id = get_user_info(user)
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({"error": "Upload a CSV or XLSX file as 'file'"}), 400
+
+    name = upload.filename.lower()
+    if name.endswith('.csv'):
+        rows = iter_csv(upload.stream)
+    elif name.endswith('.xlsx'):
+        rows = iter_xlsx(upload.stream)
+    else:
+        return jsonify({"error": "Only .csv and .xlsx files can be imported"}), 400
+
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    if wants_async():
+        path = save_job_upload(upload)
+        response = submit_job(user, "import", {"upload": path, "dry_run": dry_run})
+        if response[1] != 202:
+            os.remove(path)  # no job will ever read it
+        return response
+    importer = RFQImporter(get_supabase(), created_by=u_id, dry_run=dry_run, on_created=notify_rfq_saved)
+    try:
+        report = importer.run(iter_records(rows))
+    except UnicodeDecodeError as e:
+        # Raised mid-file: the batches before it are already written
+        return jsonify({"error": f"The file is not UTF-8 text (save it as CSV UTF-8): {e}",
+                        "partial": importer.report()}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "partial": importer.report()}), 500
+
+    return jsonify({"success": True, **report}), 200
+
+def save_job_upload(upload):
+    """Keeps an upload on disk for a background import; the job deletes it."""
+    directory = get_runner().directory
+    path = os.path.join(directory, f"upload-{uuid.uuid4().hex}{os.path.splitext(upload.filename.lower())[1]}")
+    upload.save(path)
+    return path
+
+# --- JOB ROUTES ---
+
+def visible_job(user, job_id):
+    """The job when `user` may see it (their own, or any for admins), else None."""
+    role, u_id = get_user_info(user)
+    job = get_runner().get(job_id)
+    if job is None or (role != "admin" and job["user_id"] != str(u_id)):
+        return None
+    return job
+
+def job_json(job):
+    job["result_url"] = f"/api/jobs/{job['id']}/result" if job.pop("result_file", None) else None
+    return job
+
+@api.route('/jobs', methods=['POST'])
+@login_required
+def create_job(user):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get('kind'):
+        return jsonify({"error": "Expected a JSON object with 'kind' and optional 'params'"}), 400
+    params = data.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "params must be an object"}), 400
+    if data['kind'] == "import":
+        return jsonify({"error": "Submit imports to /api/import-rfqs?async=1"}), 400
+    if data['kind'] == "reprice":
+        try:
+            parse_request(params)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+    return submit_job(user, data['kind'], params)
+
+@api.route('/jobs', methods=['GET'])
+@login_required
+def list_jobs(user):
+    role, u_id = get_user_info(user)
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        jobs = get_runner().list(user_id=None if role == "admin" else u_id, limit=limit)
+        return jsonify({"success": True, "data": [job_json(job) for job in jobs]}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_job(user, job_id):
+    try:
+        job = visible_job(user, job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify({"success": True, "data": job_json(job)}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_job(user, job_id):
+    try:
+        job = visible_job(user, job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        if job["status"] in FINISHED:
+            return jsonify({"error": f"Job already {job['status']}"}), 409
+        return jsonify({"success": True, "data": job_json(get_runner().cancel(job_id))}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api.route('/jobs/<int:job_id>/result', methods=['GET'])
+@login_required
+def job_result(user, job_id):
+    try:
+        job = visible_job(user, job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        path = get_runner().result_path(job)
+        if job["status"] != "succeeded" or not path or not os.path.exists(path):
+            return jsonify({"error": "This job has no result file"}), 404
+        ext = os.path.splitext(path)[1]
+        return send_file(path, as_attachment=True, download_name=f"{job['kind']}-{job_id}{ext}")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @api.route('/get-rfq/<int:rfq_id>', methods=['GET'])
 @login_required
+@conditional
 def get_rfq(user, rfq_id):
     supabase = get_supabase()
     role, u_id = get_user_info(user)
     try:
-        # Get single RFQ with part details
-        res = supabase.table("RFQ-Tracker").select('*, Part_details(*)').eq("id", rfq_id).execute()
+        columns = build_select(role, request.args.get('fields'))
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        local = get_replica(role)
+        if local is not None:
+            rows = project_rows(local.get_many([rfq_id]), role, request.args.get('fields'))
+        else:
+            # Get single RFQ with the part columns this role may see
+            rows = supabase.table("RFQ-Tracker").select(columns).eq("id", rfq_id).execute().data
         
-        if not res.data or len(res.data) == 0:
+        if not rows:
             return jsonify({"error": "RFQ not found"}), 404
         
-        rfq_data = res.data[0]
-        
-        # Mask sensitive info for Sales/Users - admin and pricing can see everything
-        if role not in ["admin", "pricing"]:
-            sensitive_fields = ["Unit$", "Unit₹", "Margin", "BCD", "Freight", "Insurance", "Clearance"]
-            for part in rfq_data.get('Part_details', []):
-                for field in sensitive_fields:
-                    if field in part:
-                        part[field] = "---"
-        
-        return jsonify({"success": True, "data": rfq_data}), 200
+        return jsonify({"success": True, "data": rows[0]}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -170,10 +601,41 @@ def delete_rfq(user, rfq_id):
         
         supabase.table("Part_details").delete().eq("rfq_id", rfq_id).execute()
         supabase.table("RFQ-Tracker").delete().eq("id", rfq_id).execute()
+        notify_rfq_deleted(rfq_id)
         return jsonify({"success": True}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@api.route('/rfqs/bulk', methods=['POST'])
+@login_required
+def bulk_rfqs(user):
+    supabase = get_supabase()
+    role, u_id = get_user_info(user)
+    try:
+        action, ids, values = parse_bulk_request(request.get_json(silent=True), Config.BULK_MAX_IDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Same rule as delete-rfq; purpose and sales person are editable by anyone who can save an RFQ
+    if action == "delete" and role != "admin":
+        return jsonify({"error": "Forbidden: Only admins can delete"}), 403
+
+    try:
+        if action == "delete":
+            results = bulk_delete(supabase, ids)
+        else:
+            results = bulk_update(supabase, ids, values)
+        done = sum(1 for r in results if r["status"] != "not_found")
+        return jsonify({
+            "success": True,
+            "action": action,
+            "results": results,
+            "done": done,
+            "not_found": len(results) - done
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # --- AUTH ROUTES ---
 
 @api.route("/signup", methods=["POST"])
@@ -432,6 +894,8 @@ def signup():
             # Don't raise - return error message instead
             return jsonify({"error": f"Failed to create/update profile: {error_str}"}), 500
         
+        invalidate_user(u_id)
+        invalidate_directory()
         return jsonify({"message": message, "user": u_id, "user_existed": user_exists}), 200
 
     except Exception as e:
@@ -475,81 +939,8 @@ def list_users(user):
     if role != "admin":
         return jsonify({"error": "Forbidden: Only admins can list users"}), 403
     
-    supabase = get_supabase_admin()
     try:
-        # Get profiles
-        res = supabase.table("profiles").select("*").execute()
-        profiles = res.data
-        
-        # Get email addresses from auth for each user
-        auth_users = {}
-        try:
-            # Get all users from auth
-            auth_users_res = supabase.auth.admin.list_users()
-            
-            # Debug: Check what we actually got
-            print(f"Auth response type: {type(auth_users_res)}")
-            
-            # The response might be a list directly, or have a .users attribute
-            users_list = None
-            if isinstance(auth_users_res, list):
-                users_list = auth_users_res
-                print(f"Response is a list with {len(users_list)} items")
-            elif hasattr(auth_users_res, 'users'):
-                users_list = auth_users_res.users
-                print(f"Response has .users attribute, type: {type(users_list)}")
-            elif hasattr(auth_users_res, 'data'):
-                users_list = auth_users_res.data
-                print(f"Response has .data attribute")
-            else:
-                # Try to get it as an iterable
-                try:
-                    users_list = list(auth_users_res)
-                    print(f"Converted response to list")
-                except:
-                    print(f"Could not convert response. Attributes: {[x for x in dir(auth_users_res) if not x.startswith('_')]}")
-                    users_list = []
-            
-            # Build email mapping
-            if users_list:
-                for user in users_list:
-                    try:
-                        # Try object attribute access first
-                        if hasattr(user, 'id'):
-                            user_id = str(user.id)
-                            user_email = getattr(user, 'email', None)
-                        # Then try dictionary access
-                        elif isinstance(user, dict):
-                            user_id = str(user.get('id', ''))
-                            user_email = user.get('email')
-                        else:
-                            continue
-                            
-                        if user_id and user_email:
-                            auth_users[user_id] = user_email
-                            print(f"Mapped user {user_id} -> {user_email}")
-                    except Exception as user_error:
-                        print(f"Error processing user: {user_error}")
-                        continue
-            else:
-                print("No users list found in response")
-                
-        except Exception as auth_error:
-            error_str = str(auth_error)
-            print(f"Warning: Could not fetch email addresses: {error_str}")
-            import traceback
-            print(f"Traceback: {traceback.format_exc()}")
-        
-        # Merge email addresses into profiles
-        for profile in profiles:
-            user_id = str(profile.get('user_id', '')) if profile.get('user_id') else None
-            if user_id and user_id in auth_users:
-                profile['email'] = auth_users[user_id]
-            else:
-                profile['email'] = None
-                if user_id:
-                    print(f"No email found for user_id: {user_id}")
-        
+        profiles = get_directory(get_supabase_admin())
         return jsonify({"success": True, "data": profiles}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -629,6 +1020,8 @@ def update_user(user, user_id):
                 error_msg += f"Errors encountered: {'; '.join(error_messages)}"
                 return jsonify({"error": error_msg, "details": error_messages}), 500
         
+        invalidate_user(user_id)
+        invalidate_directory()
         return jsonify({"success": True, "message": "User updated successfully"}), 200
     except Exception as e:
         error_msg = str(e)
@@ -653,6 +1046,8 @@ def delete_user(user, user_id):
         # Delete profile first
         supabase.table("profiles").delete().eq("user_id", user_id).execute()
         # Note: Deleting from auth might require admin API, assuming profiles delete is enough
+        invalidate_user(user_id)
+        invalidate_directory()
         return jsonify({"success": True}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,55 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+# Supabase signs access tokens with the project's JWT secret (HS256).
+_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+def _b64decode(segment):
+    padding = "=" * (-len(segment) % 4)
+    return base64.urlsafe_b64decode(segment + padding)
+
+
+def read_claims(token):
+    """Returns the token's claims WITHOUT checking the signature (or None)."""
+    try:
+        _, payload, _ = token.split(".")
+        claims = json.loads(_b64decode(payload))
+        return claims if isinstance(claims, dict) else None
+    except Exception:
+        return None
+
+
+def verify_access_token(token, secret, leeway=0):
+    """Checks signature and expiry locally. Returns the claims, or None if invalid."""
+    if not token or not secret:
+        return None
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        digest = _ALGORITHMS.get(header.get("alg"))
+        if digest is None:
+            return None
+
+        signing_input = f"{header_b64}.{payload_b64}".encode()
+        expected = hmac.new(secret.encode(), signing_input, digest).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+            return None
+
+        claims = json.loads(_b64decode(payload_b64))
+    except Exception:
+        return None
+
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp + leeway < time.time():
+        return None
+    if not claims.get("sub"):
+        return None
+    return claims
@@ -1,35 +1,123 @@
-from flask import request, jsonify, redirect, url_for
+import time
+from flask import request, jsonify, redirect, url_for, g
 from src.SupaClient import get_supabase
+from src.config import Config
+from src.cache import TTLCache
+from src.auth.tokens import verify_access_token, read_claims
+from src.replica import get_replica, forget_profile
+from src.metrics import phase
 from functools import wraps
 
-def get_current_user():
-    """Fetches the auth user AND their custom profile role."""
+# access token -> (user_id, email, exp); user_id -> role
+_session_cache = TTLCache(maxsize=Config.SESSION_CACHE_SIZE, ttl=Config.SESSION_CACHE_TTL)
+_role_cache = TTLCache(maxsize=Config.ROLE_CACHE_SIZE, ttl=Config.ROLE_CACHE_TTL)
+
+class SessionUser:
+    """What the routes get as `user`: the auth identity plus the profile role."""
+
+    def __init__(self, id, email, role):
+        self.id = id
+        self.email = email
+        self.role = role
+
+    def __repr__(self):
+        return f"SessionUser(id={self.id!r}, role={self.role!r})"
+
+def get_request_token():
     token = request.cookies.get('access_token')
-    
+
     if not token:
         auth = request.headers.get("Authorization", "")
         token = auth.replace("Bearer ", "")
 
-    if not token:
-        return None
+    return token or None
 
-    supabase = get_supabase()
-    try:
-        res = supabase.auth.get_user(token)
+def _session_ttl(exp):
+    if not exp:
+        return Config.SESSION_CACHE_TTL
+    return min(Config.SESSION_CACHE_TTL, int(exp - time.time()))
+
+def _resolve_session(token):
+    """Returns (user_id, email) for a token, verifying locally when possible."""
+    cached = _session_cache.get(token)
+    if cached:
+        user_id, email, exp = cached
+        if not exp or exp > time.time():
+            return user_id, email
+        _session_cache.pop(token)
+
+    claims = verify_access_token(token, Config.SUPABASE_JWT_SECRET)
+    if claims:
+        user_id, email, exp = claims["sub"], claims.get("email"), claims["exp"]
+    else:
+        if Config.SUPABASE_JWT_SECRET:
+            return None
+        # No secret configured: let Supabase validate, then trust it until expiry
+        res = get_supabase().auth.get_user(token)
         if not res or not res.user:
             return None
-        
-        user = res.user
+        user_id, email = res.user.id, res.user.email
+        exp = (read_claims(token) or {}).get("exp")
+
+    _session_cache.set(token, (user_id, email, exp), ttl=_session_ttl(exp))
+    return user_id, email
 
-        profile_res = supabase.table("profiles").select("role").eq("user_id", user.id).maybe_single().execute()
+def _resolve_role(user_id):
+    user_id = str(user_id)
+    role = _role_cache.get(user_id)
+    if role is not None:
+        return role
 
-        user.role = profile_res.data["role"] if (profile_res.data and "role" in profile_res.data) else "user"
-        
-        return user
+    local = get_replica()
+    role = local.role_for(user_id) if local else None
+    if role is not None:
+        _role_cache.set(user_id, role)
+        return role
+
+    supabase = get_supabase()
+    profile_res = supabase.table("profiles").select("role").eq("user_id", user_id).maybe_single().execute()
+    data = profile_res.data if profile_res else None
+    role = data["role"] if (data and "role" in data) else "user"
+    _role_cache.set(user_id, role)
+    return role
+
+def get_current_user():
+    """Fetches the auth user AND their custom profile role (cached per token/user)."""
+    if "current_user" in g:
+        return g.current_user
+
+    token = get_request_token()
+    if not token:
+        return None
+
+    try:
+        with phase("auth"):
+            session = _resolve_session(token)
+            if not session:
+                return None
+            user_id, email = session
+            user = SessionUser(user_id, email, _resolve_role(user_id))
     except Exception as e:
         print(f"Error getting user with profile: {e}")
         return None
 
+    g.current_user = user
+    return user
+
+def invalidate_session(token):
+    """Forget a single access token (e.g. on logout)."""
+    if token:
+        _session_cache.pop(token)
+
+def invalidate_user(user_id):
+    """Forget the cached role and every cached session of a user."""
+    if not user_id:
+        return
+    user_id = str(user_id)
+    _role_cache.pop(user_id)
+    forget_profile(user_id)  # the replica's profiles copy may be a sync behind
+    _session_cache.pop_where(lambda entry: str(entry[0]) == user_id)
+
 def login_required(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
@@ -39,7 +127,7 @@ def login_required(f):
             if request.path.startswith('/api/'):
                 return jsonify({"error": "Unauthorized"}), 401
             return redirect(url_for('login'))
-        
+
         # This 'user' now has the correct .role (admin/sales) instead of 'authenticated'
         return f(user, *args, **kwargs)
     return wrapper
@@ -57,4 +145,4 @@ def role_required(*allowed_roles):
 
             return f(user, *args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,78 @@
+"""Set-based RFQ changes behind /api/rfqs/bulk.
+
+Each action costs a fixed number of Supabase calls whatever the number of
+ids: one `in_()` filter per table instead of a request (or two) per RFQ.
+Results are reported per id, in the order given.
+"""
+from datetime import date
+from src.hooks import notify_rfq_saved, notify_rfq_deleted
+
+ACTIONS = ("delete", "set_purpose", "reassign")
+PURPOSES = ("Bidding", "Buying")
+
+
+def parse_bulk_request(data, max_ids):
+    """(action, ids, header values) from the request body; raises ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object with 'action' and 'ids'")
+    action = data.get('action')
+    if action not in ACTIONS:
+        raise ValueError(f"action must be one of: {', '.join(ACTIONS)}")
+
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("ids must be a non-empty list of RFQ ids")
+    try:
+        ids = list(dict.fromkeys(int(x) for x in ids))
+    except (TypeError, ValueError):
+        raise ValueError("ids must be integers")
+    if len(ids) > max_ids:
+        raise ValueError(f"At most {max_ids} ids per request")
+
+    values = {}
+    if action == "set_purpose":
+        purpose = data.get('purpose')
+        if purpose not in PURPOSES:
+            raise ValueError(f"purpose must be one of: {', '.join(PURPOSES)}")
+        values["RFQ_purpose"] = purpose
+        tentative_date = data.get('tentative_date') or None
+        if purpose == "Bidding" and not tentative_date:
+            # Same rule as the editor: a bid needs its tentative buying date
+            raise ValueError("tentative_date is required for Bidding")
+        if tentative_date:
+            try:
+                date.fromisoformat(tentative_date)
+            except (TypeError, ValueError):
+                raise ValueError("tentative_date must be YYYY-MM-DD")
+            values["Tentative_date"] = tentative_date
+    elif action == "reassign":
+        sales_person = (data.get('sales_person') or "").strip()
+        if not sales_person:
+            raise ValueError("sales_person is required")
+        values["Sales_person"] = sales_person
+    return action, ids, values
+
+
+def _results(ids, done, status):
+    return [{"id": rfq_id, "status": status if rfq_id in done else "not_found"} for rfq_id in ids]
+
+
+def bulk_delete(supabase, ids):
+    """Deletes the RFQs and their lines: two calls."""
+    supabase.table("Part_details").delete().in_("rfq_id", ids).execute()
+    deleted = supabase.table("RFQ-Tracker").delete().in_("id", ids).execute().data or []
+    done = {row["id"] for row in deleted}
+    for rfq_id in ids:
+        if rfq_id in done:
+            notify_rfq_deleted(rfq_id)
+    return _results(ids, done, "deleted")
+
+
+def bulk_update(supabase, ids, values):
+    """Writes the same header `values` to every RFQ: two calls, the update and
+    one read back with the lines for the indexes listening on rfq saves."""
+    supabase.table("RFQ-Tracker").update(values).in_("id", ids).execute()
+    rows = supabase.table("RFQ-Tracker").select("*, Part_details(*)").in_("id", ids).execute().data or []
+    for row in rows:
+        notify_rfq_saved(row)
+    return _results(ids, {row["id"] for row in rows}, "updated")
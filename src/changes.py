@@ -0,0 +1,158 @@
+"""Change feed for the RFQ list: rows created or changed since a cursor,
+plus tombstones for deleted RFQs.
+
+The cursor is opaque to clients; it holds the (updated_at, id) of the
+last changed row seen and the (deleted_at, rfq_id) of the last tombstone, see
+sql/updated_at.sql and sql/rfq_tombstones.sql. Without the tombstone
+table the feed still reports changes, with no deletions; the tombstone
+position is then the time the cursor was issued, so applying the
+migration later does not replay old deletions.
+
+Both timestamps are set at transaction start, so a slow save can commit
+behind a cursor already handed out. Each poll therefore re-reads
+CHANGE_OVERLAP_SECONDS before the cursor; clients apply changes by id, so
+rows sent twice are harmless. A cursor returned with `more` is marked
+exact and resumes without the overlap, so a busy window cannot loop.
+
+Open /api/rfq-changes/stream connections sleep on feed.wait(): local
+saves and deletes wake them at once (rfq hooks); changes made elsewhere
+are noticed through the shared ETag data version, probed at most once
+per ETAG_VERSION_TTL for all streams together.
+"""
+import base64
+import json
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from src.config import Config
+from src.pagination import iter_changed_rows, rewind, _quote
+from src.hooks import on_rfq_saved, on_rfq_deleted
+
+TOMBSTONES = "rfq_tombstones"
+
+
+def _now():
+    return (datetime.now(timezone.utc).isoformat(), 0)
+
+
+def encode_feed_cursor(changed, deleted, exact=False):
+    """`changed` = (updated_at, id) or None (from the start); `deleted` =
+    (deleted_at, rfq_id) or None (from now). `exact` skips the overlap re-read."""
+    raw = json.dumps(list(changed or (None, None)) + list(deleted or _now()) + [int(exact)],
+                     separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_feed_cursor(cursor):
+    """-> ((updated_at, id) or None, (deleted_at, rfq_id), exact)."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        updated_at, row_id, deleted_at, deleted_id = values[:4]
+        exact = bool(values[4]) if len(values) > 4 else False
+    except Exception:
+        raise ValueError("Invalid cursor")
+    # Cursors issued before rfq_tombstones existed carry no tombstone position: follow from now
+    return ((updated_at, row_id) if updated_at is not None else None,
+            (deleted_at, deleted_id) if deleted_at is not None else _now(), exact)
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._has_tombstones = True
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def _missing_table(error):
+        text = str(error)
+        return "42P01" in text or "PGRST205" in text or (TOMBSTONES in text and "does not exist" in text)
+
+    def _no_tombstones(self, error):
+        """Turns deletions off for good when the table is missing; anything else
+        (a timeout, say) fails this request, so no deletion is skipped."""
+        if not self._missing_table(error):
+            raise error
+        print(f"Change feed without tombstones, run sql/rfq_tombstones.sql: {error}")
+        self._has_tombstones = False
+
+    # --- queries ---
+
+    def _latest_change(self, supabase):
+        res = (supabase.table("RFQ-Tracker").select("id, updated_at")
+               .order("updated_at", desc=True).order("id", desc=True).limit(1).execute())
+        return (res.data[0]["updated_at"], res.data[0]["id"]) if res.data else None
+
+    def _latest_tombstone(self, supabase):
+        if not self._has_tombstones:
+            return None
+        try:
+            res = (supabase.table(TOMBSTONES).select("rfq_id, deleted_at")
+                   .order("deleted_at", desc=True).order("rfq_id", desc=True).limit(1).execute())
+        except Exception as e:
+            self._no_tombstones(e)
+            return None
+        return (res.data[0]["deleted_at"], res.data[0]["rfq_id"]) if res.data else None
+
+    def head(self, supabase):
+        """A cursor for "now": following it returns only later changes."""
+        return encode_feed_cursor(self._latest_change(supabase), self._latest_tombstone(supabase))
+
+    def _tombstones(self, supabase, since, limit):
+        if not self._has_tombstones:
+            return []
+        try:
+            query = supabase.table(TOMBSTONES).select("rfq_id, deleted_at")
+            if since is not None:
+                # Keyset on (deleted_at, rfq_id): one delete can remove several RFQs at the same instant
+                value, rfq_id = since
+                v = _quote(value)
+                query = query.or_(f"deleted_at.gt.{v},and(deleted_at.eq.{v},rfq_id.gt.{rfq_id})")
+            return query.order("deleted_at").order("rfq_id").limit(limit).execute().data or []
+        except Exception as e:
+            self._no_tombstones(e)
+            return []
+
+    def changes(self, supabase, cursor, columns, limit=200):
+        """RFQs changed and ids deleted after `cursor`, oldest first.
+
+        Returns (rows, deleted ids, next cursor, more). With `more`, call
+        again with the next cursor straight away.
+        """
+        changed_since, deleted_since, exact = decode_feed_cursor(cursor)
+        overlap = 0 if exact else Config.CHANGE_OVERLAP_SECONDS
+        rows = list(islice(iter_changed_rows(supabase, "RFQ-Tracker", columns, since=rewind(changed_since, overlap),
+                                             page_size=limit + 1), limit + 1))
+        tombstones = self._tombstones(supabase, rewind(deleted_since, overlap), limit + 1)
+        more = len(rows) > limit or len(tombstones) > limit
+        rows, tombstones = rows[:limit], tombstones[:limit]
+
+        if rows:
+            changed_since = (rows[-1]["updated_at"], rows[-1]["id"])
+        if tombstones:
+            deleted_since = (tombstones[-1]["deleted_at"], tombstones[-1]["rfq_id"])
+        deleted = [t["rfq_id"] for t in tombstones]
+        return rows, deleted, encode_feed_cursor(changed_since, deleted_since, exact=more), more
+
+    # --- waiting ---
+
+    def notify(self, *_):
+        with self._cond:
+            self._seq += 1
+            self._cond.notify_all()
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def wait(self, seq, timeout):
+        """Blocks until a local write after `seq` or `timeout`; returns the current seq."""
+        with self._cond:
+            if self._seq == seq:
+                self._cond.wait(timeout)
+            return self._seq
+
+
+feed = ChangeFeed()
+on_rfq_saved(feed.notify)
+on_rfq_deleted(feed.notify)
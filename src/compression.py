@@ -0,0 +1,63 @@
+"""Negotiated gzip/brotli compression for buffered responses.
+
+Only bodies of at least COMPRESS_MIN_SIZE bytes with a text-like mimetype
+are compressed. Streamed responses (the exports), files and 304s are left
+alone. Brotli is used when the `brotli` package is installed and the
+client accepts it.
+"""
+import gzip
+from flask import request
+from src.metrics import phase
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ("application/json", "application/javascript", "image/svg+xml")
+
+
+def _compressible(response):
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding the client accepts: br, then gzip; None for identity."""
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=4):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def init_compression(app, min_size=1024, gzip_level=6, brotli_quality=4):
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or "Content-Encoding" in response.headers
+                or not _compressible(response)):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        with phase("compress"):
+            response.set_data(compress(data, encoding, gzip_level, brotli_quality))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    return compress_response
@@ -9,4 +9,101 @@ class Config:
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
     SECRET_KEY = os.getenv("SECRET_KEY")
-    EXCHANGE_RATE_API_KEY = os.environ.get('EXCHANGE_RATE_API_KEY')
\ No newline at end of file
+    EXCHANGE_RATE_API_KEY = os.environ.get('EXCHANGE_RATE_API_KEY')
+
+    # Writable per-install directory for snapshots, journals and local stores
+    DATA_DIR = os.getenv("QUOTE_TRACKER_DATA_DIR", os.path.join(os.path.expanduser("~"), ".quote_tracker"))
+
+    # Supabase HTTP pool shared by all clients; timeouts in seconds
+    SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+    SUPABASE_POOL_KEEPALIVE = int(os.getenv("SUPABASE_POOL_KEEPALIVE", "10"))
+    SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+    SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+    SUPABASE_READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "30"))
+    SUPABASE_POOL_TIMEOUT = float(os.getenv("SUPABASE_POOL_TIMEOUT", "10"))
+    SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "false").lower() in ("1", "true", "yes")
+
+    # Session cache: with the JWT secret set, access tokens are verified locally
+    SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+    SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "300"))
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "2048"))
+    ROLE_CACHE_TTL = int(os.getenv("ROLE_CACHE_TTL", "120"))
+    ROLE_CACHE_SIZE = int(os.getenv("ROLE_CACHE_SIZE", "1024"))
+
+    # RFQ saves: "direct" writes to Supabase in the request, "journal" queues them locally
+    SAVE_MODE = os.getenv("SAVE_MODE", "direct").lower()
+    JOURNAL_MAX_ATTEMPTS = int(os.getenv("JOURNAL_MAX_ATTEMPTS", "8"))
+    JOURNAL_POLL_INTERVAL = float(os.getenv("JOURNAL_POLL_INTERVAL", "2"))
+
+    # Background jobs (/api/jobs): worker threads, queue bound, days finished jobs are kept
+    JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_MAX_QUEUED = int(os.getenv("JOBS_MAX_QUEUED", "100"))
+    JOBS_RETENTION_DAYS = int(os.getenv("JOBS_RETENTION_DAYS", "7"))
+
+    # /api/list-users directory cache; signup/update/delete invalidate it
+    USER_DIRECTORY_TTL = int(os.getenv("USER_DIRECTORY_TTL", "300"))
+
+    # /api/list-rfq-entry keyset pagination
+    LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "50"))
+    LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "500"))
+
+    # /api/rfqs/bulk: RFQ ids accepted in one request
+    BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "500"))
+
+    # /api/rfq-changes/stream (SSE): open streams allowed, seconds between checks for
+    # remote changes, heartbeat interval and how long one stream lasts before the browser reconnects
+    CHANGE_STREAM_MAX_CLIENTS = int(os.getenv("CHANGE_STREAM_MAX_CLIENTS", "20"))
+    CHANGE_STREAM_POLL = float(os.getenv("CHANGE_STREAM_POLL", "5"))
+    CHANGE_STREAM_HEARTBEAT = float(os.getenv("CHANGE_STREAM_HEARTBEAT", "15"))
+    CHANGE_STREAM_MAX_SECONDS = float(os.getenv("CHANGE_STREAM_MAX_SECONDS", "300"))
+
+    # ETags on RFQ reads: how long a probed data version is trusted (local writes bump it at once)
+    ETAG_VERSION_TTL = float(os.getenv("ETAG_VERSION_TTL", "5"))
+
+    # Response encoding: "auto" uses orjson when installed; compress bodies from this size up
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+    # Request profiling: admins opt in per request (X-Profile: 1 / ?profile=1); sample this fraction of all requests
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+    # Print startup stages and append them to DATA_DIR/startup_times.jsonl
+    STARTUP_REPORT = os.getenv("STARTUP_REPORT", "false").lower() in ("1", "true", "yes")
+
+    # Request/upstream metrics on the admin-only /metrics; per-response Server-Timing header
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+    # In-process RFQ search index; rebuilt from Supabase after this many seconds
+    SEARCH_INDEX_TTL = int(os.getenv("SEARCH_INDEX_TTL", "300"))
+
+    # Report rollups behind /api/report-summary; rebuilt after this many seconds
+    REPORT_ROLLUP_TTL = int(os.getenv("REPORT_ROLLUP_TTL", "300"))
+    # Report days (grouping, date filters, the trend's "today") follow this IANA zone, like the browser did
+    REPORT_TIMEZONE = os.getenv("REPORT_TIMEZONE", "Asia/Kolkata")
+
+    # Part price history behind /api/part-history; rebuilt after this many seconds
+    PART_HISTORY_TTL = int(os.getenv("PART_HISTORY_TTL", "300"))
+
+    # /api/suggest autocomplete index; rebuilt after this many seconds, most suggestions per request
+    SUGGEST_INDEX_TTL = int(os.getenv("SUGGEST_INDEX_TTL", "300"))
+    SUGGEST_MAX_RESULTS = int(os.getenv("SUGGEST_MAX_RESULTS", "20"))
+
+    # Local SQLite read replica: "desktop" = only when app.py runs the FlaskUI window, "on", "off"
+    LOCAL_REPLICA = os.getenv("LOCAL_REPLICA", "desktop").lower()
+    REPLICA_SYNC_INTERVAL = float(os.getenv("REPLICA_SYNC_INTERVAL", "30"))
+    REPLICA_RECONCILE_EVERY = int(os.getenv("REPLICA_RECONCILE_EVERY", "10"))
+    # Part columns the replica may write to disk: those this role sees (pricing columns only for admin/pricing desks)
+    REPLICA_ROLE = os.getenv("REPLICA_ROLE", "sales").lower()
+
+    # updated_at is the transaction's start time, so a slow save can commit behind a change cursor;
+    # the replica sync and /api/rfq-changes re-read this many seconds before their cursor
+    CHANGE_OVERLAP_SECONDS = float(os.getenv("CHANGE_OVERLAP_SECONDS", "10"))
+
+    # USD/INR rate cache: served from memory/disk, refreshed in the background
+    FX_CACHE_TTL = int(os.getenv("FX_CACHE_TTL", "3600"))
+    FX_REFRESH_AHEAD = float(os.getenv("FX_REFRESH_AHEAD", "0.8"))
+    FX_REQUEST_TIMEOUT = float(os.getenv("FX_REQUEST_TIMEOUT", "5"))
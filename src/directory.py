@@ -0,0 +1,62 @@
+"""The user directory behind /api/list-users: profiles merged with auth emails.
+
+Profiles and the (paginated) auth user list are fetched concurrently and the
+merged result is cached until a signup, update or delete invalidates it.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from src.cache import TTLCache
+from src.config import Config
+
+AUTH_PAGE_SIZE = 1000  # GoTrue's per_page ceiling
+
+_cache = TTLCache(maxsize=1, ttl=Config.USER_DIRECTORY_TTL)
+
+
+def fetch_profiles(supabase):
+    return supabase.table("profiles").select("*").execute().data or []
+
+
+def fetch_auth_emails(supabase, page_size=AUTH_PAGE_SIZE):
+    """user_id -> email over every page of auth.admin.list_users()."""
+    emails, page = {}, 1
+    while True:
+        users = supabase.auth.admin.list_users(page=page, per_page=page_size) or []
+        for auth_user in users:
+            if auth_user.id and auth_user.email:
+                emails[str(auth_user.id)] = auth_user.email
+        if len(users) < page_size:
+            return emails
+        page += 1
+
+
+def load_directory(supabase):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        profiles_future = pool.submit(fetch_profiles, supabase)
+        emails_future = pool.submit(fetch_auth_emails, supabase)
+        profiles = profiles_future.result()
+        try:
+            emails = emails_future.result()
+        except Exception as e:
+            # Profiles are still useful without emails
+            print(f"Warning: Could not fetch email addresses: {e}")
+            emails = {}
+
+    for profile in profiles:
+        user_id = profile.get('user_id')
+        profile['email'] = emails.get(str(user_id)) if user_id else None
+    missing = sum(1 for p in profiles if p.get('user_id') and not p['email'])
+    if missing and emails:
+        print(f"No auth email found for {missing} profile(s)")
+    return profiles
+
+
+def get_directory(supabase):
+    profiles = _cache.get("directory")
+    if profiles is None:
+        profiles = load_directory(supabase)
+        _cache.set("directory", profiles)
+    return profiles
+
+
+def invalidate_directory():
+    _cache.clear()
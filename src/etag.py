@@ -0,0 +1,141 @@
+"""Weak ETags for RFQ reads.
+
+A view's tag hashes the data version with the caller's role and the full
+request path, so each role/query combination revalidates on its own. The
+data version is the newest `updated_at` plus the row counts of both tables
+(counts catch deletes), see sql/updated_at.sql. It is probed at most once
+per ETAG_VERSION_TTL seconds and bumped straight away by local writes, so
+a matching If-None-Match is answered with 304 without touching the data.
+While the local replica serves reads, its own version is used instead.
+
+Tags are weak: the same tag covers the gzip, brotli and identity bodies
+compression produces after the view. Without the updated_at column an
+edit made elsewhere cannot be seen by the probe, so no tag is sent at all.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from functools import wraps
+from flask import Response, make_response, request
+from src.config import Config
+from src.SupaClient import get_supabase
+from src.hooks import on_rfq_saved, on_rfq_deleted
+from src.replica import get_replica
+
+TABLES = ("RFQ-Tracker", "Part_details")
+
+
+class DataVersion:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._has_updated_at = True
+        # Without updated_at an edit elsewhere is invisible to the probe: no
+        # tags are sent then, and versions are never reused across restarts.
+        self._boot = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _missing_column(error):
+        text = str(error)
+        return "updated_at" in text and ("42703" in text or "PGRST" in text or "does not exist" in text)
+
+    @property
+    def exact(self):
+        """False once the probe has fallen back to counts and ids, which miss edits."""
+        return self._has_updated_at
+
+    def _probe_table(self, supabase, table):
+        if self._has_updated_at:
+            try:
+                res = (supabase.table(table).select("updated_at", count="exact")
+                       .order("updated_at", desc=True, nullsfirst=False).limit(1).execute())
+                return f"{res.count}:{res.data[0]['updated_at'] if res.data else ''}"
+            except Exception as e:
+                if not self._missing_column(e):
+                    raise  # timeouts and the like: probe again next time
+                print(f"ETag probe without updated_at, run sql/updated_at.sql ({table}): {e}")
+                self._has_updated_at = False
+        res = supabase.table(table).select("id", count="exact").order("id", desc=True).limit(1).execute()
+        return f"{res.count}:{res.data[0]['id'] if res.data else ''}"
+
+    def current(self, supabase):
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                return self._value
+            generation = self._generation
+
+        parts = [self._probe_table(supabase, table) for table in TABLES]
+        if not self._has_updated_at:
+            parts.append(self._boot)
+        parts.append(str(generation))
+        value = "|".join(parts)
+
+        with self._lock:
+            if generation == self._generation:
+                self._value = value
+                self._expires_at = time.monotonic() + self.ttl
+        return value
+
+    def bump(self, *_):
+        with self._lock:
+            self._generation += 1
+            self._value = None
+
+
+data_version = DataVersion(ttl=Config.ETAG_VERSION_TTL)
+on_rfq_saved(data_version.bump)
+on_rfq_deleted(data_version.bump)
+
+
+def current_version(role=None):
+    """The data version reads are tagged with: the replica's while it serves `role`'s reads."""
+    local = get_replica(role)
+    return local.version() if local else data_version.current(get_supabase())
+
+
+def tag_version(role=None):
+    """The version to tag `role`'s reads with, or None when it would miss edits."""
+    local = get_replica(role)
+    if local is not None:
+        return local.version()
+    version = data_version.current(get_supabase())
+    return version if data_version.exact else None
+
+
+def view_etag(version, role):
+    raw = f"{version}|{role}|{request.full_path}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional(f):
+    """Decorator for GET views that take `user` first (below login_required).
+
+    Answers 304 when If-None-Match carries the current tag; otherwise tags
+    the 200 response. Clients must revalidate every time (no-cache).
+    """
+    @wraps(f)
+    def wrapper(user, *args, **kwargs):
+        try:
+            role = getattr(user, 'role', None)
+            version = tag_version(role)
+        except Exception as e:
+            print(f"ETag skipped: {e}")
+            version = None
+        if version is None:
+            return f(user, *args, **kwargs)
+        etag = view_etag(version, role)
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(f(user, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,114 @@
+"""Streaming CSV/XLSX export of RFQs flattened to one row per part line."""
+import csv
+import io
+import tempfile
+from src.pagination import iter_rows
+from src.projection import build_select, visible_part_columns
+
+# (column title, RFQ-Tracker field) and (column title, Part_details field)
+HEADER_COLUMNS = [
+    ("Date", "created_at"),
+    ("RFQ No", "RFQ-no"),
+    ("Company", "Company_name"),
+    ("Customer Name", "Customer_name"),
+    ("Customer Email", "Customer_email"),
+    ("Purpose", "RFQ_purpose"),
+    ("Sales Person", "Sales_person"),
+    ("Tentative Date", "Tentative_date"),
+]
+PART_COLUMNS = [
+    ("Part No", "RFQ-part-no"),
+    ("Quoted Part No", "Quoted-part-no"),
+    ("Supplier", "Supplier"),
+    ("Date Code", "Date Code"),
+    ("RFQ Qty", "RFQ Qty"),
+    ("Quoted Qty", "Quoted Qty"),
+    ("Make", "Make"),
+    ("Lead", "Lead"),
+    ("Source", "Source"),
+    ("Unit Price ($)", "Unit$"),
+    ("Unit Price (₹)", "Unit₹"),
+    ("Exchange Rate", "Exchange_rate"),
+    ("Freight", "Freight"),
+    ("Insurance", "Insurance"),
+    ("BCD", "BCD"),
+    ("Bank", "Bank"),
+    ("Clearance", "Clearance"),
+    ("Margin", "Margin"),
+    ("Resale (₹)", "Resale"),
+    ("TP (₹)", "TP"),
+    ("Remarks", "Remarks"),
+]
+TITLES = [title for title, _ in HEADER_COLUMNS + PART_COLUMNS]
+
+PAGE_SIZE = 200
+CSV_FLUSH_ROWS = 500
+
+
+def export_part_columns(role):
+    """PART_COLUMNS without the pricing columns `role` may not see."""
+    visible = visible_part_columns(role)
+    return [(title, field) for title, field in PART_COLUMNS if field in visible]
+
+
+def export_titles(role):
+    return [title for title, _ in HEADER_COLUMNS + export_part_columns(role)]
+
+
+def iter_export_rows(supabase, role, page_size=PAGE_SIZE):
+    """Yields flat rows (lists) for every part line, one RFQ page in memory at a time.
+
+    Rows line up with export_titles(role); hidden columns are never selected.
+    """
+    part_columns = export_part_columns(role)
+    fields = ",".join([field for _, field in HEADER_COLUMNS]
+                      + [f"Part_details.{field}" for _, field in part_columns])
+    for rfq in iter_rows(supabase, "RFQ-Tracker", build_select(role, fields), page_size=page_size):
+        header = [rfq.get(field) for _, field in HEADER_COLUMNS]
+        if header[0]:
+            header[0] = str(header[0])[:10]
+        parts = rfq.get("Part_details") or []
+        if not parts:
+            yield header + [None] * len(part_columns)
+            continue
+        for part in parts:
+            yield header + [part.get(field) for _, field in part_columns]
+
+
+def stream_csv(rows, titles=TITLES):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel reads the ₹ columns as UTF-8
+    yield "\ufeff"
+    writer.writerow(titles)
+    pending = 1
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CSV_FLUSH_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def stream_xlsx(rows, titles=TITLES, chunk_size=64 * 1024):
+    """openpyxl's write-only mode keeps memory flat, but the zip container has to
+    be finished before it can be sent, so it is spooled to a temp file first."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("RFQs")
+    sheet.append(titles)
+    for row in rows:
+        sheet.append(row)
+
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
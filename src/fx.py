@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from src.config import Config
+from src.metrics import record_upstream
+
+RETRY_BASE = 30  # seconds before retrying a failed fetch; doubles per failure, capped at the ttl
+
+
+def fetch_usd_inr():
+    """One round trip to exchangerate-api.com. Returns {"rate", "updated"}."""
+    import requests  # only needed once a rate has to be fetched
+    url = f"https://v6.exchangerate-api.com/v6/{Config.EXCHANGE_RATE_API_KEY}/latest/USD"
+    start = time.perf_counter()
+    try:
+        res = requests.get(url, timeout=Config.FX_REQUEST_TIMEOUT)
+    except Exception:
+        record_upstream("exchange_rate", "latest/USD", "GET", "error", time.perf_counter() - start)
+        raise
+    record_upstream("exchange_rate", "latest/USD", "GET", res.status_code, time.perf_counter() - start,
+                    len(res.content))
+    res.raise_for_status()
+    data = res.json()
+
+    rate = data.get("conversion_rates", {}).get("INR")
+    if not rate:
+        raise ValueError("INR rate missing from provider response")
+    return {"rate": rate, "updated": data.get("time_last_update_utc")}
+
+
+class RateCache:
+    """Keeps the last good rate in memory and on disk.
+
+    Reads never wait on the provider once a rate is known: a rate older than
+    `refresh_ahead * ttl` triggers a background refresh, and an expired one is
+    still served (flagged stale) while that refresh runs. Only the very first
+    read with no snapshot blocks. Concurrent refreshes collapse into one call.
+    After a failed fetch the next attempt waits `RETRY_BASE` seconds, doubling
+    per consecutive failure up to `ttl`, so a provider outage is not hit on
+    every request.
+    """
+
+    def __init__(self, fetch, ttl=3600, snapshot_path=None, refresh_ahead=0.8, wait_timeout=10):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.refresh_ahead = refresh_ahead
+        self.wait_timeout = wait_timeout
+        self.last_error = None
+        self._value = None       # {"rate", "updated", "fetched_at"}; fetched_at is epoch seconds
+        self._lock = threading.Lock()
+        self._inflight = None    # threading.Event while a fetch is running
+        self._snapshot_loaded = False
+        self._failures = 0
+        self._failed_at = None   # monotonic time of the last failed fetch
+
+    def _age(self, value):
+        return time.time() - value["fetched_at"]
+
+    def get(self):
+        """Returns (value, stale). Raises only when no rate has ever been fetched."""
+        value = self._value
+        if value is None and not self._snapshot_loaded:
+            value = self._load_snapshot()
+
+        if value is None:
+            if self._backing_off():
+                raise self.last_error
+            self.refresh()
+            value = self._value
+            if value is None:
+                raise self.last_error or RuntimeError("Exchange rate unavailable")
+            return value, False
+
+        age = self._age(value)
+        if age >= self.ttl * self.refresh_ahead:
+            self.refresh_async()
+        return value, age >= self.ttl
+
+    def refresh(self):
+        """Fetches a new rate; if one is already being fetched, waits for it instead."""
+        with self._lock:
+            event = self._inflight
+            leader = event is None
+            if leader:
+                event = self._inflight = threading.Event()
+
+        if not leader:
+            event.wait(self.wait_timeout)
+            return
+
+        try:
+            value = dict(self.fetch(), fetched_at=time.time())
+            self._value = value
+            self.last_error = None
+            self._failures, self._failed_at = 0, None
+            self._save_snapshot(value)
+        except Exception as e:
+            self.last_error = e
+            self._failures += 1
+            self._failed_at = time.monotonic()
+            print(f"Exchange rate refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+
+    def _backing_off(self):
+        if self._failed_at is None:
+            return False
+        delay = min(self.ttl, RETRY_BASE * 2 ** (self._failures - 1))
+        return time.monotonic() - self._failed_at < delay
+
+    def refresh_async(self):
+        if self._inflight is None and not self._backing_off():
+            threading.Thread(target=self.refresh, name="fx-refresh", daemon=True).start()
+
+    def _load_snapshot(self):
+        self._snapshot_loaded = True
+        if not self.snapshot_path:
+            return None
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                value = json.load(f)
+            if value.get("rate") and value.get("fetched_at"):
+                self._value = value
+                return value
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable exchange rate snapshot: {e}")
+        return None
+
+    def _save_snapshot(self, value):
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            print(f"Could not write exchange rate snapshot: {e}")
+
+
+usd_inr_cache = RateCache(
+    fetch_usd_inr,
+    ttl=Config.FX_CACHE_TTL,
+    snapshot_path=os.path.join(Config.DATA_DIR, "usd_inr.json"),
+    refresh_ahead=Config.FX_REFRESH_AHEAD,
+    wait_timeout=Config.FX_REQUEST_TIMEOUT * 2,
+)
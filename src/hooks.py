@@ -0,0 +1,31 @@
+"""In-process notifications for RFQ writes.
+
+Indexes and caches register here instead of being called one by one from
+the routes. `rfq` is a row shaped like `RFQ-Tracker` with its
+`Part_details` list embedded, the same shape list-rfq-entry returns.
+"""
+
+_saved_listeners = []
+_deleted_listeners = []
+
+def on_rfq_saved(fn):
+    _saved_listeners.append(fn)
+    return fn
+
+def on_rfq_deleted(fn):
+    _deleted_listeners.append(fn)
+    return fn
+
+def notify_rfq_saved(rfq):
+    for fn in _saved_listeners:
+        try:
+            fn(rfq)
+        except Exception as e:
+            print(f"rfq_saved listener {fn.__name__} failed: {e}")
+
+def notify_rfq_deleted(rfq_id):
+    for fn in _deleted_listeners:
+        try:
+            fn(rfq_id)
+        except Exception as e:
+            print(f"rfq_deleted listener {fn.__name__} failed: {e}")
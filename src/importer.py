@@ -0,0 +1,323 @@
+"""Bulk RFQ import from CSV/XLSX.
+
+One row per part line, header fields repeated (the layout /api/export
+writes). Consecutive rows with the same RFQ No make up one RFQ. Headers
+and parts are inserted in large batches; a failed batch is split in
+halves down to the offending rows. An RFQ is imported whole or not at
+all: an RFQ with an invalid part line is skipped, and when one of its
+lines cannot be inserted its header and other lines are deleted again.
+Every rejected row is reported.
+"""
+import csv
+import io
+import re
+from datetime import datetime
+from src.export import HEADER_COLUMNS, PART_COLUMNS
+
+RFQ_FIELDS = [
+    "RFQ-no", "Company_name", "Sales_person", "Customer_name", "Customer_email", "Customer_phone",
+    "Customer_address_1", "Customer_address_2", "Customer_city", "Customer_state", "Customer_pincode",
+    "Customer_country", "RFQ_purpose", "Tentative_date", "created_at",
+]
+PART_FIELDS = [field for _, field in PART_COLUMNS]
+REQUIRED_RFQ_FIELDS = ("RFQ-no", "Company_name", "Sales_person")
+INT_FIELDS = ("RFQ Qty", "Quoted Qty")
+FLOAT_FIELDS = ("Unit$", "Unit₹", "Exchange_rate", "Freight", "Insurance", "BCD", "Bank", "Clearance",
+                "Margin", "Resale")
+SOURCES = ("Import", "Local")
+
+HEADER_BATCH = 500      # RFQs per header insert
+PART_BATCH = 1000       # rows per Part_details insert
+FLUSH_PARTS = 4000      # flush early when the pending batch holds this many lines
+MAX_REPORTED_ERRORS = 1000
+
+
+def _key(name):
+    return re.sub(r"[^a-z0-9$₹]", "", str(name or "").lower())
+
+
+# normalised column title -> (target, field); accepts export titles and raw column names
+ALIASES = {}
+for _title, _field in HEADER_COLUMNS:
+    ALIASES[_key(_title)] = ("rfq", _field)
+for _title, _field in PART_COLUMNS:
+    ALIASES[_key(_title)] = ("part", _field)
+for _field in RFQ_FIELDS:
+    ALIASES[_key(_field)] = ("rfq", _field)
+for _field in PART_FIELDS:
+    ALIASES[_key(_field)] = ("part", _field)
+
+
+class RowError(ValueError):
+    pass
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and value.strip() in ("", "---"))
+
+
+def _float(field, value):
+    try:
+        # "1,250.50" as typed in Excel
+        return float(str(value).replace(",", "")) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{field} must be a number, got {value!r}")
+
+
+def _int(field, value):
+    number = _float(field, value)
+    if number < 0 or not number.is_integer():
+        raise RowError(f"{field} must be a whole number >= 0, got {value!r}")
+    return int(number)
+
+
+def _date(field, value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(text[:10], fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise RowError(f"{field} is not a date: {value!r}")
+
+
+def validate_header(values):
+    header = {}
+    for field in RFQ_FIELDS:
+        value = values.get(field)
+        if _blank(value):
+            continue
+        if field in ("Tentative_date", "created_at"):
+            header[field] = _date(field, value)
+        else:
+            header[field] = str(value).strip()
+    missing = [f for f in REQUIRED_RFQ_FIELDS if f not in header]
+    if missing:
+        raise RowError(f"Missing required field(s): {', '.join(missing)}")
+    return header
+
+
+def validate_part(values):
+    """Returns a Part_details row, or None for a header-only line."""
+    if all(_blank(values.get(f)) for f in PART_FIELDS):
+        return None
+    part = {}
+    for field in PART_FIELDS:
+        value = values.get(field)
+        if _blank(value):
+            part[field] = None
+        elif field in INT_FIELDS:
+            part[field] = _int(field, value)
+        elif field in FLOAT_FIELDS:
+            part[field] = _float(field, value)
+        else:
+            part[field] = str(value).strip()
+    if part["RFQ-part-no"] is None:
+        raise RowError("Part No is required on a part line")
+    if part["Source"] is not None and part["Source"] not in SOURCES:
+        raise RowError(f"Source must be one of {SOURCES}, got {part['Source']!r}")
+    return part
+
+
+def iter_csv(stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    yield from csv.reader(text)
+
+
+def iter_xlsx(stream):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_records(rows):
+    """Maps raw rows onto fields. Yields (row_number, {"rfq": {...}, "part": {...}})."""
+    rows = iter(rows)
+    titles = next(rows, None)
+    if not titles:
+        raise ValueError("The file is empty")
+    columns = [ALIASES.get(_key(t)) for t in titles]
+    if not any(c and c[1] == "RFQ-no" for c in columns):
+        raise ValueError("No 'RFQ No' column found in the header row")
+
+    for number, row in enumerate(rows, start=2):
+        if not row or all(_blank(v) for v in row):
+            continue
+        record = {"rfq": {}, "part": {}}
+        for column, value in zip(columns, row):
+            if column:
+                record[column[0]][column[1]] = value
+        yield number, record
+
+
+class RFQImporter:
+    def __init__(self, supabase, created_by=None, dry_run=False, on_created=None):
+        self.supabase = supabase
+        self.created_by = created_by
+        self.dry_run = dry_run
+        self.on_created = on_created
+        self.rows = 0
+        self.rfqs_created = 0
+        self.parts_created = 0
+        self.errors = []
+        self._error_count = 0
+        self._batch = []  # [(header, [(row_number, part)], [row_numbers])]
+
+    def error(self, row, rfq_no, message):
+        self._error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "rfq_no": rfq_no, "error": message})
+
+    def run(self, records):
+        group_key, group_rows = None, []
+        for number, record in records:
+            self.rows += 1
+            rfq_no = record["rfq"].get("RFQ-no")
+            key = str(rfq_no).strip() if not _blank(rfq_no) else None
+            if group_rows and key != group_key:
+                self._add_group(group_rows)
+                group_rows = []
+            group_key = key
+            group_rows.append((number, record))
+        if group_rows:
+            self._add_group(group_rows)
+        self._flush()
+        return self.report()
+
+    def _add_group(self, group_rows):
+        first_number, first = group_rows[0]
+        rfq_no = first["rfq"].get("RFQ-no")
+        try:
+            header = validate_header(first["rfq"])
+        except RowError as e:
+            self.error(first_number, rfq_no, str(e))
+            for number, _ in group_rows[1:]:
+                self.error(number, rfq_no, "Skipped: RFQ header is invalid")
+            return
+        if self.created_by:
+            header["created_by"] = self.created_by
+
+        parts, numbers, invalid = [], [], {}
+        for number, record in group_rows:
+            numbers.append(number)
+            try:
+                part = validate_part(record["part"])
+            except RowError as e:
+                invalid[number] = str(e)
+                continue
+            if part is not None:
+                parts.append((number, part))
+        if invalid:
+            # Whole or not at all: the RFQ waits for a corrected file
+            for number in numbers:
+                self.error(number, rfq_no, invalid.get(number, "Not imported: another line of this RFQ is invalid"))
+            return
+
+        self._batch.append((header, parts, numbers))
+        if len(self._batch) >= HEADER_BATCH or sum(len(p) for _, p, _ in self._batch) >= FLUSH_PARTS:
+            self._flush()
+
+    def _insert_headers(self, batch):
+        """Inserts a batch of headers; returns ids aligned with it (None = failed)."""
+        try:
+            res = self.supabase.table("RFQ-Tracker").insert([header for header, _, _ in batch]).execute()
+            return [row["id"] for row in res.data]
+        except Exception:
+            # Isolate the offending rows
+            ids = []
+            for header, _, numbers in batch:
+                try:
+                    res = self.supabase.table("RFQ-Tracker").insert(header).execute()
+                    ids.append(res.data[0]["id"])
+                except Exception as e:
+                    for number in numbers:
+                        self.error(number, header.get("RFQ-no"), f"Insert failed: {e}")
+                    ids.append(None)
+            return ids
+
+    def _insert_parts(self, chunk, failed):
+        """Inserts [(row_number, row)]; a failing chunk is split in halves down to
+        the bad rows, which land in `failed` as {row_number: error}. Returns the
+        rows stored."""
+        try:
+            return self.supabase.table("Part_details").insert([row for _, row in chunk]).execute().data or []
+        except Exception as e:
+            if len(chunk) == 1:
+                failed[chunk[0][0]] = str(e)
+                return []
+        middle = len(chunk) // 2
+        return self._insert_parts(chunk[:middle], failed) + self._insert_parts(chunk[middle:], failed)
+
+    def _roll_back(self, rfq_ids):
+        """Deletes RFQs whose lines did not all go in; returns False if that failed too."""
+        try:
+            self.supabase.table("Part_details").delete().in_("rfq_id", rfq_ids).execute()
+            self.supabase.table("RFQ-Tracker").delete().in_("id", rfq_ids).execute()
+            return True
+        except Exception as e:
+            print(f"Import roll back of RFQs {rfq_ids} failed: {e}")
+            return False
+
+    def _flush(self):
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        if self.dry_run:
+            self.rfqs_created += len(batch)
+            self.parts_created += sum(len(parts) for _, parts, _ in batch)
+            return
+
+        ids = self._insert_headers(batch)
+        part_rows, owners = [], {}
+        for rfq_id, (header, parts, numbers) in zip(ids, batch):
+            if rfq_id is None:
+                continue
+            part_rows.extend((number, dict(part, rfq_id=rfq_id)) for number, part in parts)
+            owners[rfq_id] = (header, numbers)
+
+        failed, stored = {}, []
+        for i in range(0, len(part_rows), PART_BATCH):
+            stored.extend(self._insert_parts(part_rows[i:i + PART_BATCH], failed))
+
+        broken = {row["rfq_id"] for number, row in part_rows if number in failed}
+        rolled_back = self._roll_back(sorted(broken)) if broken else True
+        for rfq_id in broken:
+            header, numbers = owners[rfq_id]
+            for number in numbers:
+                if number in failed:
+                    self.error(number, header.get("RFQ-no"), f"Part insert failed: {failed[number]}")
+                elif rolled_back:
+                    self.error(number, header.get("RFQ-no"), "Not imported: another line of this RFQ failed")
+            if not rolled_back:
+                self.error(numbers[0], header.get("RFQ-no"),
+                           "Imported without its failed lines: removing it again failed")
+
+        by_rfq = {}
+        for row in stored:
+            by_rfq.setdefault(row["rfq_id"], []).append(row)
+        for rfq_id, (header, _) in owners.items():
+            if rfq_id in broken and rolled_back:
+                continue
+            self.rfqs_created += 1
+            self.parts_created += len(by_rfq.get(rfq_id, []))
+            if self.on_created:
+                # Only the lines actually written reach the indexes
+                self.on_created({**header, "id": rfq_id, "Part_details": by_rfq.get(rfq_id, [])})
+
+    def report(self):
+        return {
+            "rows": self.rows,
+            "rfqs_created": self.rfqs_created,
+            "parts_created": self.parts_created,
+            "error_count": self._error_count,
+            "errors": self.errors,
+            "dry_run": self.dry_run,
+        }
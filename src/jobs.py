@@ -0,0 +1,382 @@
+"""Background jobs for work too long for a request: repricing, exports,
+imports and index rebuilds.
+
+Jobs are rows in DATA_DIR/jobs.sqlite3 run by a bounded thread pool
+(JOBS_WORKERS). Threads rather than processes, since the handlers share
+the Supabase pool, the rfq hooks and the in-process indexes. At most
+JOBS_MAX_QUEUED jobs wait at a time; submit() refuses more.
+
+A handler gets a JobContext to report progress and to notice a cancel
+request (ctx.check() raises JobCancelled). Bulky output goes to a file
+under DATA_DIR/jobs, served by /api/jobs/<id>/result; the row keeps a
+small JSON summary. Finished jobs older than JOBS_RETENTION_DAYS are pruned
+at start and then every PRUNE_INTERVAL seconds. Jobs still queued at shutdown run again on the next
+start of the runner (first use after a restart); a job cut off mid-run
+is marked failed.
+
+Status per job: queued -> running -> succeeded | failed | cancelled.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from src.config import Config
+from src.SupaClient import get_supabase
+from src.export import iter_export_rows, export_titles, stream_csv, stream_xlsx
+from src.importer import RFQImporter, iter_records, iter_csv, iter_xlsx
+from src.hooks import notify_rfq_saved
+from src.pricing import price_items, parse_request, request_items
+from src.reports import report_rollups
+from src.search import search_index
+from src.part_history import part_history
+from src.suggest import suggest_index
+
+SCHEMA = """
+create table if not exists jobs (
+    id integer primary key autoincrement,
+    kind text not null,
+    status text not null default 'queued',
+    user_id text,
+    role text,
+    params text not null,
+    created_at text not null,
+    updated_at text not null,
+    started_at text,
+    finished_at text,
+    progress integer not null default 0,
+    total integer,
+    message text,
+    cancel_requested integer not null default 0,
+    result text,
+    result_file text,
+    error text
+);
+create index if not exists jobs_status on jobs (status, id);
+create index if not exists jobs_user on jobs (user_id, id);
+"""
+
+STATUS_COLUMNS = ("id", "kind", "status", "progress", "total", "message", "result", "error",
+                  "created_at", "started_at", "finished_at", "cancel_requested", "result_file", "user_id")
+FINISHED = ("succeeded", "failed", "cancelled")
+PROGRESS_INTERVAL = 0.5  # seconds between progress writes
+PRUNE_INTERVAL = 3600    # seconds between prune runs
+
+# kind -> (handler, roles allowed to submit it; None for any signed-in user)
+HANDLERS = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+def job_kind(name, roles=("admin",)):
+    def decorator(fn):
+        HANDLERS[name] = (fn, tuple(roles) if roles is not None else None)
+        return fn
+    return decorator
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobContext:
+    """What a handler gets: its params, progress reporting and cancellation."""
+
+    def __init__(self, runner, job_id, params, user_id, role):
+        self.runner = runner
+        self.id = job_id
+        self.params = params
+        self.user_id = user_id
+        self.role = role
+        self._last_write = 0.0
+
+    def output_path(self, ext):
+        return os.path.join(self.runner.directory, f"{self.id}.{ext}")
+
+    def progress(self, done, total=None, message=None, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        values = {"progress": int(done)}
+        if total is not None:
+            values["total"] = int(total)
+        if message is not None:
+            values["message"] = message
+        self.runner._update(self.id, **values)
+
+    def check(self):
+        if self.runner._cancel_requested(self.id):
+            raise JobCancelled()
+
+
+class JobRunner:
+    def __init__(self, path, directory, workers=2, max_queued=100, retention_days=7):
+        self.path = path
+        self.directory = directory
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention_days = retention_days
+        self._local = threading.local()
+        self._pool = None
+        self._stop = threading.Event()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            self._local.conn = conn
+        return conn
+
+    def _update(self, job_id, **values):
+        values["updated_at"] = _now()
+        assignments = ", ".join(f"{k} = ?" for k in values)
+        conn = self._conn()
+        with conn:
+            conn.execute(f"update jobs set {assignments} where id = ?", (*values.values(), job_id))
+
+    def _cancel_requested(self, job_id):
+        row = self._conn().execute("select cancel_requested from jobs where id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        with conn:
+            conn.execute("update jobs set status = 'failed', error = 'Interrupted by a restart', finished_at = ?,"
+                         " updated_at = ? where status = 'running'", (_now(), _now()))
+        self.prune()
+        for (job_id,) in conn.execute("select id from jobs where status = 'queued' order by id").fetchall():
+            self._pool.submit(self._run, job_id)
+        threading.Thread(target=self._prune_loop, name="job-prune", daemon=True).start()
+        return self
+
+    def _prune_loop(self):
+        while not self._stop.wait(PRUNE_INTERVAL):
+            try:
+                self.prune()
+            except Exception as e:
+                print(f"Job prune failed: {e}")
+
+    def prune(self):
+        """Drops finished jobs (and their files) older than retention_days."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).isoformat()
+        conn = self._conn()
+        old = conn.execute("select id, result_file from jobs where status in ('succeeded', 'failed', 'cancelled')"
+                           " and updated_at < ?", (cutoff,)).fetchall()
+        for row in old:
+            if row["result_file"]:
+                try:
+                    os.remove(os.path.join(self.directory, row["result_file"]))
+                except FileNotFoundError:
+                    pass
+        with conn:
+            conn.executemany("delete from jobs where id = ?", [(row["id"],) for row in old])
+        # Uploads of imports that never ran (cancelled while queued)
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith("upload-") and os.path.getmtime(path) < time.time() - self.retention_days * 86400:
+                os.remove(path)
+
+    # --- producer side ---
+
+    def submit(self, kind, params, user_id, role):
+        """Queues a job; returns its id. Raises KeyError for an unknown kind,
+        PermissionError when `role` may not run it, JobQueueFull when busy."""
+        if kind not in HANDLERS:
+            raise KeyError(kind)
+        roles = HANDLERS[kind][1]
+        if roles is not None and role not in roles:
+            raise PermissionError(f"Forbidden: {role} cannot run {kind} jobs")
+        conn = self._conn()
+        queued = conn.execute("select count(*) from jobs where status = 'queued'").fetchone()[0]
+        if queued >= self.max_queued:
+            raise JobQueueFull(f"{queued} jobs are already queued, try again later")
+        now = _now()
+        with conn:
+            cur = conn.execute(
+                "insert into jobs (kind, user_id, role, params, created_at, updated_at) values (?, ?, ?, ?, ?, ?)",
+                (kind, str(user_id) if user_id else None, role, json.dumps(params), now, now))
+        self._pool.submit(self._run, cur.lastrowid)
+        return cur.lastrowid
+
+    def get(self, job_id):
+        row = self._conn().execute(f"select {', '.join(STATUS_COLUMNS)} from jobs where id = ?",
+                                   (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def list(self, user_id=None, limit=50):
+        """Newest jobs first; only `user_id`'s when given."""
+        where, params = ("where user_id = ?", [str(user_id)]) if user_id is not None else ("", [])
+        rows = self._conn().execute(f"select id from jobs {where} order by id desc limit ?",
+                                    params + [limit]).fetchall()
+        return [self.get(row["id"]) for row in rows]
+
+    def cancel(self, job_id):
+        """Cancels a queued job at once; asks a running one to stop at its next check."""
+        conn = self._conn()
+        now = _now()
+        with conn:
+            conn.execute("update jobs set status = 'cancelled', cancel_requested = 1, finished_at = ?,"
+                         " updated_at = ? where id = ? and status = 'queued'", (now, now, job_id))
+            conn.execute("update jobs set cancel_requested = 1, updated_at = ? where id = ? and status = 'running'",
+                         (now, job_id))
+        return self.get(job_id)
+
+    def result_path(self, job):
+        return os.path.join(self.directory, job["result_file"]) if job and job.get("result_file") else None
+
+    # --- worker side ---
+
+    def _run(self, job_id):
+        conn = self._conn()
+        with conn:
+            claimed = conn.execute("update jobs set status = 'running', started_at = ?, updated_at = ?"
+                                   " where id = ? and status = 'queued'", (_now(), _now(), job_id)).rowcount
+        if not claimed:
+            return  # cancelled while it waited
+        row = conn.execute("select kind, params, user_id, role from jobs where id = ?", (job_id,)).fetchone()
+        ctx = JobContext(self, job_id, json.loads(row["params"]), row["user_id"], row["role"])
+        try:
+            handler = HANDLERS[row["kind"]][0]
+            result, result_file = handler(ctx)
+            self._update(job_id, status="succeeded", finished_at=_now(), result=json.dumps(result),
+                         result_file=result_file)
+        except JobCancelled:
+            self._update(job_id, status="cancelled", finished_at=_now())
+        except Exception as e:
+            print(f"Job {job_id} ({row['kind']}) failed: {e}")
+            self._update(job_id, status="failed", finished_at=_now(), error=str(e))
+
+    def stop(self):
+        self._stop.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """The running job runner, started on first use (also resumes queued jobs)."""
+    global runner
+    with _runner_lock:
+        if runner is None:
+            runner = JobRunner(os.path.join(Config.DATA_DIR, "jobs.sqlite3"),
+                               os.path.join(Config.DATA_DIR, "jobs"),
+                               workers=Config.JOBS_WORKERS,
+                               max_queued=Config.JOBS_MAX_QUEUED,
+                               retention_days=Config.JOBS_RETENTION_DAYS).start()
+    return runner
+
+
+# --- job kinds ---
+# A handler returns (summary dict, result file name or None).
+
+@job_kind("reprice", roles=("admin", "pricing"))
+def reprice_job(ctx):
+    """price-items for a large selection: `rfq_ids`, `open` or `items`."""
+    rates, exchange_rate = parse_request(ctx.params)
+    ctx.progress(0, message="Loading part lines", force=True)
+    items = request_items(get_supabase(), ctx.params)
+    ctx.check()
+    ctx.progress(0, len(items), "Pricing", force=True)
+    priced = price_items(items, rates, exchange_rate)
+    with open(ctx.output_path("json"), "w", encoding="utf-8") as f:
+        json.dump({"count": len(priced), "items": priced}, f)
+    ctx.progress(len(priced), len(priced), "Done", force=True)
+    return {"count": len(priced)}, f"{ctx.id}.json"
+
+
+@job_kind("export", roles=None)
+def export_job(ctx):
+    """The /api/export file, written to disk; columns follow the submitter's role,
+    so anyone signed in may run it, like the route."""
+    fmt = ctx.params.get("format", "csv")
+    if fmt not in ("csv", "xlsx"):
+        raise ValueError("format must be csv or xlsx")
+    count = 0
+
+    def rows():
+        nonlocal count
+        for row in iter_export_rows(get_supabase(), ctx.role):
+            count += 1
+            if count % 500 == 0:
+                ctx.check()
+                ctx.progress(count, message="Exporting rows")
+            yield row
+
+    titles = export_titles(ctx.role)
+    if fmt == "csv":
+        with open(ctx.output_path("csv"), "w", encoding="utf-8", newline="") as f:
+            for chunk in stream_csv(rows(), titles):
+                f.write(chunk)
+    else:
+        with open(ctx.output_path("xlsx"), "wb") as f:
+            for chunk in stream_xlsx(rows(), titles):
+                f.write(chunk)
+    ctx.progress(count, count, "Done", force=True)
+    return {"rows": count, "format": fmt}, f"{ctx.id}.{fmt}"
+
+
+@job_kind("import", roles=("admin", "pricing"))
+def import_job(ctx):
+    """/api/import-rfqs on an upload saved to disk at submission (`upload`)."""
+    path = ctx.params["upload"]
+    try:
+        with open(path, "rb") as f:
+            rows = iter_xlsx(f) if path.endswith(".xlsx") else iter_csv(f)
+            importer = RFQImporter(get_supabase(), created_by=ctx.user_id, dry_run=bool(ctx.params.get("dry_run")),
+                                   on_created=notify_rfq_saved)
+
+            def records():
+                for number, record in iter_records(rows):
+                    if number % 200 == 0:
+                        ctx.check()
+                        ctx.progress(number, message=f"{importer.rfqs_created} RFQs created")
+                    yield number, record
+
+            report = importer.run(records())
+    finally:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    ctx.progress(report["rows"], report["rows"], "Done", force=True)
+    return report, None
+
+
+@job_kind("rebuild_indexes", roles=("admin",))
+def rebuild_indexes_job(ctx):
+    """Rebuilds the in-process indexes (rollups, search, part history, suggestions) now instead of on their TTL."""
+    ctx.progress(0, 4, "Rebuilding report rollups", force=True)
+    report_rollups.rebuild()
+    ctx.check()
+    ctx.progress(1, 4, "Rebuilding search index", force=True)
+    search_index.rebuild()
+    ctx.check()
+    ctx.progress(2, 4, "Rebuilding part history", force=True)
+    part_history.rebuild()
+    ctx.check()
+    ctx.progress(3, 4, "Rebuilding suggestions", force=True)
+    suggest_index.rebuild()
+    ctx.progress(4, 4, "Done", force=True)
+    return {"rebuilt": ["report_rollups", "search_index", "part_history", "suggest_index"]}, None
@@ -0,0 +1,203 @@
+"""Write-behind journal for RFQ saves (SAVE_MODE=journal).
+
+make-rfq-entry appends the editor payload to DATA_DIR/save_journal.sqlite3
+and answers at once; a background flusher applies entries to Supabase in
+journal order through save_rfq(). Consecutive saves of the same existing
+RFQ by the same role are coalesced, since each payload is the full state
+that role can write (a sales save never carries pricing). A new RFQ's
+id is recorded as soon as its header is inserted, so a retry after a
+partial failure updates that RFQ instead of creating another. Failures
+are retried with exponential backoff up to JOURNAL_MAX_ATTEMPTS, then the
+entry is marked failed and the flusher moves on.
+
+Status per entry: pending -> committed | failed (superseded entries are
+committed together with the save that replaced them).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from src.config import Config
+from src.SupaClient import get_supabase
+from src.saves import save_rfq
+
+SCHEMA = """
+create table if not exists saves (
+    id integer primary key autoincrement,
+    created_at text not null,
+    updated_at text not null,
+    user_id text,
+    role text,
+    rfq_id integer,
+    payload text not null,
+    status text not null default 'pending',
+    attempts integer not null default 0,
+    next_attempt_at real not null default 0,
+    last_error text,
+    result text
+);
+create index if not exists saves_status on saves (status, id);
+"""
+
+STATUS_COLUMNS = ("id", "status", "rfq_id", "attempts", "last_error", "result", "created_at", "updated_at")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SaveJournal:
+    def __init__(self, path, max_attempts=8, batch_size=50, max_backoff=300):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=full")  # an acknowledged save must survive a crash
+            self._local.conn = conn
+        return conn
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn().executescript(SCHEMA)
+        return self
+
+    # --- producer side ---
+
+    def append(self, payload, role, user_id):
+        """Durably records a save; returns its journal id."""
+        rfq_id = int(payload['id']) if payload.get('id') else None
+        now = _now()
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "insert into saves (created_at, updated_at, user_id, role, rfq_id, payload) values (?, ?, ?, ?, ?, ?)",
+                (now, now, str(user_id) if user_id else None, role, rfq_id, json.dumps(payload)))
+        self._wake.set()
+        return cur.lastrowid
+
+    def status(self, save_id):
+        row = self._conn().execute(
+            f"select {', '.join(STATUS_COLUMNS)}, user_id from saves where id = ?", (save_id,)).fetchone()
+        if row is None:
+            return None
+        status = dict(row)
+        status["result"] = json.loads(status["result"]) if status["result"] else None
+        return status
+
+    def pending_count(self):
+        return self._conn().execute("select count(*) from saves where status = 'pending'").fetchone()[0]
+
+    # --- flusher ---
+
+    def _due(self, conn):
+        """The next run of pending entries in order, stopping at one still backing off."""
+        rows = conn.execute("select * from saves where status = 'pending' order by id limit ?",
+                            (self.batch_size,)).fetchall()
+        now = time.time()
+        due = []
+        for row in rows:
+            if row["next_attempt_at"] > now:
+                break  # keep journal order: nothing overtakes a save waiting to retry
+            due.append(row)
+        return due
+
+    def _mark(self, conn, ids, **values):
+        values["updated_at"] = _now()
+        assignments = ", ".join(f"{k} = ?" for k in values)
+        with conn:
+            conn.executemany(f"update saves set {assignments} where id = ?",
+                             [(*values.values(), i) for i in ids])
+
+    def flush(self, supabase=None):
+        """Applies every due entry; returns how many were committed."""
+        supabase = supabase or get_supabase()
+        conn = self._conn()
+        committed = 0
+        while True:
+            due = self._due(conn)
+            if not due:
+                return committed
+            i = 0
+            while i < len(due):
+                row = due[i]
+                # Later saves of the same RFQ by the same role carry the state that role
+                # can write: apply only the last one. A role that cannot read pricing
+                # leaves those columns alone, so its save does not replace an admin's.
+                group = [row]
+                while (row["rfq_id"] is not None and i + len(group) < len(due)
+                       and due[i + len(group)]["rfq_id"] == row["rfq_id"]
+                       and due[i + len(group)]["role"] == row["role"]):
+                    group.append(due[i + len(group)])
+                last = group[-1]
+                payload = json.loads(last["payload"])
+                if last["rfq_id"] is not None and not payload.get('id'):
+                    # A new RFQ whose header an earlier attempt already inserted: update it
+                    payload['id'] = last["rfq_id"]
+                try:
+                    rfq_id, parts = save_rfq(supabase, payload, last["role"], last["user_id"],
+                                             on_created=lambda new_id: self._mark(conn, [last["id"]], rfq_id=new_id))
+                except Exception as e:
+                    attempts = row["attempts"] + 1
+                    if attempts >= self.max_attempts:
+                        print(f"Save journal entry {last['id']} failed for good: {e}")
+                        self._mark(conn, [r["id"] for r in group], status="failed", attempts=attempts,
+                                   last_error=str(e))
+                        break  # re-read: the next entries are now first in line
+                    delay = min(2 ** attempts, self.max_backoff)
+                    self._mark(conn, [row["id"]], attempts=attempts, last_error=str(e),
+                               next_attempt_at=time.time() + delay)
+                    return committed
+                result = json.dumps({"parts": parts, "superseded": [r["id"] for r in group[:-1]]})
+                self._mark(conn, [r["id"] for r in group], status="committed", rfq_id=rfq_id,
+                           last_error=None, result=result)
+                committed += len(group)
+                i += len(group)
+            else:
+                if len(due) < self.batch_size:
+                    return committed
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Save journal flush failed: {e}")
+            self._wake.wait(Config.JOURNAL_POLL_INTERVAL)
+            self._wake.clear()
+
+    def start(self):
+        self.open()
+        self._worker = threading.Thread(target=self._run, name="save-journal", daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """The running journal, started on first use (also drains a previous run's backlog)."""
+    global journal
+    with _journal_lock:
+        if journal is None:
+            journal = SaveJournal(os.path.join(Config.DATA_DIR, "save_journal.sqlite3"),
+                                  max_attempts=Config.JOURNAL_MAX_ATTEMPTS).start()
+    return journal
@@ -0,0 +1,87 @@
+"""Base for the in-process RFQ indexes (search, report rollups, part history,
+suggestions): built lazily, kept current by the rfq hooks, rebuilt after
+`ttl` seconds so writes made by other workers show up.
+
+The rebuild's Supabase fetch runs outside the lock, in the one request
+thread that found the index stale; everyone else keeps reading the old
+index meanwhile (only the very first build is waited for). Writes that
+arrive during the fetch are applied to the old index and replayed on the
+new one before it is swapped in.
+"""
+import threading
+import time
+
+
+class LazyIndex:
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._built = threading.Condition(self._lock)
+        self._built_at = None
+        self._building = False
+        self._replays = []   # one list of (method, arg) per rebuild in progress
+
+    # --- subclasses ---
+
+    def _load(self, supabase):
+        """Fetches and indexes every RFQ into a new state; runs without the lock."""
+        raise NotImplementedError
+
+    def _install(self, state):
+        """Swaps in a state from _load; runs under the lock."""
+        raise NotImplementedError
+
+    def _upsert(self, rfq):
+        raise NotImplementedError
+
+    def _remove(self, rfq_id):
+        raise NotImplementedError
+
+    # --- maintenance ---
+
+    def rebuild(self, supabase=None):
+        replay = []
+        with self._lock:
+            self._replays.append(replay)
+        try:
+            state = self._load(supabase)
+        except Exception:
+            with self._lock:
+                self._replays.remove(replay)
+            raise
+        with self._lock:
+            self._replays.remove(replay)
+            self._install(state)
+            for method, arg in replay:
+                method(arg)
+            self._built_at = time.monotonic()
+
+    def ensure_fresh(self):
+        with self._lock:
+            while True:
+                if self._built_at is not None and (self._building or time.monotonic() - self._built_at < self.ttl):
+                    return  # fresh, or stale but being rebuilt: serve what we have
+                if not self._building:
+                    break
+                self._built.wait()  # the first build is in progress
+            self._building = True
+        try:
+            self.rebuild()
+        finally:
+            with self._lock:
+                self._building = False
+                self._built.notify_all()
+
+    def upsert(self, rfq):
+        with self._lock:
+            for replay in self._replays:
+                replay.append((self._upsert, rfq))
+            if self._built_at is not None:
+                self._upsert(rfq)
+
+    def remove(self, rfq_id):
+        with self._lock:
+            for replay in self._replays:
+                replay.append((self._remove, rfq_id))
+            if self._built_at is not None:
+                self._remove(rfq_id)
@@ -0,0 +1,213 @@
+"""Request and upstream-call metrics, served in Prometheus text format.
+
+init_metrics() times every request per route (url rule, not raw path),
+counts responses by status and records request/response sizes. Calls to
+Supabase (through the shared httpx pool, see SupaClient) and to the
+exchange-rate provider are recorded with record_upstream(), from request
+handlers and background threads alike.
+
+Within a request, phase() and upstream calls also add up per-request
+timings that are returned in a `Server-Timing` header, e.g.
+`auth;dur=0.4, db;dur=38.2;desc="3 calls", encode;dur=2.1, total;dur=44.0`.
+Phases may overlap (auth includes its own db calls). For streamed
+responses (exports) the timings stop when the body starts streaming.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+INF_BOUND = 'le="+Inf"'
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda kv: tuple(map(str, kv[0])))
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted(((k, list(v)) for k, v in self._series.items()), key=lambda kv: tuple(map(str, kv[0])))
+        for labels, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {count}"
+            yield f"{self.name}_bucket{_labels(self.labels, labels, INF_BOUND)} {series[-1]}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(series[-2])}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {series[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_duration = registry.add(Histogram(
+    "quote_tracker_http_request_duration_seconds", "Time to produce a response, by route.",
+    ("method", "route")))
+http_requests = registry.add(Counter(
+    "quote_tracker_http_requests_total", "Responses by route and status code.",
+    ("method", "route", "status")))
+http_exceptions = registry.add(Counter(
+    "quote_tracker_http_exceptions_total", "Unhandled exceptions by route.", ("method", "route")))
+http_request_size = registry.add(Histogram(
+    "quote_tracker_http_request_size_bytes", "Request body sizes, by route.", ("method", "route"), SIZE_BUCKETS))
+http_response_size = registry.add(Histogram(
+    "quote_tracker_http_response_size_bytes", "Response body sizes as sent (after compression), by route.",
+    ("method", "route"), SIZE_BUCKETS))
+upstream_duration = registry.add(Histogram(
+    "quote_tracker_upstream_request_duration_seconds", "Upstream call latency, by service and target.",
+    ("service", "target", "method")))
+upstream_requests = registry.add(Counter(
+    "quote_tracker_upstream_requests_total", "Upstream calls by service, target and status code.",
+    ("service", "target", "status")))
+upstream_response_size = registry.add(Histogram(
+    "quote_tracker_upstream_response_size_bytes", "Upstream response body sizes.",
+    ("service", "target"), SIZE_BUCKETS))
+
+# Server-Timing metric name for each upstream service
+UPSTREAM_PHASES = {"supabase": "db", "exchange_rate": "fx"}
+
+
+def _add_timing(name, seconds, calls=0):
+    timings = g.setdefault("metrics_timings", {})
+    total, count = timings.get(name, (0.0, 0))
+    timings[name] = (total + seconds, count + calls)
+
+
+@contextmanager
+def phase(name):
+    """Adds the time spent in the block to this request's Server-Timing."""
+    if not has_request_context():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add_timing(name, time.perf_counter() - start)
+
+
+def record_upstream(service, target, method, status, seconds, size=None):
+    upstream_duration.observe(seconds, service, target, method)
+    upstream_requests.inc(service, target, str(status))
+    if size is not None:
+        upstream_response_size.observe(size, service, target)
+    if has_request_context():
+        _add_timing(UPSTREAM_PHASES.get(service, service), seconds, calls=1)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+def server_timing(timings, total):
+    entries = []
+    for name, (seconds, calls) in timings.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if calls:
+            entry += ';desc="%d call%s"' % (calls, "s" if calls != 1 else "")
+        entries.append(entry)
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def init_metrics(app, server_timing_header=True):
+    """Register before init_compression() so sizes and timings include it."""
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        route, method = _route(), request.method
+        http_duration.observe(elapsed, method, route)
+        http_requests.inc(method, route, str(response.status_code))
+        if request.content_length:
+            http_request_size.observe(request.content_length, method, route)
+        if response.content_length is not None:
+            http_response_size.observe(response.content_length, method, route)
+        if server_timing_header:
+            response.headers["Server-Timing"] = server_timing(g.pop("metrics_timings", {}), elapsed)
+        return response
+
+    @app.teardown_request
+    def record_exception(exc):
+        if exc is not None:
+            http_exceptions.inc(request.method, _route())
+
+    return record_request
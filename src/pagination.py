@@ -0,0 +1,146 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from src.config import Config
+
+# Columns the RFQ list can be sorted by. `id` is always the tie-breaker.
+SORT_KEYS = ("created_at", "id", "Company_name", "Sales_person", "RFQ_purpose", "Tentative_date")
+
+
+def encode_cursor(sort, desc, value, row_id):
+    raw = json.dumps([sort, desc, value, row_id], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        sort, desc, value, row_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return sort, bool(desc), value, row_id
+
+
+def _quote(value):
+    # PostgREST logic trees need reserved characters (, . : ( )) quoted
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+class PageRequest:
+    """Keyset page over RFQ-Tracker: `?limit=&sort=&order=asc|desc&cursor=`."""
+
+    def __init__(self, sort="created_at", desc=True, limit=None, cursor=None):
+        self.sort = sort
+        self.desc = desc
+        self.limit = limit or Config.LIST_PAGE_SIZE
+        self.after = None  # (value, id) of the last row of the previous page
+
+        if cursor:
+            c_sort, c_desc, value, row_id = decode_cursor(cursor)
+            if (c_sort, c_desc) != (sort, desc):
+                raise ValueError("Cursor does not match the requested sort")
+            self.after = (value, row_id)
+
+    @classmethod
+    def from_args(cls, args):
+        sort = args.get("sort", "created_at")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort}")
+
+        order = args.get("order", "desc").lower()
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+
+        try:
+            limit = int(args.get("limit", Config.LIST_PAGE_SIZE))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        limit = max(1, min(limit, Config.LIST_MAX_PAGE_SIZE))
+
+        return cls(sort, order == "desc", limit, args.get("cursor"))
+
+    @property
+    def is_first(self):
+        return self.after is None
+
+    def apply(self, query):
+        """Adds ordering, the keyset filter and limit (+1 to detect a next page)."""
+        op = "lt" if self.desc else "gt"
+
+        if self.after is not None:
+            value, row_id = self.after
+            if self.sort == "id":
+                query = query.filter("id", op, row_id)
+            elif value is None:
+                # Already in the NULL tail (nulls are always sorted last)
+                query = query.or_(f"and({self.sort}.is.null,id.{op}.{row_id})")
+            else:
+                v = _quote(value)
+                query = query.or_(
+                    f"{self.sort}.{op}.{v},"
+                    f"and({self.sort}.eq.{v},id.{op}.{row_id}),"
+                    f"{self.sort}.is.null"
+                )
+
+        if self.sort != "id":
+            query = query.order(self.sort, desc=self.desc, nullsfirst=False)
+        query = query.order("id", desc=self.desc)
+        return query.limit(self.limit + 1)
+
+    def split(self, rows):
+        """Returns (page_rows, next_cursor)."""
+        rows = rows or []
+        if len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        last = rows[-1]
+        return rows, encode_cursor(self.sort, self.desc, last.get(self.sort), last.get("id"))
+
+
+def iter_rows(supabase, table, columns, page_size=1000, where=None):
+    """Yields every row of a table, walking it in id order one page at a time.
+
+    `where` optionally narrows the query, e.g. `lambda q: q.eq("rfq_id", 7)`.
+    """
+    last_id = None
+    while True:
+        query = supabase.table(table).select(columns)
+        if where is not None:
+            query = where(query)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.order("id").limit(page_size).execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def rewind(since, seconds):
+    """An (updated_at, id) cursor moved `seconds` back, to re-read rows whose
+    transaction started before the cursor but committed after it."""
+    if since is None or not seconds:
+        return since
+    return ((datetime.fromisoformat(since[0]) - timedelta(seconds=seconds)).isoformat(), 0)
+
+
+def iter_changed_rows(supabase, table, columns, since=None, page_size=1000):
+    """Yields rows modified after `since`, an (updated_at, id) pair, oldest first.
+
+    Pages on (updated_at, id) so rows sharing a timestamp are never skipped;
+    the last row seen is the `since` to resume from. Needs the updated_at
+    column from sql/updated_at.sql.
+    """
+    after = since
+    while True:
+        query = supabase.table(table).select(columns)
+        if after is not None:
+            value, row_id = after
+            v = _quote(value)
+            query = query.or_(f"updated_at.gt.{v},and(updated_at.eq.{v},id.gt.{row_id})")
+        rows = query.order("updated_at").order("id").limit(page_size).execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]["updated_at"], rows[-1]["id"])
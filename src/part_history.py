@@ -0,0 +1,168 @@
+"""What we quoted before for a part number, behind /api/part-history.
+
+Every stored line is indexed under both its RFQ-part-no and its
+Quoted-part-no (case and spaces ignored), so a lookup is a dict hit plus a
+median over that part's own lines. Saves and deletes adjust the index
+through the rfq hooks; a full rebuild happens lazily after `ttl` seconds.
+"""
+import bisect
+import math
+import statistics
+from src.config import Config
+from src.lazy_index import LazyIndex
+from src.replica import rfq_rows
+from src.hooks import on_rfq_saved, on_rfq_deleted
+
+INDEX_COLUMNS = (
+    'id, created_at, "RFQ-no", Company_name, '
+    'Part_details(id, "RFQ-part-no", "Quoted-part-no", Supplier, Make, Lead, "Quoted Qty", "Unit$", Resale)'
+)
+
+RECENT = 5
+
+
+def normalize_part_no(value):
+    return "".join(str(value).split()).upper() if value not in (None, "") else ""
+
+
+def _price(value):
+    """A positive float, or None for blank/unpriced lines."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) and number > 0 else None
+
+
+def _entry(rfq, created_at, part):
+    return {
+        "date": created_at[:10] or None,
+        "rfq_id": rfq["id"],
+        "rfq_no": rfq.get("RFQ-no"),
+        "company": rfq.get("Company_name"),
+        "part_no": part.get("RFQ-part-no"),
+        "quoted_part_no": part.get("Quoted-part-no"),
+        "supplier": part.get("Supplier") or None,
+        "make": part.get("Make") or None,
+        "lead_time": part.get("Lead") or None,
+        "quoted_qty": part.get("Quoted Qty"),
+        "unit_usd": _price(part.get("Unit$")),
+        "resale": _price(part.get("Resale")),
+    }
+
+
+class PartHistoryIndex(LazyIndex):
+    """Part number -> every line quoted under it, oldest first.
+
+    A line sits under one or two keys (RFQ and quoted part number); each RFQ
+    remembers where its lines went so a save or delete only touches those.
+    """
+
+    def __init__(self, ttl=300):
+        super().__init__(ttl)
+        self._reset()
+
+    def _reset(self):
+        self._parts = {}   # part no -> sorted [(created_at, rfq id, n, entry)], oldest first
+        self._rfqs = {}    # rfq id -> (created_at, [(part no, sort key)])
+
+    # --- maintenance ---
+
+    def _drop(self, rfq_id):
+        previous = self._rfqs.pop(rfq_id, None)
+        if not previous:
+            return None
+        for key, sort_key in previous[1]:
+            lines = self._parts.get(key)
+            if not lines:
+                continue
+            i = bisect.bisect_left(lines, sort_key)
+            if i < len(lines) and lines[i][:3] == sort_key:
+                del lines[i]
+            if not lines:
+                del self._parts[key]
+        return previous[0]
+
+    def _add(self, rfq):
+        previous_created_at = self._drop(rfq["id"])
+        created_at = rfq.get("created_at") or previous_created_at or ""
+        placed = []
+        for n, part in enumerate(rfq.get("Part_details") or []):
+            keys = {normalize_part_no(part.get("RFQ-part-no")), normalize_part_no(part.get("Quoted-part-no"))}
+            keys.discard("")
+            if not keys:
+                continue
+            entry = _entry(rfq, created_at, part)
+            sort_key = (created_at, rfq["id"], n)
+            for key in keys:
+                bisect.insort(self._parts.setdefault(key, []), sort_key + (entry,))
+                placed.append((key, sort_key))
+        self._rfqs[rfq["id"]] = (created_at, placed)
+
+    def _load(self, supabase):
+        fresh = PartHistoryIndex(self.ttl)
+        for rfq in rfq_rows(INDEX_COLUMNS, supabase, role="pricing"):
+            fresh._add(rfq)
+        return fresh
+
+    def _install(self, fresh):
+        self._parts, self._rfqs = fresh._parts, fresh._rfqs
+
+    _upsert = _add
+
+    def _remove(self, rfq_id):
+        self._drop(rfq_id)
+
+    # --- queries ---
+
+    @staticmethod
+    def _latest(entries, field):
+        for entry in reversed(entries):
+            if entry[field] is not None:
+                return {"value": entry[field], "date": entry["date"], "rfq_id": entry["rfq_id"]}
+        return None
+
+    @staticmethod
+    def _median(entries, field):
+        values = [entry[field] for entry in entries if entry[field] is not None]
+        return round(statistics.median(values), 4) if values else None
+
+    def lookup(self, part_no, exclude_rfq=None):
+        """History of one part number, or None when it was never quoted."""
+        self.ensure_fresh()
+        with self._lock:
+            lines = self._parts.get(normalize_part_no(part_no), ())
+            entries = [line[3] for line in lines if line[1] != exclude_rfq]
+        if not entries:
+            return None
+        priced = [e for e in entries if e["unit_usd"] is not None or e["resale"] is not None]
+        return {
+            "quotes": len(entries),
+            "first_date": entries[0]["date"],
+            "last_date": entries[-1]["date"],
+            # Newest line that carries a price; unpriced sales drafts only when nothing else exists
+            "latest": (priced or entries)[-1],
+            "latest_unit_usd": self._latest(entries, "unit_usd"),
+            "latest_resale": self._latest(entries, "resale"),
+            "latest_supplier": self._latest(entries, "supplier"),
+            "latest_make": self._latest(entries, "make"),
+            "latest_lead_time": self._latest(entries, "lead_time"),
+            "median_unit_usd": self._median(entries, "unit_usd"),
+            "median_resale": self._median(entries, "resale"),
+            "recent": entries[-RECENT:][::-1],
+        }
+
+    def lookup_many(self, part_nos, exclude_rfq=None):
+        """{part no as given: history or None} for a whole RFQ's lines."""
+        return {part_no: self.lookup(part_no, exclude_rfq) for part_no in part_nos}
+
+
+part_history = PartHistoryIndex(ttl=Config.PART_HISTORY_TTL)
+
+@on_rfq_saved
+def _history_saved_rfq(rfq):
+    part_history.upsert(rfq)
+
+@on_rfq_deleted
+def _history_deleted_rfq(rfq_id):
+    part_history.remove(rfq_id)
@@ -0,0 +1,110 @@
+"""Part_details rows: mapping editor items to columns and diff-based saves."""
+
+# editor item key -> Part_details column
+ITEM_FIELDS = {
+    "rfq_part_no": "RFQ-part-no",
+    "quoted_part_no": "Quoted-part-no",
+    "supplier": "Supplier",
+    "date_code": "Date Code",
+    "rfq_qty": "RFQ Qty",
+    "quoted_qty": "Quoted Qty",
+    "make": "Make",
+    "lead_time": "Lead",
+    "source": "Source",
+    "unit_price_usd": "Unit$",
+    "unit_price_inr": "Unit₹",
+    "freight": "Freight",
+    "insurance": "Insurance",
+    "bcd": "BCD",
+    "bank": "Bank",
+    "clearance": "Clearance",
+    "margin": "Margin",
+    "resale": "Resale",
+    "tp": "TP",
+    "remarks": "Remarks",
+    "exchange_rate": "Exchange_rate",
+}
+
+# The only columns the sales editor shows; everything else it sends blank
+SALES_EDITABLE_COLUMNS = ("RFQ-part-no", "Date Code", "RFQ Qty", "Quoted Qty", "Make", "Lead")
+
+# Cleared the first time Supabase says sync_part_details is not installed,
+# so later saves go straight to the batches (until the next restart)
+_has_sync_function = True
+
+
+def part_row(item, rfq_id):
+    row = {"rfq_id": rfq_id}
+    for key, column in ITEM_FIELDS.items():
+        row[column] = item.get(key)
+    row["Date Code"] = row["Date Code"] or None
+    return row
+
+
+def _same(a, b):
+    if a in (None, "") and b in (None, ""):
+        return True
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) < 1e-9
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return str(a) == str(b)
+
+
+def diff_parts(existing, incoming, columns=None):
+    """Compares stored rows with the rows the editor sent.
+
+    `incoming` rows carry the stored part `id` when they came from the DB.
+    Only `columns` are compared/written for existing rows (all item columns
+    by default). Returns (inserts, updates, delete_ids); updates are full
+    rows so they can be written in one batch.
+    """
+    columns = columns or list(ITEM_FIELDS.values())
+    stored = {row["id"]: row for row in existing}
+    inserts, updates, kept = [], [], set()
+
+    for row in incoming:
+        part_id = row.pop("id", None)
+        old = stored.get(part_id)
+        if old is None or part_id in kept:
+            inserts.append(row)
+            continue
+        kept.add(part_id)
+        merged = {"id": part_id, "rfq_id": old.get("rfq_id")}
+        merged.update({c: old.get(c) for c in ITEM_FIELDS.values()})
+        merged.update({c: row[c] for c in columns if c in row})
+        if any(not _same(old.get(c), merged.get(c)) for c in columns):
+            updates.append(merged)
+
+    delete_ids = [part_id for part_id in stored if part_id not in kept]
+    return inserts, updates, delete_ids
+
+
+def apply_part_changes(supabase, rfq_id, inserts, updates, delete_ids):
+    """Writes a diff, in one round trip via the sync_part_details function when
+    it exists (see sql/sync_part_details.sql), else as at most three batches."""
+    global _has_sync_function
+    if not (inserts or updates or delete_ids):
+        return
+    if _has_sync_function:
+        try:
+            supabase.rpc("sync_part_details", {
+                "p_rfq_id": rfq_id,
+                "p_inserts": inserts,
+                "p_updates": updates,
+                "p_delete_ids": delete_ids,
+            }).execute()
+            return
+        except Exception as e:
+            if "Could not find the function" not in str(e) and "PGRST202" not in str(e):
+                raise
+            print(f"Saving parts in batches, run sql/sync_part_details.sql: {e}")
+            _has_sync_function = False
+
+    if delete_ids:
+        supabase.table("Part_details").delete().in_("id", delete_ids).execute()
+    if updates:
+        supabase.table("Part_details").upsert(updates, on_conflict="id").execute()
+    if inserts:
+        supabase.table("Part_details").insert(inserts).execute()
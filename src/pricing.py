@@ -0,0 +1,225 @@
+"""Landed-cost pricing, vectorised over whole batches of part lines.
+
+Mirrors calculatePricing() in rfqEditor.html:
+
+    Import: unit ₹ = unit $ x FX
+            freight   = freight_usd x FX / qty
+            insurance = unit ₹ x insurance_rate
+            BCD       = (unit ₹ + freight + insurance) x bcd_rate
+            bank      = bank_usd x FX / qty
+            clearance = clearance_inr / qty
+    Local:  unit ₹ and freight as entered, no import charges
+    FX:     the line's own rate, else the cached USD/INR rate, else 92
+
+    landed = unit ₹ + freight + insurance + BCD + bank + clearance
+    margin = landed x margin_rate, resale = landed + margin
+
+numpy is imported on first use, keeping it off the desktop build's startup path.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from src.pagination import iter_rows
+from src.fx import usd_inr_cache
+
+OUTPUT_COLUMNS = ("unit_price_inr", "freight", "insurance", "bcd", "bank", "clearance",
+                  "landed_cost", "margin", "resale")
+
+# Part_details column -> pricing input key, for repricing stored lines
+PART_INPUTS = {
+    "Source": "source",
+    "Unit$": "unit_price_usd",
+    "Unit₹": "unit_price_inr",
+    "Quoted Qty": "quoted_qty",
+    "Exchange_rate": "exchange_rate",
+    "Freight": "freight",
+}
+
+# The editor's last resort when neither the line nor the rate API has a rate
+FALLBACK_EXCHANGE_RATE = 92.0
+
+
+class PricingRates:
+    def __init__(self, freight_usd=80.0, insurance_rate=0.01125, bcd_rate=0.165, bank_usd=10.0,
+                 clearance_inr=6500.0, margin_rate=0.15, default_exchange_rate=None):
+        self.freight_usd = freight_usd
+        self.insurance_rate = insurance_rate
+        self.bcd_rate = bcd_rate
+        self.bank_usd = bank_usd
+        self.clearance_inr = clearance_inr
+        self.margin_rate = margin_rate
+        self.default_exchange_rate = default_exchange_rate  # None: the cached USD/INR rate
+
+    @classmethod
+    def from_dict(cls, overrides=None):
+        if overrides is not None and not isinstance(overrides, dict):
+            raise ValueError("rates must be an object")
+        rates = cls()
+        for key, value in (overrides or {}).items():
+            if not hasattr(rates, key):
+                raise ValueError(f"Unknown pricing rate: {key}")
+            setattr(rates, key, float(value))
+        return rates
+
+
+def cached_exchange_rate():
+    """The USD/INR rate the editor fills in (its globalExchangeRate), or the fallback."""
+    try:
+        value, _ = usd_inr_cache.get()
+        return float(value["rate"])
+    except Exception as e:
+        print(f"Pricing with the fallback exchange rate: {e}")
+        return FALLBACK_EXCHANGE_RATE
+
+
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _column(items, key):
+    import numpy as np
+    return np.fromiter((_num(item.get(key)) for item in items), dtype=np.float64, count=len(items))
+
+
+def items_from_parts(rows):
+    """Turns Part_details rows into pricing inputs (keeping id/rfq_id)."""
+    items = []
+    for row in rows:
+        item = {key: row.get(column) for column, key in PART_INPUTS.items()}
+        item["id"] = row.get("id")
+        item["rfq_id"] = row.get("rfq_id")
+        items.append(item)
+    return items
+
+
+def price_arrays(items, rates=None, exchange_rate=None):
+    """Prices a batch in one pass. Returns {column: ndarray} for OUTPUT_COLUMNS.
+
+    `exchange_rate`, when given, replaces every line's own rate (an FX move);
+    otherwise each line's rate is used, falling back to the default
+    (rates.default_exchange_rate, else the cached USD/INR rate).
+    """
+    import numpy as np
+    rates = rates or PricingRates()
+    n = len(items)
+    is_import = np.fromiter((item.get("source") == "Import" for item in items), dtype=bool, count=n)
+
+    if exchange_rate is not None:
+        fx = np.full(n, float(exchange_rate))
+    else:
+        fx = _column(items, "exchange_rate")
+        missing = np.isnan(fx) | (fx == 0)
+        if missing.any():
+            fx = np.where(missing, rates.default_exchange_rate or cached_exchange_rate(), fx)
+
+    qty = _column(items, "quoted_qty")
+    qty = np.maximum(np.where(np.isnan(qty) | (qty == 0), 1.0, qty), 1.0)
+
+    usd = np.nan_to_num(_column(items, "unit_price_usd"))
+    entered_inr = np.nan_to_num(_column(items, "unit_price_inr"))
+    entered_freight = np.nan_to_num(_column(items, "freight"))
+
+    unit_inr = np.where(is_import, usd * fx, entered_inr)
+    freight = np.where(is_import, rates.freight_usd * fx / qty, entered_freight)
+    insurance = np.where(is_import, unit_inr * rates.insurance_rate, 0.0)
+    bcd = np.where(is_import, (unit_inr + freight + insurance) * rates.bcd_rate, 0.0)
+    bank = np.where(is_import, rates.bank_usd * fx / qty, 0.0)
+    clearance = np.where(is_import, rates.clearance_inr / qty, 0.0)
+
+    landed = unit_inr + freight + insurance + bcd + bank + clearance
+    margin = landed * rates.margin_rate
+    resale = landed + margin
+
+    return {
+        "unit_price_inr": unit_inr,
+        "freight": freight,
+        "insurance": insurance,
+        "bcd": bcd,
+        "bank": bank,
+        "clearance": clearance,
+        "landed_cost": landed,
+        "margin": margin,
+        "resale": resale,
+    }
+
+
+_PAISE = Decimal("0.01")
+
+
+def _to_paise(values):
+    """Rounds like the editor's toFixed(2): the exact binary value, half away
+    from zero. np.round scales by 100 first and rounds half to even, so values
+    near a half paisa are redone exactly."""
+    import numpy as np
+    rounded = np.round(values, 2)
+    scaled = np.abs(values) * 100
+    for i in np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6):
+        rounded[i] = float(Decimal(float(values[i])).quantize(_PAISE, rounding=ROUND_HALF_UP))
+    return rounded.tolist()
+
+
+def price_items(items, rates=None, exchange_rate=None):
+    """price_arrays() as JSON-ready rows, rounded to paise like the editor."""
+    if not items:
+        return []
+    columns = {k: _to_paise(v) for k, v in price_arrays(items, rates, exchange_rate).items()}
+    rows = []
+    for i, item in enumerate(items):
+        row = {k: columns[k][i] for k in OUTPUT_COLUMNS}
+        for key in ("id", "rfq_id"):
+            if item.get(key) is not None:
+                row[key] = item[key]
+        rows.append(row)
+    return rows
+
+
+# --- stored lines ---
+
+PRICING_PART_COLUMNS = 'id, rfq_id, Source, "Unit$", "Unit₹", "Quoted Qty", Exchange_rate, Freight'
+
+
+def fetch_part_lines(supabase, rfq_ids, columns, chunk_size=200):
+    """Part_details rows for many RFQs, asking for a bounded number of ids at a time."""
+    rows = []
+    for i in range(0, len(rfq_ids), chunk_size):
+        chunk = rfq_ids[i:i + chunk_size]
+        rows.extend(iter_rows(supabase, "Part_details", columns, where=lambda q: q.in_("rfq_id", chunk)))
+    return rows
+
+
+def _is_id(value):
+    if isinstance(value, str):
+        return value.strip().isdigit()
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_request(data):
+    """(rates, exchange_rate) from a price-items body; raises ValueError/TypeError.
+
+    Also checks the shape of `items` and `rfq_ids` so request_items() can
+    trust them."""
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    items = data.get('items')
+    if items is not None and not (isinstance(items, list) and all(isinstance(item, dict) for item in items)):
+        raise ValueError("items must be a list of objects")
+    rfq_ids = data.get('rfq_ids')
+    if rfq_ids is not None and not (isinstance(rfq_ids, list) and all(_is_id(i) for i in rfq_ids)):
+        raise ValueError("rfq_ids must be a list of integers")
+    rates = PricingRates.from_dict(data.get('rates'))
+    exchange_rate = float(data['exchange_rate']) if data.get('exchange_rate') not in (None, "") else None
+    return rates, exchange_rate
+
+
+def request_items(supabase, data):
+    """The lines a price-items body asks for: explicit `items`, the stored lines
+    of `rfq_ids`, or every open (Bidding) RFQ with `"open": true`."""
+    if 'items' in data:
+        return data.get('items') or []
+    if data.get('open'):
+        rfq_ids = [row['id'] for row in iter_rows(
+            supabase, "RFQ-Tracker", "id", where=lambda q: q.eq("RFQ_purpose", "Bidding"))]
+    else:
+        rfq_ids = [int(i) for i in data.get('rfq_ids') or []]
+    return items_from_parts(fetch_part_lines(supabase, rfq_ids, PRICING_PART_COLUMNS))
@@ -0,0 +1,172 @@
+"""Opt-in cProfile traces of single requests.
+
+An admin turns profiling on for one request with an `X-Profile: 1` header
+or `?profile=1`; PROFILE_SAMPLE_RATE additionally profiles that fraction
+of all requests. The profiler runs in the request's thread from
+before_request until teardown, so it covers auth, the handler, Supabase
+calls (httpx is synchronous) and, for stream_with_context responses, the
+streamed body. One request is profiled at a time; others run unprofiled
+while one is in progress.
+
+Traces are written as pstats files under DATA_DIR/profiles with a JSON
+sidecar, keeping the newest PROFILE_KEEP. The response carries
+`X-Profile-Id`; download from /api/profiles/<id> (.prof for snakeviz or
+pstats, or ?format=text for the top functions).
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from flask import g, request
+from src.config import Config
+from src.auth.utils import get_current_user
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{12}$")
+SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls", "time")
+
+_busy = threading.Lock()
+
+
+class ProfileStore:
+    def __init__(self, directory, keep=50):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _path(self, profile_id, ext):
+        if not PROFILE_ID.match(profile_id or ""):
+            raise ValueError("Invalid profile id")
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    def save(self, profiler, meta):
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(self._path(meta["id"], "prof"))
+        with open(self._path(meta["id"], "json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self._rotate()
+
+    def _rotate(self):
+        with self._lock:
+            entries = self.list()
+            for meta in entries[self.keep:]:
+                for ext in ("prof", "json"):
+                    try:
+                        os.remove(self._path(meta["id"], ext))
+                    except FileNotFoundError:
+                        pass
+
+    def list(self):
+        """Sidecar metadata of every stored trace, newest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except Exception as e:
+                print(f"Ignoring unreadable profile metadata {name}: {e}")
+        return sorted(entries, key=lambda meta: meta["at"], reverse=True)
+
+    def prof_path(self, profile_id):
+        path = self._path(profile_id, "prof")
+        return path if os.path.exists(path) else None
+
+    def text(self, profile_id, sort="cumulative", limit=60):
+        path = self.prof_path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+profile_store = ProfileStore(os.path.join(Config.DATA_DIR, "profiles"), keep=Config.PROFILE_KEEP)
+
+
+def _requested():
+    if request.headers.get("X-Profile") != "1" and request.args.get("profile") != "1":
+        return False
+    user = get_current_user()
+    return user is not None and user.role == "admin"
+
+
+def _finish(profile, store):
+    profile["profiler"].disable()
+    _busy.release()
+    profile["meta"]["duration_ms"] = round((time.perf_counter() - profile["start"]) * 1000, 1)
+    try:
+        store.save(profile["profiler"], profile["meta"])
+    except Exception as e:
+        print(f"Could not save request profile: {e}")
+
+
+def _meta(profile, status):
+    user = g.get("current_user")
+    return {
+        "id": profile["id"],
+        "at": datetime.now(timezone.utc).isoformat(),
+        "reason": profile["reason"],
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "route": request.url_rule.rule if request.url_rule is not None else None,
+        "status": status,
+        "user_id": str(user.id) if user else None,
+    }
+
+
+def init_profiling(app, sample_rate=0.0, store=profile_store):
+    @app.before_request
+    def start_profile():
+        if _requested():
+            reason = "requested"
+        elif sample_rate > 0 and random.random() < sample_rate:
+            reason = "sampled"
+        else:
+            return
+        if not _busy.acquire(blocking=False):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:  # another profiler (e.g. a debugger's) is active
+            _busy.release()
+            print(f"Request profiling skipped: {e}")
+            return
+        g.profile = {"profiler": profiler, "id": uuid.uuid4().hex[:12], "reason": reason,
+                     "start": time.perf_counter(), "meta": None, "streamed": False}
+
+    @app.after_request
+    def tag_profile(response):
+        profile = g.get("profile")
+        if profile is not None:
+            profile["meta"] = _meta(profile, response.status_code)
+            response.headers["X-Profile-Id"] = profile["id"]
+            if response.is_streamed:
+                # Keep profiling while the body is generated (exports)
+                profile["streamed"] = True
+                response.call_on_close(lambda: _finish(profile, store))
+        return response
+
+    @app.teardown_request
+    def save_profile(exc):
+        profile = g.pop("profile", None)
+        if profile is None or profile["streamed"]:
+            return
+        if profile["meta"] is None:
+            profile["meta"] = _meta(profile, 500)
+        _finish(profile, store)
+
+    return start_profile
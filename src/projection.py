@@ -0,0 +1,108 @@
+"""Per-role column lists for RFQ reads.
+
+Pricing columns are simply not selected for roles that may not see them,
+so they never leave the database. `?fields=` narrows the selection further
+(sparse fieldsets): `RFQ-no,Company_name,Part_details.RFQ-part-no`.
+"""
+import re
+from src.parts import ITEM_FIELDS
+
+PRIVILEGED_ROLES = ("admin", "pricing")
+SENSITIVE_PART_FIELDS = ("Unit$", "Unit₹", "Margin", "BCD", "Freight", "Insurance", "Clearance")
+
+RFQ_COLUMNS = (
+    "id", "created_at", "created_by", "RFQ-no", "Company_name", "Sales_person", "Customer_name",
+    "Customer_email", "Customer_phone", "Customer_address_1", "Customer_address_2", "Customer_city",
+    "Customer_state", "Customer_pincode", "Customer_country", "RFQ_purpose", "Tentative_date",
+)
+PART_COLUMNS = ("id", "rfq_id") + tuple(ITEM_FIELDS.values())
+PARTS = "Part_details"
+
+_PLAIN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def can_see_pricing(role):
+    return role in PRIVILEGED_ROLES
+
+
+def visible_part_columns(role):
+    if can_see_pricing(role):
+        return PART_COLUMNS
+    return tuple(c for c in PART_COLUMNS if c not in SENSITIVE_PART_FIELDS)
+
+
+def quote(column):
+    return column if _PLAIN.match(column) else f'"{column}"'
+
+
+def parse_fields(raw, role):
+    """'a,b,Part_details.c' -> (rfq columns, part columns or None).
+
+    Raises ValueError for unknown columns and PermissionError for columns
+    the role may not read.
+    """
+    rfq_fields, part_fields = [], None
+    visible = visible_part_columns(role)
+    for name in (f.strip() for f in raw.split(",")):
+        if not name:
+            continue
+        if name == PARTS:
+            part_fields = list(visible)
+        elif name.startswith(PARTS + "."):
+            column = name[len(PARTS) + 1:]
+            if column not in PART_COLUMNS:
+                raise ValueError(f"Unknown field: {name}")
+            if column not in visible:
+                raise PermissionError(f"Field not available for role {role}: {name}")
+            part_fields = part_fields if part_fields is not None else []
+            if column not in part_fields:
+                part_fields.append(column)
+        elif name in RFQ_COLUMNS:
+            if name not in rfq_fields:
+                rfq_fields.append(name)
+        else:
+            raise ValueError(f"Unknown field: {name}")
+    return rfq_fields, part_fields
+
+
+def build_select(role, fields=None, required=("id",)):
+    """The select() string for an RFQ read by `role`.
+
+    `fields` is the raw `?fields=` value (None = everything the role may see);
+    `required` columns are always included (ids, the sort key, ...).
+    """
+    if fields is None:
+        if can_see_pricing(role):
+            return f"*, {PARTS}(*)"
+        return f"*, {PARTS}({', '.join(quote(c) for c in visible_part_columns(role))})"
+
+    rfq_fields, part_fields = parse_fields(fields, role)
+    for column in required:
+        if column not in rfq_fields:
+            rfq_fields.insert(0, column)
+    select = ", ".join(quote(c) for c in rfq_fields)
+    if part_fields:
+        select += f", {PARTS}({', '.join(quote(c) for c in part_fields)})"
+    return select
+
+
+def project_rows(rows, role, fields=None, required=("id",)):
+    """Applies the same projection as build_select() to full rows already in
+    memory (e.g. from the local replica), so both paths return one shape."""
+    if fields is None:
+        rfq_fields = None
+        part_fields = None if can_see_pricing(role) else visible_part_columns(role)
+    else:
+        rfq_fields, part_fields = parse_fields(fields, role)
+        rfq_fields = list(required) + [c for c in rfq_fields if c not in required]
+
+    projected = []
+    for row in rows:
+        out = dict(row) if rfq_fields is None else {c: row.get(c) for c in rfq_fields}
+        parts = row.get(PARTS) or []
+        if part_fields:
+            out[PARTS] = [{c: part.get(c) for c in part_fields} for part in parts]
+        elif fields is None:
+            out[PARTS] = [dict(part) for part in parts]
+        projected.append(out)
+    return projected
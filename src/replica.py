@@ -0,0 +1,428 @@
+"""Optional SQLite read replica of RFQ-Tracker, Part_details and profiles.
+
+Meant for the desktop build: list, get and search reads are answered from
+DATA_DIR/replica.sqlite3 instead of a round trip to Supabase. A background
+thread pulls rows changed since the last sync (by updated_at, see
+sql/updated_at.sql) every REPLICA_SYNC_INTERVAL seconds, re-reading
+CHANGE_OVERLAP_SECONDS before the cursor for saves that committed late.
+Every REPLICA_RECONCILE_EVERY syncs it compares (id, updated_at) with
+Supabase to pick up deletes and any change the cursor still missed.
+Network calls happen outside the write lock; only the local writes are
+under it.
+
+Part lines are stored with the columns REPLICA_ROLE may see, so a sales
+desk never has pricing columns on disk; reads for roles that see more go
+to Supabase (get_replica(role)). Changing REPLICA_ROLE wipes the copy.
+
+Changes pulled from elsewhere are published through the rfq hooks so the
+search index, rollups and ETags follow. A save in this process marks the
+replica dirty: reads go to Supabase until the sync it triggers has caught
+up. A delete is applied locally straight away.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from src.config import Config
+from src.SupaClient import get_supabase
+from src.pagination import iter_rows, iter_changed_rows, rewind
+from src.projection import visible_part_columns, quote
+from src.hooks import on_rfq_saved, on_rfq_deleted, notify_rfq_saved, notify_rfq_deleted
+
+SCHEMA = """
+create table if not exists rfqs (
+    id integer primary key,
+    updated_at text,
+    created_at text,
+    Company_name text,
+    Sales_person text,
+    RFQ_purpose text,
+    Tentative_date text,
+    data text not null
+);
+create table if not exists parts (
+    id integer primary key,
+    rfq_id integer not null,
+    updated_at text,
+    data text not null
+);
+create index if not exists parts_rfq_id on parts (rfq_id);
+create table if not exists profiles (
+    user_id text primary key,
+    data text not null
+);
+create table if not exists sync_state (
+    name text primary key,
+    updated_at text,
+    last_id integer
+);
+create table if not exists replica_meta (
+    name text primary key,
+    value text
+);
+"""
+
+# Local columns mirrored out of `data` so the list can sort/page in SQL
+SORT_COLUMNS = ("created_at", "Company_name", "Sales_person", "RFQ_purpose", "Tentative_date")
+
+_thread = threading.local()
+
+
+def _dumps(row):
+    return json.dumps(row, separators=(",", ":"), default=str)
+
+
+class LocalReplica:
+    def __init__(self, path, interval=30, reconcile_every=10, page_size=1000, role="sales",
+                 overlap=10):
+        self.path = path
+        self.interval = interval
+        self.reconcile_every = reconcile_every
+        self.page_size = page_size
+        self.role = role
+        self.part_columns = tuple(visible_part_columns(role))
+        self.overlap = overlap
+        self.ready = False
+        self.enabled = True
+        self._dirty = 0          # saves not yet pulled back
+        self._version = 0        # bumped whenever local data changes
+        self._boot = uuid.uuid4().hex[:8]
+        self._syncs = 0
+        self._failures = 0       # consecutive failed syncs
+        self._removed = set()    # RFQs deleted locally while a sync is fetching
+        self._forgotten = set()  # profiles dropped (update-user) while a sync is fetching
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._worker = None
+
+    # --- storage ---
+
+    def _conn(self):
+        conns = getattr(_thread, "replica_conns", None)
+        if conns is None:
+            conns = _thread.replica_conns = {}
+        conn = conns.get(self.path)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            conns[self.path] = conn
+        return conn
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        stored = conn.execute("select value from replica_meta where name = 'role'").fetchone()
+        if stored is None or stored[0] != self.role:
+            # Another role's copy may hold columns this one must not keep on disk
+            with conn:
+                conn.execute("delete from parts")
+                conn.execute("delete from rfqs")
+                conn.execute("delete from sync_state")
+                conn.execute("insert or replace into replica_meta (name, value) values ('role', ?)", (self.role,))
+            conn.execute("vacuum")
+        # A previous run's copy can serve right away while the first sync catches up
+        self.ready = conn.execute("select 1 from sync_state where name = 'RFQ-Tracker'").fetchone() is not None
+        return self
+
+    def _state(self, conn, name):
+        row = conn.execute("select updated_at, last_id from sync_state where name = ?", (name,)).fetchone()
+        return tuple(row) if row else None
+
+    def _set_state(self, conn, name, since):
+        conn.execute("insert or replace into sync_state (name, updated_at, last_id) values (?, ?, ?)",
+                     (name, since[0] if since else None, since[1] if since else None))
+
+    def _store_rfq(self, conn, row):
+        header = {k: v for k, v in row.items() if k != "Part_details"}
+        conn.execute(
+            "insert or replace into rfqs (id, updated_at, created_at, Company_name, Sales_person, RFQ_purpose,"
+            " Tentative_date, data) values (?, ?, ?, ?, ?, ?, ?, ?)",
+            (header["id"], header.get("updated_at"), *(header.get(c) for c in SORT_COLUMNS), _dumps(header)))
+
+    def _store_part(self, conn, row):
+        conn.execute("insert or replace into parts (id, rfq_id, updated_at, data) values (?, ?, ?, ?)",
+                     (row["id"], row["rfq_id"], row.get("updated_at"), _dumps(row)))
+
+    def _delete_rfqs(self, conn, rfq_ids):
+        for rfq_id in rfq_ids:
+            conn.execute("delete from parts where rfq_id = ?", (rfq_id,))
+            conn.execute("delete from rfqs where id = ?", (rfq_id,))
+
+    # --- sync ---
+
+    def _select(self, table):
+        if table == "Part_details":
+            return ", ".join(quote(c) for c in self.part_columns + ("updated_at",))
+        return "*"
+
+    def _fetch_changed(self, supabase, conn, table):
+        """(cursor, rows changed since the last sync), re-reading the overlap window."""
+        since = self._state(conn, table)
+        rows = list(iter_changed_rows(supabase, table, self._select(table), since=rewind(since, self.overlap),
+                                      page_size=self.page_size))
+        return ((rows[-1]["updated_at"], rows[-1]["id"]) if rows else since), rows
+
+    def _fetch_stale(self, supabase, conn, table, local_table, fetched):
+        """Compares (id, updated_at) with Supabase. Returns (ids gone remotely,
+        rows whose remote version differs from the local one and from `fetched`)."""
+        remote = {row["id"]: row.get("updated_at")
+                  for row in iter_rows(supabase, table, "id, updated_at", page_size=self.page_size)}
+        local = dict(conn.execute(f"select id, updated_at from {local_table}").fetchall())
+        local.update({row["id"]: row.get("updated_at") for row in fetched})
+        gone = [i for i in local if i not in remote]
+        stale = sorted(i for i, stamp in remote.items() if local.get(i, "") != stamp)
+        rows = []
+        for i in range(0, len(stale), 200):
+            chunk = stale[i:i + 200]
+            rows.extend(iter_rows(supabase, table, self._select(table), page_size=self.page_size,
+                                  where=lambda q: q.in_("id", chunk)))
+        return gone, rows
+
+    def _store_new(self, conn, local_table, rows, store):
+        """Stores the rows not already held at that version; returns them."""
+        changed = []
+        for row in rows:
+            held = conn.execute(f"select updated_at from {local_table} where id = ?", (row["id"],)).fetchone()
+            if held is not None and held[0] == row.get("updated_at"):
+                continue  # re-read from the overlap window
+            store(conn, row)
+            changed.append(row)
+        return changed
+
+    def sync_once(self, supabase=None):
+        supabase = supabase or get_supabase()
+        dirty = self._dirty
+        initial = not self.ready
+        conn = self._conn()
+        self._removed.clear()
+        self._forgotten.clear()
+
+        # Round trips first, without the write lock
+        rfq_since, header_rows = self._fetch_changed(supabase, conn, "RFQ-Tracker")
+        part_since, part_rows = self._fetch_changed(supabase, conn, "Part_details")
+        gone, gone_parts = [], []
+        if initial or self._syncs % self.reconcile_every == 0:
+            gone, stale_rfqs = self._fetch_stale(supabase, conn, "RFQ-Tracker", "rfqs", header_rows)
+            gone_parts, stale_parts = self._fetch_stale(supabase, conn, "Part_details", "parts", part_rows)
+            header_rows += stale_rfqs
+            part_rows += stale_parts
+        profiles = supabase.table("profiles").select("*").execute().data or []
+
+        with self._write_lock, conn:
+            removed = self._removed
+            rfqs = self._store_new(conn, "rfqs", [r for r in header_rows if r["id"] not in removed], self._store_rfq)
+            parts = self._store_new(conn, "parts", [r for r in part_rows if r["rfq_id"] not in removed],
+                                    self._store_part)
+            gone = [i for i in gone if conn.execute("select 1 from rfqs where id = ?", (i,)).fetchone()]
+            self._delete_rfqs(conn, gone)
+            touched = {rfq_id for (rfq_id,) in conn.execute(
+                f"select distinct rfq_id from parts where id in ({','.join('?' * len(gone_parts))})",
+                gone_parts)} if gone_parts else set()
+            conn.executemany("delete from parts where id = ?", [(i,) for i in gone_parts])
+            self._set_state(conn, "RFQ-Tracker", rfq_since)
+            self._set_state(conn, "Part_details", part_since)
+            conn.execute("delete from profiles")
+            conn.executemany("insert or replace into profiles (user_id, data) values (?, ?)",
+                             [(str(p["user_id"]), _dumps(p)) for p in profiles
+                              if p.get("user_id") and str(p["user_id"]) not in self._forgotten])
+
+        self._syncs += 1
+        changed_ids = ({row["id"] for row in rfqs} | {row["rfq_id"] for row in parts} | touched) - set(gone)
+        if changed_ids or gone:
+            self._version += 1
+        self.ready = True
+        if self._dirty == dirty:
+            self._dirty = 0
+
+        if not initial:
+            # Let the search index, rollups and ETags follow remote changes
+            _thread.publishing = True
+            try:
+                for rfq in self.get_many(sorted(changed_ids)):
+                    notify_rfq_saved(rfq)
+                for rfq_id in gone:
+                    notify_rfq_deleted(rfq_id)
+            finally:
+                _thread.publishing = False
+        return len(changed_ids), len(gone)
+
+    def _run(self):
+        while not self._stop.is_set():
+            wait = self.interval
+            try:
+                self.sync_once()
+                self._failures = 0
+            except Exception as e:
+                if "updated_at" in str(e):
+                    print(f"Local replica disabled, run sql/updated_at.sql first: {e}")
+                    self.enabled = False
+                    return
+                self._failures += 1
+                # Retry soon: reads stay on Supabase while a local save is waiting to be pulled back
+                wait = min(self.interval, 2 ** self._failures)
+                print(f"Local replica sync failed ({self._failures} in a row), retrying in {wait}s: {e}")
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def start(self):
+        self.open()
+        self._worker = threading.Thread(target=self._run, name="local-replica", daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # --- local writes ---
+
+    def mark_dirty(self, rfq=None):
+        if getattr(_thread, "publishing", False):
+            return
+        self._dirty += 1
+        self._wake.set()
+
+    def remove(self, rfq_id):
+        if getattr(_thread, "publishing", False):
+            return
+        conn = self._conn()
+        with self._write_lock, conn:
+            self._delete_rfqs(conn, [rfq_id])
+            self._removed.add(rfq_id)
+        self._version += 1
+
+    def forget_profile(self, user_id):
+        """Drops a local profile copy so the next role lookup asks Supabase (after update-user)."""
+        conn = self._conn()
+        with self._write_lock, conn:
+            conn.execute("delete from profiles where user_id = ?", (str(user_id),))
+            self._forgotten.add(str(user_id))
+
+    # --- reads ---
+
+    @property
+    def serving(self):
+        return self.enabled and self.ready and not self._dirty
+
+    def covers(self, role):
+        """Whether the stored part columns include every one `role` may see."""
+        return set(visible_part_columns(role)) <= set(self.part_columns)
+
+    def version(self):
+        return f"replica:{self._boot}:{self._version}"
+
+    def _attach_parts(self, conn, rfqs):
+        by_id = {rfq["id"]: rfq for rfq in rfqs}
+        for rfq in rfqs:
+            rfq["Part_details"] = []
+        ids = list(by_id)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for rfq_id, data in conn.execute(
+                    f"select rfq_id, data from parts where rfq_id in ({marks}) order by id", chunk):
+                by_id[rfq_id]["Part_details"].append(json.loads(data))
+        return rfqs
+
+    def get_many(self, ids):
+        """Full rows (with Part_details) for `ids`, in that order."""
+        conn = self._conn()
+        found = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for (data,) in conn.execute(f"select data from rfqs where id in ({marks})", chunk):
+                row = json.loads(data)
+                found[row["id"]] = row
+        return self._attach_parts(conn, [found[i] for i in ids if i in found])
+
+    def get_rfq(self, rfq_id):
+        rows = self.get_many([rfq_id])
+        return rows[0] if rows else None
+
+    def list_rfqs(self, page):
+        """A keyset page in PageRequest order: (rows incl. the +1 probe row, total or None)."""
+        conn = self._conn()
+        sort, op, order = page.sort, "<" if page.desc else ">", "desc" if page.desc else "asc"
+        where, params = "", []
+        if page.after is not None:
+            value, row_id = page.after
+            if sort == "id":
+                where, params = f"where id {op} ?", [row_id]
+            elif value is None:
+                where, params = f"where {sort} is null and id {op} ?", [row_id]
+            else:
+                where = f"where ({sort} {op} ? or ({sort} = ? and id {op} ?) or {sort} is null)"
+                params = [value, value, row_id]
+        order_by = f"id {order}" if sort == "id" else f"{sort} is null, {sort} {order}, id {order}"
+        rows = [json.loads(data) for (data,) in conn.execute(
+            f"select data from rfqs {where} order by {order_by} limit ?", params + [page.limit + 1])]
+        total = conn.execute("select count(*) from rfqs").fetchone()[0] if page.is_first else None
+        return self._attach_parts(conn, rows), total
+
+    def iter_rfqs(self, batch=500):
+        """Every RFQ with its parts, in id order."""
+        conn = self._conn()
+        last_id = 0
+        while True:
+            rows = [json.loads(data) for (data,) in conn.execute(
+                "select data from rfqs where id > ? order by id limit ?", (last_id, batch))]
+            if not rows:
+                return
+            yield from self._attach_parts(conn, rows)
+            last_id = rows[-1]["id"]
+
+    def role_for(self, user_id):
+        row = self._conn().execute("select data from profiles where user_id = ?", (str(user_id),)).fetchone()
+        return json.loads(row[0]).get("role") if row else None
+
+
+replica = None
+
+
+def start_replica(path=None):
+    global replica
+    if replica is None:
+        replica = LocalReplica(path or os.path.join(Config.DATA_DIR, "replica.sqlite3"),
+                               interval=Config.REPLICA_SYNC_INTERVAL,
+                               reconcile_every=Config.REPLICA_RECONCILE_EVERY,
+                               role=Config.REPLICA_ROLE,
+                               overlap=Config.CHANGE_OVERLAP_SECONDS).start()
+    return replica
+
+
+def get_replica(role=None):
+    """The replica when it can answer reads (for `role`, if given), else None (read from Supabase)."""
+    if replica is None or not replica.serving or (role is not None and not replica.covers(role)):
+        return None
+    return replica
+
+
+def forget_profile(user_id):
+    if replica is not None:
+        replica.forget_profile(user_id)
+
+
+def rfq_rows(columns, supabase=None, role=None):
+    """All RFQ rows for index rebuilds: local when the replica is serving
+    (full rows, a superset of `columns`, with the part columns `role` sees),
+    else paged from Supabase."""
+    local = get_replica(role)
+    if local is not None and supabase is None:
+        return local.iter_rfqs()
+    return iter_rows(supabase or get_supabase(), "RFQ-Tracker", columns)
+
+
+@on_rfq_saved
+def _replica_saved_rfq(rfq):
+    if replica is not None:
+        replica.mark_dirty(rfq)
+
+@on_rfq_deleted
+def _replica_deleted_rfq(rfq_id):
+    if replica is not None:
+        replica.remove(rfq_id)
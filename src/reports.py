@@ -0,0 +1,265 @@
+import bisect
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from src.config import Config
+from src.lazy_index import LazyIndex
+from src.replica import rfq_rows
+from src.hooks import on_rfq_saved, on_rfq_deleted
+
+ROLLUP_COLUMNS = (
+    'id, created_at, "RFQ-no", Company_name, Customer_name, Sales_person, RFQ_purpose, Tentative_date, '
+    'Part_details(count)'
+)
+
+TREND_DAYS = 30
+TOP_SALES = 5
+TOP_COMPANIES = 10
+RECENT_ROWS = 15
+
+
+def report_zone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        print(f"Unknown REPORT_TIMEZONE {name!r}, reporting in UTC: {e}")
+        return timezone.utc
+
+
+def local_day(created_at, tz):
+    """'YYYY-MM-DD' of a timestamptz string in `tz` (naive values are UTC)."""
+    try:
+        moment = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError):
+        return (created_at or "")[:10]
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(tz).date().isoformat()
+
+
+def _item_count(rfq):
+    parts = rfq.get("Part_details") or []
+    # Part_details(count) comes back as [{"count": n}]
+    if len(parts) == 1 and set(parts[0]) == {"count"}:
+        return parts[0]["count"] or 0
+    return len(parts)
+
+
+class _Bucket:
+    """Totals for one (day, sales person, purpose) combination."""
+
+    __slots__ = ("rfqs", "items", "bidding", "companies")
+
+    def __init__(self):
+        self.rfqs = 0
+        self.items = 0
+        self.bidding = 0
+        self.companies = {}  # company -> [rfqs, items]
+
+    def apply(self, rec, sign):
+        self.rfqs += sign
+        self.items += sign * rec["items"]
+        if rec["purpose"] == "Bidding":
+            self.bidding += sign
+        stats = self.companies.setdefault(rec["company"], [0, 0])
+        stats[0] += sign
+        stats[1] += sign * rec["items"]
+        if stats[0] <= 0:
+            del self.companies[rec["company"]]
+
+
+class ReportRollups(LazyIndex):
+    """Per-day / per-salesperson / per-company RFQ counters behind /api/report-summary.
+
+    The buckets are keyed by (day, sales person, purpose) so every report
+    filter maps onto whole buckets; a summary costs O(days x people x purposes)
+    no matter how many RFQs there are. Saves and deletes adjust the buckets
+    through the rfq hooks; a full rebuild happens lazily after `ttl` seconds.
+    Days are calendar days in `tz` (REPORT_TIMEZONE), not UTC.
+    """
+
+    def __init__(self, ttl=300, tz=timezone.utc):
+        super().__init__(ttl)
+        self.tz = tz
+        self._reset()
+
+    def _reset(self):
+        self._records = {}   # rfq id -> record dict
+        self._days = {}      # day -> {(sales person, purpose): _Bucket}
+        self._day_keys = []  # sorted days
+        self._order = []     # sorted (created_at, id), newest last
+        self._pending = {}   # rfq id -> record, Bidding RFQs with a tentative date
+
+    # --- maintenance ---
+
+    def _record(self, rfq, previous=None):
+        created_at = rfq.get("created_at") or (previous["created_at"] if previous else "") or ""
+        return {
+            "id": rfq["id"],
+            "created_at": created_at,
+            "day": local_day(created_at, self.tz),
+            "rfq_no": rfq.get("RFQ-no"),
+            "company": rfq.get("Company_name"),
+            "customer": rfq.get("Customer_name"),
+            "sales_person": rfq.get("Sales_person"),
+            "purpose": rfq.get("RFQ_purpose"),
+            "tentative_date": rfq.get("Tentative_date"),
+            "items": _item_count(rfq),
+        }
+
+    def _apply(self, rec, sign):
+        day = rec["day"]
+        buckets = self._days.get(day)
+        if buckets is None:
+            buckets = self._days[day] = {}
+            bisect.insort(self._day_keys, day)
+        key = (rec["sales_person"], rec["purpose"])
+        bucket = buckets.get(key) or buckets.setdefault(key, _Bucket())
+        bucket.apply(rec, sign)
+        if bucket.rfqs <= 0:
+            del buckets[key]
+            if not buckets:
+                del self._days[day]
+                del self._day_keys[bisect.bisect_left(self._day_keys, day)]
+
+        order_key = (rec["created_at"], rec["id"])
+        if sign > 0:
+            bisect.insort(self._order, order_key)
+            if rec["purpose"] == "Bidding" and rec["tentative_date"]:
+                self._pending[rec["id"]] = rec
+        else:
+            i = bisect.bisect_left(self._order, order_key)
+            if i < len(self._order) and self._order[i] == order_key:
+                del self._order[i]
+            self._pending.pop(rec["id"], None)
+
+    def _add(self, rfq):
+        previous = self._records.pop(rfq["id"], None)
+        if previous:
+            self._apply(previous, -1)
+        rec = self._record(rfq, previous)
+        self._records[rec["id"]] = rec
+        self._apply(rec, +1)
+
+    def _load(self, supabase):
+        fresh = ReportRollups(self.ttl, self.tz)
+        for rfq in rfq_rows(ROLLUP_COLUMNS, supabase):
+            fresh._add(rfq)
+        return fresh
+
+    def _install(self, fresh):
+        self._records, self._days, self._day_keys = fresh._records, fresh._days, fresh._day_keys
+        self._order, self._pending = fresh._order, fresh._pending
+
+    _upsert = _add
+
+    def _remove(self, rfq_id):
+        rec = self._records.pop(rfq_id, None)
+        if rec:
+            self._apply(rec, -1)
+
+    # --- queries ---
+
+    @staticmethod
+    def _matches(rec, sales_person, purpose, date_from, date_to):
+        if sales_person and rec["sales_person"] != sales_person:
+            return False
+        if purpose and rec["purpose"] != purpose:
+            return False
+        if date_from and rec["day"] < date_from:
+            return False
+        if date_to and rec["day"] > date_to:
+            return False
+        return True
+
+    def summary(self, date_from=None, date_to=None, sales_person=None, purpose=None, today=None):
+        """Aggregates for the report page; dates are inclusive 'YYYY-MM-DD' strings."""
+        self.ensure_fresh()
+        today = today or datetime.now(self.tz).date()
+        trend_days = [(today - timedelta(days=i)).isoformat() for i in range(TREND_DAYS - 1, -1, -1)]
+        trend = dict.fromkeys(trend_days, 0)
+
+        with self._lock:
+            lo = bisect.bisect_left(self._day_keys, date_from) if date_from else 0
+            hi = bisect.bisect_right(self._day_keys, date_to) if date_to else len(self._day_keys)
+
+            rfqs = items = bidding = 0
+            purposes = {}
+            sales = {}
+            companies = {}
+            for day in self._day_keys[lo:hi]:
+                for (person, bucket_purpose), bucket in self._days[day].items():
+                    if sales_person and person != sales_person:
+                        continue
+                    if purpose and bucket_purpose != purpose:
+                        continue
+                    rfqs += bucket.rfqs
+                    items += bucket.items
+                    bidding += bucket.bidding
+                    if day in trend:
+                        trend[day] += bucket.rfqs
+                    label = bucket_purpose or "Not Specified"
+                    purposes[label] = purposes.get(label, 0) + bucket.rfqs
+                    stats = sales.setdefault(person or "Unassigned", [0, 0])
+                    stats[0] += bucket.rfqs
+                    stats[1] += bucket.items
+                    for company, (c_rfqs, c_items) in bucket.companies.items():
+                        c = companies.setdefault(company, [0, 0, day])
+                        c[0] += c_rfqs
+                        c[1] += c_items
+                        c[2] = max(c[2], day)
+
+            pending = sorted(
+                (rec for rec in self._pending.values()
+                 if self._matches(rec, sales_person, purpose, date_from, date_to)),
+                key=lambda rec: str(rec["tentative_date"]),
+            )
+
+            recent = []
+            for created_at, rfq_id in reversed(self._order):
+                rec = self._records[rfq_id]
+                if self._matches(rec, sales_person, purpose, date_from, date_to):
+                    recent.append(rec)
+                    if len(recent) == RECENT_ROWS:
+                        break
+
+            all_sales_people = sorted({
+                person for buckets in self._days.values() for person, _ in buckets if person
+            })
+
+        top_sales = sorted(sales.items(), key=lambda kv: kv[1][0], reverse=True)[:TOP_SALES]
+        top_companies = sorted(companies.items(), key=lambda kv: kv[1][0], reverse=True)[:TOP_COMPANIES]
+
+        def row(rec):
+            return {k: rec[k] for k in ("id", "created_at", "rfq_no", "company", "customer",
+                                        "sales_person", "purpose", "tentative_date", "items")}
+
+        return {
+            "totals": {
+                "rfqs": rfqs,
+                "items": items,
+                "companies": len(companies),
+                "sales_people": len(sales),
+                "bidding": bidding,
+                "bidding_share": round(bidding / rfqs * 100, 1) if rfqs else 0.0,
+            },
+            "trend": [{"date": day, "count": trend[day]} for day in trend_days],
+            "purposes": purposes,
+            "top_sales": [{"name": name, "rfqs": s[0], "items": s[1]} for name, s in top_sales],
+            "top_companies": [
+                {"company": name, "rfqs": c[0], "items": c[1], "last_date": c[2]} for name, c in top_companies
+            ],
+            "pending": [row(rec) for rec in pending],
+            "recent": [row(rec) for rec in recent],
+            "sales_people": all_sales_people,
+        }
+
+
+report_rollups = ReportRollups(ttl=Config.REPORT_ROLLUP_TTL, tz=report_zone(Config.REPORT_TIMEZONE))
+
+@on_rfq_saved
+def _rollup_saved_rfq(rfq):
+    report_rollups.upsert(rfq)
+
+@on_rfq_deleted
+def _rollup_deleted_rfq(rfq_id):
+    report_rollups.remove(rfq_id)
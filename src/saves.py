@@ -0,0 +1,67 @@
+"""The RFQ save behind /api/make-rfq-entry, shared with the save journal."""
+from src.parts import part_row, diff_parts, apply_part_changes, SALES_EDITABLE_COLUMNS
+from src.hooks import notify_rfq_saved
+from src.projection import can_see_pricing
+
+
+def header_from_payload(data, user_id):
+    return {
+        "RFQ-no": data.get('rfq_no'),
+        "Company_name": data.get('company_name'),
+        "Sales_person": data.get('sales_person'),
+        "Customer_name": data.get('customer_name'),
+        "Customer_email": data.get('customer_email'),
+        "Customer_phone": data.get('customer_phone'),
+        "Customer_address_1": data.get('customer_address_1'),
+        "Customer_address_2": data.get('customer_address_2'),
+        "Customer_city": data.get('customer_city'),
+        "Customer_state": data.get('customer_state'),
+        "Customer_pincode": data.get('customer_pincode'),
+        "Customer_country": data.get('customer_country'),
+        "RFQ_purpose": data.get('rfq_purpose'),
+        "Tentative_date": data.get('tentative_date') or None,
+        "created_by": user_id
+    }
+
+
+def save_rfq(supabase, data, role, user_id, on_created=None):
+    """Creates or updates an RFQ from the editor payload.
+
+    `on_created(rfq_id)` runs as soon as a new header is inserted, before
+    its lines, so a caller that retries can turn the retry into an update.
+    Returns (rfq_id, {"inserted": n, "updated": n, "deleted": n}).
+    """
+    header_data = header_from_payload(data, user_id)
+    items = data.get('items', [])
+    existing_rfq_id = data.get('id')
+
+    if existing_rfq_id:
+        rfq_id = int(existing_rfq_id)
+        supabase.table("RFQ-Tracker").update(header_data).eq("id", rfq_id).execute()
+        created_at = None
+
+        # Diff against the stored lines instead of delete + re-insert
+        existing = supabase.table("Part_details").select("*").eq("rfq_id", rfq_id).execute().data or []
+        incoming = [dict(part_row(item, rfq_id), id=item.get('id')) for item in items]
+        # Roles that cannot read pricing send it blank: never write those columns back
+        columns = None if can_see_pricing(role) else SALES_EDITABLE_COLUMNS
+        inserts, updates, delete_ids = diff_parts(existing, incoming, columns)
+        apply_part_changes(supabase, rfq_id, inserts, updates, delete_ids)
+
+        updated_ids = {row['id'] for row in updates}
+        unchanged = [row for row in existing if row['id'] not in updated_ids and row['id'] not in delete_ids]
+        saved_parts = unchanged + updates + inserts
+    else:
+        header_res = supabase.table("RFQ-Tracker").insert(header_data).execute()
+        rfq_id = header_res.data[0]['id']
+        created_at = header_res.data[0].get('created_at')
+        if on_created is not None:
+            on_created(rfq_id)
+
+        inserts, updates, delete_ids = [part_row(item, rfq_id) for item in items], [], []
+        if inserts:
+            supabase.table("Part_details").insert(inserts).execute()
+        saved_parts = inserts
+
+    notify_rfq_saved({**header_data, "id": rfq_id, "created_at": created_at, "Part_details": saved_parts})
+    return rfq_id, {"inserted": len(inserts), "updated": len(updates), "deleted": len(delete_ids)}
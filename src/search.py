@@ -0,0 +1,158 @@
+from collections import defaultdict
+from src.config import Config
+from src.lazy_index import LazyIndex
+from src.replica import rfq_rows
+from src.hooks import on_rfq_saved, on_rfq_deleted
+
+# Searchable header fields and how much a hit in each one counts
+FIELD_WEIGHTS = {
+    "RFQ-no": 3.0,
+    "Company_name": 2.0,
+    "Customer_name": 2.0,
+    "Customer_email": 1.0,
+    "RFQ_purpose": 0.5,
+    "Sales_person": 1.0,
+}
+PART_FIELDS = ("RFQ-part-no", "Quoted-part-no")
+PART_WEIGHT = 1.5
+
+INDEX_COLUMNS = (
+    'id, created_at, "RFQ-no", Company_name, Customer_name, Customer_email, RFQ_purpose, Sales_person, '
+    'Part_details("RFQ-part-no", "Quoted-part-no")'
+)
+
+NGRAM = 3
+
+
+def _normalize(value):
+    return str(value).strip().lower() if value not in (None, "") else ""
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _document(rfq):
+    """Flattens an RFQ row into [(weight, text)] for the index."""
+    texts = []
+    for field, weight in FIELD_WEIGHTS.items():
+        text = _normalize(rfq.get(field))
+        if text:
+            texts.append((weight, text))
+    for part in rfq.get("Part_details") or []:
+        for field in PART_FIELDS:
+            text = _normalize(part.get(field))
+            if text:
+                texts.append((PART_WEIGHT, text))
+    return texts
+
+
+class RFQSearchIndex(LazyIndex):
+    """Trigram inverted index over RFQ headers and their part numbers.
+
+    Built lazily from Supabase on first use and rebuilt after `ttl` seconds so
+    writes made by other workers show up; writes in this process are applied
+    immediately through the rfq_saved/rfq_deleted hooks.
+    """
+
+    def __init__(self, ttl=300):
+        super().__init__(ttl)
+        self._docs = {}                  # rfq id -> (created_at, [(weight, text)], grams)
+        self._postings = defaultdict(set)
+
+    # --- maintenance ---
+
+    def _add(self, rfq_id, created_at, texts):
+        grams = set()
+        for _, text in texts:
+            grams |= _ngrams(text)
+        for gram in grams:
+            self._postings[gram].add(rfq_id)
+        self._docs[rfq_id] = (created_at, texts, grams)
+
+    def _drop(self, rfq_id):
+        doc = self._docs.pop(rfq_id, None)
+        if not doc:
+            return None
+        for gram in doc[2]:
+            ids = self._postings.get(gram)
+            if ids:
+                ids.discard(rfq_id)
+                if not ids:
+                    del self._postings[gram]
+        return doc
+
+    def _load(self, supabase):
+        fresh = RFQSearchIndex(self.ttl)
+        for rfq in rfq_rows(INDEX_COLUMNS, supabase):
+            fresh._add(rfq["id"], rfq.get("created_at") or "", _document(rfq))
+        return fresh._docs, fresh._postings
+
+    def _install(self, state):
+        self._docs, self._postings = state
+
+    def _upsert(self, rfq):
+        rfq_id = rfq["id"]
+        old = self._drop(rfq_id)
+        created_at = rfq.get("created_at") or (old[0] if old else "")
+        self._add(rfq_id, created_at, _document(rfq))
+
+    def _remove(self, rfq_id):
+        self._drop(rfq_id)
+
+    # --- queries ---
+
+    def search(self, query, limit=50, offset=0):
+        """Returns (total, [rfq ids]) ranked by field weight, then newest first.
+
+        Every whitespace-separated term must appear as a substring of some
+        indexed field, like the old client-side filter.
+        """
+        terms = sorted({t for t in _normalize(query).split() if t}, key=len, reverse=True)
+        if not terms:
+            return 0, []
+
+        self.ensure_fresh()
+        with self._lock:
+            candidates = None
+            for term in terms:
+                if len(term) < NGRAM:
+                    break  # too short for the index; verified below
+                for gram in _ngrams(term):
+                    ids = self._postings.get(gram, ())
+                    candidates = set(ids) if candidates is None else candidates & ids
+                    if not candidates:
+                        return 0, []
+            if candidates is None:
+                candidates = self._docs.keys()
+
+            ranked = []
+            for rfq_id in candidates:
+                created_at, texts, _ = self._docs[rfq_id]
+                score = 0.0
+                for term in terms:
+                    best = 0.0
+                    for weight, text in texts:
+                        if term not in text:
+                            continue
+                        kind = 3 if text == term else 2 if text.startswith(term) else 1
+                        best = max(best, weight * kind)
+                    if not best:
+                        break
+                    score += best
+                else:
+                    ranked.append((score, created_at, rfq_id))
+
+        ranked.sort(reverse=True)
+        return len(ranked), [rfq_id for _, _, rfq_id in ranked[offset:offset + limit]]
+
+
+search_index = RFQSearchIndex(ttl=Config.SEARCH_INDEX_TTL)
+
+@on_rfq_saved
+def _index_saved_rfq(rfq):
+    search_index.upsert(rfq)
+
+@on_rfq_deleted
+def _index_deleted_rfq(rfq_id):
+    search_index.remove(rfq_id)
@@ -0,0 +1,65 @@
+"""Startup timing, to follow the desktop build's time-to-first-window.
+
+app.py imports this first and calls mark() after each stage of its own
+imports and setup; the first request served (the window's first page)
+closes the report. With STARTUP_REPORT set, the stages are printed and
+appended to DATA_DIR/startup_times.jsonl, one line per launch.
+
+For a per-module breakdown of a stage, run `python -X importtime app.py`
+(or set PYTHONPROFILEIMPORTTIME=1 for the frozen build).
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+_started = time.perf_counter()
+_base_modules = len(sys.modules)
+_marks = []  # (stage, seconds since start, modules loaded)
+_finished = False
+
+
+def mark(stage):
+    _marks.append((stage, time.perf_counter() - _started, len(sys.modules)))
+
+
+def stages():
+    """[{"stage", "ms", "total_ms", "modules"}] with each stage's own share."""
+    out, previous, previous_modules = [], 0.0, _base_modules
+    for stage, elapsed, modules in _marks:
+        out.append({"stage": stage, "ms": round((elapsed - previous) * 1000, 1),
+                    "total_ms": round(elapsed * 1000, 1), "modules": modules - previous_modules})
+        previous, previous_modules = elapsed, modules
+    return out
+
+
+def first_request(report=False, path=None):
+    """Closes the timeline on the first request; later calls return at once.
+    With `report`, prints the stages and appends them to `path`."""
+    global _finished
+    if _finished:
+        return
+    _finished = True
+    mark("first request")
+    if report:
+        write_report(path)
+
+
+def write_report(path=None):
+    rows = stages()
+    print("Startup:")
+    for row in rows:
+        print(f"  {row['stage']:<22} {row['ms']:>8.1f} ms  {row['total_ms']:>8.1f} ms total  +{row['modules']} modules")
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "at": datetime.now(timezone.utc).isoformat(),
+                "frozen": bool(getattr(sys, "frozen", False)),
+                "stages": rows,
+            }) + "\n")
+    except Exception as e:
+        print(f"Could not write startup report: {e}")
@@ -0,0 +1,155 @@
+"""Autocomplete for the editor's free-text fields, behind /api/suggest.
+
+Per field, the distinct values (case-folded) are kept in a sorted list next
+to how often each occurs; a prefix is a bisect range of that list, ranked
+by frequency. Answers for one- and two-letter prefixes, the widest ranges,
+are memoised until the field changes. Saves and deletes adjust the counts
+through the rfq hooks; a full rebuild happens lazily after `ttl` seconds.
+"""
+import bisect
+import heapq
+from collections import Counter
+from src.config import Config
+from src.lazy_index import LazyIndex
+from src.replica import rfq_rows
+from src.hooks import on_rfq_saved, on_rfq_deleted
+
+# field name in the API -> (columns on the RFQ, columns on its Part_details)
+FIELDS = {
+    "company": (("Company_name",), ()),
+    "customer": (("Customer_name",), ()),
+    "sales_person": (("Sales_person",), ()),
+    "supplier": ((), ("Supplier",)),
+    "make": ((), ("Make",)),
+    "part_no": ((), ("RFQ-part-no", "Quoted-part-no")),
+}
+
+INDEX_COLUMNS = (
+    'id, Company_name, Customer_name, Sales_person, '
+    'Part_details("RFQ-part-no", "Quoted-part-no", Supplier, Make)'
+)
+
+MEMO_PREFIX = 2
+
+
+def _key(value):
+    return " ".join(str(value).split()).casefold()
+
+
+def _values(rfq):
+    """[(field, value)] an RFQ contributes, one per column occurrence."""
+    out = []
+    for field, (rfq_columns, part_columns) in FIELDS.items():
+        for column in rfq_columns:
+            if rfq.get(column) not in (None, ""):
+                out.append((field, str(rfq[column]).strip()))
+        for part in rfq.get("Part_details") or []:
+            # A part quoted as itself counts once
+            seen = set()
+            for column in part_columns:
+                value = part.get(column)
+                if value not in (None, "") and _key(value) not in seen:
+                    seen.add(_key(value))
+                    out.append((field, str(value).strip()))
+    return out
+
+
+class _FieldIndex:
+    def __init__(self):
+        self.keys = []         # sorted case-folded values
+        self.counts = {}       # key -> total occurrences
+        self.spellings = {}    # key -> Counter of the spellings as typed
+        self.memo = {}         # short prefix -> ranked [(value, count)]
+
+    def add(self, value, sign):
+        key = _key(value)
+        if not key:
+            return
+        self.memo.clear()
+        if sign > 0:
+            if key not in self.counts:
+                bisect.insort(self.keys, key)
+                self.counts[key] = 0
+                self.spellings[key] = Counter()
+            self.counts[key] += 1
+            self.spellings[key][value] += 1
+            return
+        if key not in self.counts:
+            return
+        self.counts[key] -= 1
+        self.spellings[key][value] -= 1
+        if self.spellings[key][value] <= 0:
+            del self.spellings[key][value]
+        if self.counts[key] <= 0:
+            del self.counts[key], self.spellings[key]
+            del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def ranked(self, prefix, limit):
+        start = bisect.bisect_left(self.keys, prefix)
+        # Every key starting with `prefix` sorts before prefix + the highest code point
+        end = bisect.bisect_left(self.keys, prefix + "\U0010ffff", start)
+        top = heapq.nsmallest(limit, self.keys[start:end], key=lambda k: (-self.counts[k], k))
+        return [(self.spellings[k].most_common(1)[0][0], self.counts[k]) for k in top]
+
+
+class SuggestIndex(LazyIndex):
+    def __init__(self, ttl=300):
+        super().__init__(ttl)
+        self._reset()
+
+    def _reset(self):
+        self._fields = {field: _FieldIndex() for field in FIELDS}
+        self._rfqs = {}   # rfq id -> [(field, value)] it contributed
+
+    # --- maintenance ---
+
+    def _drop(self, rfq_id):
+        for field, value in self._rfqs.pop(rfq_id, ()):
+            self._fields[field].add(value, -1)
+
+    def _add(self, rfq):
+        self._drop(rfq["id"])
+        values = _values(rfq)
+        for field, value in values:
+            self._fields[field].add(value, +1)
+        self._rfqs[rfq["id"]] = values
+
+    def _load(self, supabase):
+        fresh = SuggestIndex(self.ttl)
+        for rfq in rfq_rows(INDEX_COLUMNS, supabase):
+            fresh._add(rfq)
+        return fresh
+
+    def _install(self, fresh):
+        self._fields, self._rfqs = fresh._fields, fresh._rfqs
+
+    _upsert = _add
+
+    def _remove(self, rfq_id):
+        self._drop(rfq_id)
+
+    # --- queries ---
+
+    def suggest(self, field, prefix, limit=10):
+        """[(value, count)] for values of `field` starting with `prefix`, most used first."""
+        self.ensure_fresh()
+        prefix = _key(prefix)
+        with self._lock:
+            index = self._fields[field]
+            if len(prefix) > MEMO_PREFIX:
+                return index.ranked(prefix, limit)
+            ranked = index.memo.get(prefix)
+            if ranked is None:
+                ranked = index.memo[prefix] = index.ranked(prefix, Config.SUGGEST_MAX_RESULTS)
+            return ranked[:limit]
+
+
+suggest_index = SuggestIndex(ttl=Config.SUGGEST_INDEX_TTL)
+
+@on_rfq_saved
+def _suggest_saved_rfq(rfq):
+    suggest_index.upsert(rfq)
+
+@on_rfq_deleted
+def _suggest_deleted_rfq(rfq_id):
+    suggest_index.remove(rfq_id)
@@ -0,0 +1,53 @@
+"""Shared fixtures: the app's modules run against the in-process Supabase
+fake from benchmarks/, with the local replica off and DATA_DIR in a temp
+directory, so no test talks to a real project."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Config reads these at import; nothing is sent anywhere
+os.environ.setdefault("SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ["LOCAL_REPLICA"] = "off"
+os.environ["QUOTE_TRACKER_DATA_DIR"] = tempfile.mkdtemp(prefix="quote-tracker-tests-")
+
+import pytest  # noqa: E402
+from benchmarks.datasets import make_rfqs  # noqa: E402
+from benchmarks.fake_supabase import FakeSupabase, install  # noqa: E402
+
+
+@pytest.fixture
+def fake():
+    """An empty fake, installed as every get_supabase()."""
+    return install(FakeSupabase())
+
+
+@pytest.fixture
+def loaded(fake):
+    """The fake holding 60 synthetic RFQs with their lines."""
+    fake.load_rfqs(make_rfqs(60))
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def forget_sessions():
+    """Fake tokens and user ids repeat between fakes: start every test with empty auth caches."""
+    from src.auth.utils import _session_cache, _role_cache
+    _session_cache.clear()
+    _role_cache.clear()
+
+
+@pytest.fixture
+def client(fake):
+    """client(role) -> a Flask test client signed in as a new user with that role."""
+    from app import app
+
+    def make(role="admin"):
+        uid = fake.add_user(f"{role}-{len(fake.users)}@example.com", role=role)
+        test_client = app.test_client()
+        test_client.set_cookie("access_token", fake.issue_token(uid))
+        test_client.user_id = uid
+        return test_client
+    return make
@@ -0,0 +1,77 @@
+"""Checks shared by the index tests: the in-process indexes, kept current
+through upsert/remove, must end up exactly where a full rebuild from the
+same data would."""
+
+
+def saved_row(fake, rfq_id):
+    """What the rfq_saved hook carries: the header with all of its lines."""
+    return fake.table("RFQ-Tracker").select("*, Part_details(*)").eq("id", rfq_id).execute().data[0]
+
+
+def edit(fake, index):
+    """A mix of saves and deletes, each applied to `index` like the hooks do."""
+    rfqs, parts = fake.tables["RFQ-Tracker"], fake.tables["Part_details"]
+    lines = fake.children("Part_details", "rfq_id")
+
+    fake.write("RFQ-Tracker", rfqs[1], {"Company_name": "Renamed Corp", "Sales_person": "zoe"})
+    index.upsert(saved_row(fake, 1))
+
+    fake.write("RFQ-Tracker", rfqs[2], {"RFQ_purpose": "Bidding", "Tentative_date": "2030-01-01"})
+    line = next(iter(lines[2].values()))
+    fake.write("Part_details", parts[line["id"]], {"RFQ-part-no": "NEW-PART-1", "Unit$": 3.25, "Supplier": "Digi"})
+    index.upsert(saved_row(fake, 2))
+
+    for line in list(lines[3].values()):
+        fake.remove("Part_details", line["id"])
+    index.upsert(saved_row(fake, 3))
+
+    fake.add("Part_details", {"rfq_id": 4, "RFQ-part-no": "lm 358", "Quoted-part-no": "LM358", "Make": "TI",
+                              "Unit$": 0.4, "Resale": 0.9})
+    index.upsert(saved_row(fake, 4))
+
+    for rfq_id in (5, 6):
+        fake.remove("RFQ-Tracker", rfq_id)
+        index.remove(rfq_id)
+    index.remove(9999)  # never existed
+
+    new_id = fake.add("RFQ-Tracker", {"RFQ-no": "RFQ-NEW", "Company_name": "Acme Components", "Sales_person": "kim",
+                                      "RFQ_purpose": "Buying"})["id"]
+    fake.add("Part_details", {"rfq_id": new_id, "RFQ-part-no": "NEW-PART-1", "Make": "ST", "Resale": 5})
+    index.upsert(saved_row(fake, new_id))
+
+    # Saved twice in a row, unchanged the second time
+    index.upsert(saved_row(fake, 1))
+    return new_id
+
+
+def rebuilt(cls, fake):
+    index = cls(ttl=3600)
+    index.rebuild(fake)
+    return index
+
+
+def check_incremental(cls, state, fake):
+    live = rebuilt(cls, fake)
+    edit(fake, live)
+    assert state(live) == state(rebuilt(cls, fake))
+
+
+def check_writes_before_first_build(cls, state, fake):
+    index = cls(ttl=3600)
+    index.upsert({"id": 1, "Company_name": "Not stored", "Part_details": []})
+    index.remove(2)
+    index.rebuild(fake)
+    assert state(index) == state(rebuilt(cls, fake))
+
+
+def check_writes_during_rebuild(cls, state, fake, monkeypatch):
+    index = rebuilt(cls, fake)
+    load = index._load
+
+    def racing_load(supabase):
+        fresh = load(supabase)  # read before the edits below
+        edit(fake, index)
+        return fresh
+    monkeypatch.setattr(index, "_load", racing_load)
+    index.rebuild(fake)
+    assert state(index) == state(rebuilt(cls, fake))
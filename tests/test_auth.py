@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from src.auth import utils
+from src.auth.tokens import verify_access_token, read_claims
+from src.config import Config
+
+SECRET = "test-jwt-secret"
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def make_token(secret=SECRET, alg="HS256", **claims):
+    claims.setdefault("sub", "user-1")
+    claims.setdefault("exp", int(time.time()) + 600)
+    header = _b64(json.dumps({"alg": alg, "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    digest = {"HS256": hashlib.sha256, "HS512": hashlib.sha512}.get(alg, hashlib.sha256)
+    signature = _b64(hmac.new(secret.encode(), f"{header}.{payload}".encode(), digest).digest())
+    return f"{header}.{payload}.{signature}"
+
+
+def test_verify_access_token():
+    claims = verify_access_token(make_token(email="a@example.com"), SECRET)
+    assert claims["sub"] == "user-1" and claims["email"] == "a@example.com"
+    assert verify_access_token(make_token(alg="HS512"), SECRET)["sub"] == "user-1"
+
+    assert verify_access_token(make_token(secret="other"), SECRET) is None
+    assert verify_access_token(make_token(exp=int(time.time()) - 5), SECRET) is None
+    assert verify_access_token(make_token(exp=int(time.time()) - 5), SECRET, leeway=30) is not None
+    assert verify_access_token(make_token(sub=""), SECRET) is None
+    assert verify_access_token(make_token(alg="none"), SECRET) is None
+    assert verify_access_token("not.a.token", SECRET) is None
+    assert verify_access_token(make_token(), None) is None
+    assert read_claims(make_token(secret="other"))["sub"] == "user-1"  # unverified read
+
+
+def test_local_verification_skips_supabase(fake, monkeypatch):
+    monkeypatch.setattr(Config, "SUPABASE_JWT_SECRET", SECRET)
+    token = make_token(sub="user-9", email="nine@example.com")
+    assert utils._resolve_session(token) == ("user-9", "nine@example.com")
+    assert fake.calls == 0
+    assert utils._resolve_session(make_token(secret="forged")) is None
+    assert utils._resolve_session(make_token(exp=int(time.time()) - 1)) is None
+
+
+def test_remote_verification_is_cached_until_expiry(fake, monkeypatch):
+    monkeypatch.setattr(Config, "SUPABASE_JWT_SECRET", None)
+    uid = fake.add_user("remote@example.com")
+    token = make_token(sub=uid, secret="unknown to the server", exp=int(time.time()) + 2)
+    fake.tokens[token] = uid
+
+    assert utils._resolve_session(token) == (uid, "remote@example.com")
+    calls = fake.calls
+    assert utils._resolve_session(token) == (uid, "remote@example.com")
+    assert fake.calls == calls  # second request answered from the cache
+
+    # An entry past the token's exp is dropped and checked again
+    user_id, email, _ = utils._session_cache.get(token)
+    utils._session_cache.set(token, (user_id, email, time.time() - 1))
+    del fake.tokens[token]
+    assert utils._resolve_session(token) is None
+
+
+def test_role_cache_and_invalidation(fake, client):
+    sales = client("sales")
+    assert sales.get("/api/list-users").status_code == 403
+
+    profile = next(p for p in fake.tables["profiles"].values() if p["user_id"] == sales.user_id)
+    fake.write("profiles", profile, {"role": "admin"})
+    assert sales.get("/api/list-users").status_code == 403  # role still cached
+    utils.invalidate_user(sales.user_id)
+    assert sales.get("/api/list-users").status_code == 200
+
+
+def test_unauthenticated(fake):
+    from app import app
+    assert app.test_client().get("/api/list-rfq-entry").status_code == 401
+    anonymous = app.test_client()
+    anonymous.set_cookie("access_token", "made-up")
+    assert anonymous.get("/api/list-rfq-entry").status_code == 401
+
+
+@pytest.mark.parametrize("exp", [None, time.time() + 10_000, time.time() + 30])
+def test_session_ttl_never_outlives_the_token(exp):
+    ttl = utils._session_ttl(exp)
+    assert ttl <= Config.SESSION_CACHE_TTL
+    if exp:
+        assert ttl <= exp - time.time() + 1
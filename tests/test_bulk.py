@@ -0,0 +1,80 @@
+import pytest
+from src import hooks
+from src.bulk import parse_bulk_request, bulk_delete, bulk_update
+
+
+@pytest.fixture
+def notified(monkeypatch):
+    """Records rfq hook notifications instead of updating the indexes."""
+    seen = {"saved": [], "deleted": []}
+    monkeypatch.setattr(hooks, "_saved_listeners", [seen["saved"].append])
+    monkeypatch.setattr(hooks, "_deleted_listeners", [seen["deleted"].append])
+    return seen
+
+
+@pytest.mark.parametrize("data, error", [
+    (["delete"], "Expected a JSON object"),
+    ({"action": "archive", "ids": [1]}, "action must be one of"),
+    ({"action": "delete", "ids": []}, "non-empty list"),
+    ({"action": "delete", "ids": ["x"]}, "ids must be integers"),
+    ({"action": "delete", "ids": [1, 2, 3, 4]}, "At most 3 ids"),
+    ({"action": "set_purpose", "ids": [1], "purpose": "Selling"}, "purpose must be one of"),
+    ({"action": "set_purpose", "ids": [1], "purpose": "Bidding"}, "tentative_date is required"),
+    ({"action": "set_purpose", "ids": [1], "purpose": "Buying", "tentative_date": "18/10/2026"}, "YYYY-MM-DD"),
+    ({"action": "reassign", "ids": [1], "sales_person": "  "}, "sales_person is required"),
+])
+def test_invalid_requests(data, error):
+    with pytest.raises(ValueError, match=error):
+        parse_bulk_request(data, max_ids=3)
+
+
+def test_parse_keeps_order_and_drops_duplicates():
+    assert parse_bulk_request({"action": "reassign", "ids": [3, "1", 3], "sales_person": " kim "}, 3) == (
+        "reassign", [3, 1], {"Sales_person": "kim"})
+    assert parse_bulk_request({"action": "set_purpose", "ids": [1], "purpose": "Bidding",
+                               "tentative_date": "2026-11-01"}, 3)[2] == {
+        "RFQ_purpose": "Bidding", "Tentative_date": "2026-11-01"}
+
+
+def test_calls_do_not_grow_with_the_ids(loaded, notified):
+    calls = loaded.calls
+    bulk_update(loaded, [1, 2], {"Sales_person": "kim"})
+    few = loaded.calls - calls
+    calls = loaded.calls
+    bulk_update(loaded, list(range(3, 40)), {"Sales_person": "kim"})
+    assert loaded.calls - calls == few == 2
+    calls = loaded.calls
+    bulk_delete(loaded, list(range(40, 61)))
+    assert loaded.calls - calls == 2
+
+
+def test_delete_reports_each_id(loaded, notified):
+    assert bulk_delete(loaded, [5, 999, 6]) == [
+        {"id": 5, "status": "deleted"}, {"id": 999, "status": "not_found"}, {"id": 6, "status": "deleted"}]
+    assert 5 not in loaded.tables["RFQ-Tracker"] and 6 not in loaded.tables["RFQ-Tracker"]
+    assert not [p for p in loaded.tables["Part_details"].values() if p["rfq_id"] in (5, 6)]
+    assert notified["deleted"] == [5, 6]
+
+
+def test_update_notifies_with_the_lines(loaded, notified):
+    results = bulk_update(loaded, [7, 998], {"RFQ_purpose": "Buying"})
+    assert results == [{"id": 7, "status": "updated"}, {"id": 998, "status": "not_found"}]
+    [row] = notified["saved"]
+    assert row["id"] == 7 and row["RFQ_purpose"] == "Buying"
+    assert row["Part_details"] == [p for p in loaded.tables["Part_details"].values() if p["rfq_id"] == 7]
+
+
+def test_bulk_route(loaded, client, notified):
+    sales = client("sales")
+    refused = sales.post("/api/rfqs/bulk", json={"action": "delete", "ids": [1]})
+    assert refused.status_code == 403 and 1 in loaded.tables["RFQ-Tracker"]
+    assert sales.post("/api/rfqs/bulk", json={"action": "reassign", "ids": [1]}).status_code == 400
+
+    response = sales.post("/api/rfqs/bulk", json={"action": "reassign", "ids": [1, 2, 999], "sales_person": "kim"})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["done"] == 2 and body["not_found"] == 1 and body["action"] == "reassign"
+    assert loaded.tables["RFQ-Tracker"][1]["Sales_person"] == loaded.tables["RFQ-Tracker"][2]["Sales_person"] == "kim"
+
+    deleted = client("admin").post("/api/rfqs/bulk", json={"action": "delete", "ids": [1, 2]}).get_json()
+    assert deleted["done"] == 2 and 1 not in loaded.tables["RFQ-Tracker"]
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+import pytest
+from src.changes import ChangeFeed, encode_feed_cursor, decode_feed_cursor
+from src.config import Config
+
+COLUMNS = "id, updated_at, Company_name"
+
+
+def follow(feed, supabase, cursor, limit=200):
+    """Every page up to the head: (changed ids, deleted ids, final cursor)."""
+    changed, deleted = [], []
+    for _ in range(100):
+        rows, gone, cursor, more = feed.changes(supabase, cursor, COLUMNS, limit)
+        changed += [row["id"] for row in rows]
+        deleted += gone
+        if not more:
+            return changed, deleted, cursor
+    raise AssertionError("the feed never caught up")
+
+
+def test_cursor_round_trip():
+    cursor = encode_feed_cursor(("2025-01-01T00:00:00+00:00", 5), ("2025-01-02T00:00:00+00:00", 9), exact=True)
+    assert decode_feed_cursor(cursor) == (("2025-01-01T00:00:00+00:00", 5), ("2025-01-02T00:00:00+00:00", 9), True)
+    with pytest.raises(ValueError):
+        decode_feed_cursor("garbage")
+
+
+def test_missing_tombstone_position_means_now():
+    before = datetime.now().astimezone().isoformat()
+    changed, deleted, exact = decode_feed_cursor(encode_feed_cursor(None, None))
+    assert changed is None and not exact
+    assert deleted[0] >= before
+    # A cursor from before tombstones existed ([updated_at, id, null, null])
+    legacy = encode_feed_cursor(("2025-01-01T00:00:00+00:00", 5), None)
+    assert decode_feed_cursor(legacy)[1][0] >= before
+
+
+def test_edits_and_deletes_after_the_head(loaded):
+    feed = ChangeFeed()
+    head = feed.head(loaded)
+    # The overlap re-reads whatever changed just before the head
+    baseline, no_deletes, _ = follow(feed, loaded, head)
+    assert no_deletes == []
+
+    loaded.write("RFQ-Tracker", loaded.tables["RFQ-Tracker"][3], {"Company_name": "Edited"})
+    loaded.remove("RFQ-Tracker", 4)
+    new_id = loaded.add("RFQ-Tracker", {"Company_name": "New"})["id"]
+
+    changed, deleted, cursor = follow(feed, loaded, head)
+    assert {3, new_id} <= set(changed) <= {3, new_id, *baseline}
+    assert deleted == [4]
+    assert 4 not in loaded.tables["RFQ-Tracker"]
+    # Rows inside the overlap window come again; clients apply them by id
+    again, deleted_again, _ = follow(feed, loaded, cursor)
+    assert set(again) <= {3, new_id, *baseline} and set(deleted_again) <= {4}
+
+
+def test_late_commit_inside_the_overlap_is_delivered(loaded):
+    feed = ChangeFeed()
+    loaded.write("RFQ-Tracker", loaded.tables["RFQ-Tracker"][1], {"Company_name": "Seen"})
+    _, _, cursor = follow(feed, loaded, feed.head(loaded))
+
+    # A save whose transaction started before the cursor was issued, committed after
+    (position, _), _, _ = decode_feed_cursor(cursor)
+    started = (datetime.fromisoformat(position) - timedelta(seconds=Config.CHANGE_OVERLAP_SECONDS / 2)).isoformat()
+    late = loaded.tables["RFQ-Tracker"][2]
+    loaded.write("RFQ-Tracker", late, {"Company_name": "Late"})
+    late["updated_at"] = started
+
+    changed, _, _ = follow(feed, loaded, cursor)
+    assert 2 in changed
+
+
+def test_busy_window_pages_exactly(loaded):
+    feed = ChangeFeed()
+    head = feed.head(loaded)
+    for rfq_id in range(1, 26):
+        loaded.write("RFQ-Tracker", loaded.tables["RFQ-Tracker"][rfq_id], {"Company_name": f"Busy {rfq_id}"})
+    for rfq_id in range(26, 31):
+        loaded.remove("RFQ-Tracker", rfq_id)
+
+    rows, deleted, cursor, more = feed.changes(loaded, head, COLUMNS, limit=4)
+    assert more and decode_feed_cursor(cursor)[2]  # continuation cursors skip the overlap
+
+    changed, gone, _ = follow(feed, loaded, head, limit=4)
+    # Everything arrives, each page moves forward: nothing repeats within one catch-up
+    busy = [rfq_id for rfq_id in changed if rfq_id <= 25]
+    assert sorted(busy) == list(range(1, 26))
+    assert len(changed) == len(set(changed))
+    assert sorted(gone) == list(range(26, 31))
+
+
+def test_feed_without_tombstones(loaded):
+    feed = ChangeFeed()
+    real = loaded.table
+
+    def table(name):
+        if name == "rfq_tombstones":
+            raise RuntimeError('relation "rfq_tombstones" does not exist')
+        return real(name)
+    loaded.table = table
+
+    head = feed.head(loaded)
+    baseline = set(follow(feed, loaded, head)[0])
+    loaded.write("RFQ-Tracker", loaded.tables["RFQ-Tracker"][1], {"Company_name": "Edited"})
+    loaded.remove("RFQ-Tracker", 2)
+    changed, deleted, _ = follow(feed, loaded, head)
+    assert 1 in changed and set(changed) <= {1, *baseline}
+    assert deleted == []
+
+
+def test_tombstone_timeout_fails_the_request_only(loaded):
+    feed = ChangeFeed()
+    head = feed.head(loaded)
+    baseline = set(follow(feed, loaded, head)[0])
+    loaded.remove("RFQ-Tracker", 2)
+    real = loaded.table
+
+    def table(name):
+        if name == "rfq_tombstones":
+            raise TimeoutError("read timed out")
+        return real(name)
+    loaded.table = table
+    with pytest.raises(TimeoutError):
+        feed.changes(loaded, head, COLUMNS)
+
+    loaded.table = real
+    changed, deleted, _ = follow(feed, loaded, head)
+    assert deleted == [2] and set(changed) <= baseline
@@ -0,0 +1,50 @@
+import pytest
+from src import directory
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    directory.invalidate_directory()
+    yield
+    directory.invalidate_directory()
+
+
+def test_emails_from_every_auth_page(fake):
+    uids = [fake.add_user(f"user{i}@example.com", role="sales") for i in range(5)]
+    assert directory.fetch_auth_emails(fake, page_size=2) == {uid: f"user{i}@example.com" for i, uid in enumerate(uids)}
+
+    profiles = directory.load_directory(fake)
+    assert {p["user_id"]: p["email"] for p in profiles} == {uid: f"user{i}@example.com" for i, uid in enumerate(uids)}
+
+
+def test_profiles_without_emails_when_auth_fails(fake, monkeypatch):
+    uid = fake.add_user("kim@example.com", role="sales")
+
+    def down(**kwargs):
+        raise ConnectionError("auth is down")
+    monkeypatch.setattr(fake.auth.admin, "list_users", down)
+    profiles = directory.load_directory(fake)
+    assert [(p["user_id"], p["first_name"], p["email"]) for p in profiles] == [(uid, "kim", None)]
+
+
+def test_list_users_cached_until_a_user_changes(fake, client, monkeypatch):
+    loads = []
+    load = directory.load_directory
+    monkeypatch.setattr(directory, "load_directory", lambda supabase: loads.append(1) or load(supabase))
+    admin = client("admin")
+    sales = client("sales")
+
+    first = admin.get("/api/list-users")
+    assert first.status_code == 200
+    assert {p["email"] for p in first.get_json()["data"]} == {"admin-0@example.com", "sales-1@example.com"}
+    assert admin.get("/api/list-users").get_json() == first.get_json()
+    assert len(loads) == 1
+
+    assert admin.delete(f"/api/delete-user/{sales.user_id}").status_code == 200
+    after = admin.get("/api/list-users").get_json()["data"]
+    assert [p["user_id"] for p in after] == [admin.user_id]
+    assert len(loads) == 2
+
+
+def test_list_users_is_admin_only(fake, client):
+    assert client("sales").get("/api/list-users").status_code == 403
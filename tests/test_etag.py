@@ -0,0 +1,68 @@
+import pytest
+from src import etag
+
+
+@pytest.fixture
+def version(monkeypatch):
+    """The shared data version, reset for this test's fake."""
+    monkeypatch.setattr(etag.data_version, "ttl", 60)
+    monkeypatch.setattr(etag.data_version, "_value", None)
+    monkeypatch.setattr(etag.data_version, "_has_updated_at", True)
+    return etag.data_version
+
+
+def get(client, path, tag=None):
+    return client.get(path, headers={"If-None-Match": tag} if tag else {})
+
+
+def test_revalidation_round_trip(loaded, client, version):
+    sales = client("sales")
+    first = get(sales, "/api/list-rfq-entry?limit=5")
+    tag = first.headers["ETag"]
+    assert first.status_code == 200 and tag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = get(sales, "/api/list-rfq-entry?limit=5", tag)
+    assert again.status_code == 304 and again.data == b"" and again.headers["ETag"] == tag
+    # The strong form of the same tag matches too (weak comparison)
+    assert get(sales, "/api/list-rfq-entry?limit=5", tag[2:]).status_code == 304
+
+    assert get(sales, "/api/list-rfq-entry?limit=6", tag).status_code == 200
+    assert get(client("admin"), "/api/list-rfq-entry?limit=5", tag).status_code == 200
+
+
+def test_local_save_changes_the_tag(loaded, client, version):
+    admin = client("admin")
+    tag = get(admin, "/api/get-rfq/1").headers["ETag"]
+    saved = admin.post("/api/make-rfq-entry", json={"id": 1, "rfq_no": "EDITED", "company_name": "Acme",
+                                                    "sales_person": "kim", "items": []})
+    assert saved.status_code == 201
+    response = get(admin, "/api/get-rfq/1", tag)
+    assert response.status_code == 200 and response.get_json()["data"]["RFQ-no"] == "EDITED"
+
+
+def test_remote_edit_seen_after_the_ttl(loaded, client, version):
+    admin = client("admin")
+    tag = get(admin, "/api/get-rfq/1").headers["ETag"]
+    loaded.write("RFQ-Tracker", loaded.tables["RFQ-Tracker"][1], {"Company_name": "Elsewhere"})
+    assert get(admin, "/api/get-rfq/1", tag).status_code == 304  # within ETAG_VERSION_TTL
+    version._expires_at = 0
+    assert get(admin, "/api/get-rfq/1", tag).status_code == 200
+
+
+def test_no_tag_without_updated_at(loaded, client, version):
+    for row in [*loaded.tables["RFQ-Tracker"].values(), *loaded.tables["Part_details"].values()]:
+        row.pop("updated_at", None)
+    loaded._columns.clear()
+    response = get(client("admin"), "/api/list-rfq-entry?limit=5")
+    assert response.status_code == 200 and "ETag" not in response.headers
+    assert not version.exact
+
+
+def test_probe_failure_is_not_a_missing_column(loaded, client, version, monkeypatch):
+    def timeout(*args, **kwargs):
+        raise TimeoutError("read timed out")
+    monkeypatch.setattr(loaded, "table", timeout)
+    with pytest.raises(TimeoutError):
+        version.current(loaded)
+    assert version.exact
@@ -0,0 +1,60 @@
+import csv
+import io
+import pytest
+from src.export import iter_export_rows, export_titles, stream_csv, stream_xlsx, PART_COLUMNS
+
+
+def read_csv(body):
+    assert body.startswith("\ufeff")
+    return list(csv.reader(io.StringIO(body[1:])))
+
+
+def test_one_row_per_line(loaded):
+    rows = list(iter_export_rows(loaded, "admin", page_size=7))
+    lines = loaded.children("Part_details", "rfq_id")
+    assert len(rows) == sum(max(1, len(lines.get(rfq_id, {}))) for rfq_id in loaded.tables["RFQ-Tracker"])
+    assert all(len(row) == len(export_titles("admin")) for row in rows)
+    assert all(len(row[0]) == 10 for row in rows)  # the date, not the timestamp
+
+
+def test_rfq_without_lines_still_exported(fake):
+    fake.add("RFQ-Tracker", {"RFQ-no": "EMPTY", "Company_name": "Acme", "Customer_name": None, "Customer_email": None,
+                             "RFQ_purpose": None, "Sales_person": None, "Tentative_date": None})
+    fake.add("Part_details", {"rfq_id": 999, **{field: None for _, field in PART_COLUMNS}})
+    (row,) = iter_export_rows(fake, "admin")
+    assert row[1] == "EMPTY" and row[8:] == [None] * len(PART_COLUMNS)
+
+
+def test_pricing_hidden_from_sales(loaded):
+    titles = export_titles("sales")
+    assert "Unit Price ($)" not in titles and "Margin" not in titles
+    assert "Unit Price ($)" in export_titles("pricing")
+    rows = list(iter_export_rows(loaded, "sales"))
+    assert all(len(row) == len(titles) for row in rows)
+
+
+def test_csv_streams_in_chunks(loaded, monkeypatch):
+    monkeypatch.setattr("src.export.CSV_FLUSH_ROWS", 10)
+    rows = list(iter_export_rows(loaded, "admin"))
+    chunks = list(stream_csv(iter(rows), export_titles("admin")))
+    assert len(chunks) > 3
+    parsed = read_csv("".join(chunks))
+    assert parsed[0] == export_titles("admin") and len(parsed) == len(rows) + 1
+
+
+def test_xlsx_round_trip(loaded):
+    openpyxl = pytest.importorskip("openpyxl")
+    rows = list(iter_export_rows(loaded, "sales"))
+    body = b"".join(stream_xlsx(iter(rows), export_titles("sales"), chunk_size=1024))
+    sheet = openpyxl.load_workbook(io.BytesIO(body), read_only=True)["RFQs"]
+    values = list(sheet.iter_rows(values_only=True))
+    assert list(values[0]) == export_titles("sales") and len(values) == len(rows) + 1
+
+
+def test_export_route(loaded, client):
+    response = client("sales").get("/api/export?format=csv")
+    assert response.status_code == 200
+    assert "attachment" in response.headers["Content-Disposition"]
+    parsed = read_csv(response.get_data(as_text=True))
+    assert parsed[0] == export_titles("sales")
+    assert client("sales").get("/api/export?format=pdf").status_code == 400
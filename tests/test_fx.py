@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+import pytest
+from src.fx import RateCache, RETRY_BASE
+
+
+class Provider:
+    def __init__(self, rate=83.0):
+        self.rate = rate
+        self.calls = 0
+        self.down = False
+        self.gate = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate:
+            self.gate.wait(5)
+        if self.down:
+            raise ConnectionError("provider down")
+        return {"rate": self.rate, "updated": "today"}
+
+
+def age(cache, seconds):
+    cache._value = dict(cache._value, fetched_at=time.time() - seconds)
+
+
+def settle(cache):
+    for _ in range(100):
+        if cache._inflight is None:
+            return
+        time.sleep(0.01)
+
+
+def test_first_read_fetches_and_snapshots(tmp_path):
+    provider = Provider()
+    path = tmp_path / "rate.json"
+    cache = RateCache(provider, ttl=100, snapshot_path=str(path))
+    assert cache.get() == ({"rate": 83.0, "updated": "today", "fetched_at": pytest.approx(time.time(), abs=5)}, False)
+    assert json.loads(path.read_text())["rate"] == 83.0
+
+    # A new process starts from the snapshot without calling the provider
+    restarted = RateCache(Provider(), ttl=100, snapshot_path=str(path))
+    assert restarted.get()[0]["rate"] == 83.0 and restarted.fetch.calls == 0
+
+
+def test_stale_rate_is_served_while_refreshing(tmp_path):
+    provider = Provider()
+    cache = RateCache(provider, ttl=100, refresh_ahead=0.8)
+    cache.get()
+    age(cache, 150)
+    provider.rate = 84.0
+    value, stale = cache.get()
+    assert value["rate"] == 83.0 and stale
+    settle(cache)
+    assert cache.get() == (cache._value, False) and cache._value["rate"] == 84.0
+
+
+def test_concurrent_refreshes_share_one_fetch():
+    provider = Provider()
+    provider.gate = threading.Event()
+    cache = RateCache(provider, ttl=100)
+    threads = [threading.Thread(target=cache.refresh) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    provider.gate.set()
+    for thread in threads:
+        thread.join(5)
+    assert provider.calls == 1
+
+
+def test_failed_refresh_backs_off(monkeypatch):
+    provider = Provider()
+    cache = RateCache(provider, ttl=3600)
+    cache.get()
+    provider.down = True
+
+    age(cache, 4000)
+    for _ in range(20):
+        value, stale = cache.get()
+        assert value["rate"] == 83.0 and stale
+        settle(cache)
+    assert provider.calls == 2  # one failed refresh, then quiet
+    assert isinstance(cache.last_error, ConnectionError)
+
+    # Retries wait 30s, 60s, 120s... capped at the ttl
+    for failures, delay in ((1, RETRY_BASE), (2, 2 * RETRY_BASE), (3, 4 * RETRY_BASE), (20, 3600)):
+        cache._failures = failures
+        cache._failed_at = time.monotonic() - delay + 1
+        assert cache._backing_off()
+        cache._failed_at = time.monotonic() - delay - 1
+        assert not cache._backing_off()
+
+    provider.down = False
+    cache.get()
+    settle(cache)
+    assert cache._failures == 0 and cache.last_error is None
+    assert cache.get() == (cache._value, False)
+
+
+def test_cold_start_failure_is_not_retried_per_request():
+    provider = Provider()
+    provider.down = True
+    cache = RateCache(provider, ttl=3600)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            cache.get()
+    assert provider.calls == 1
@@ -0,0 +1,117 @@
+import io
+import pytest
+from src.importer import RFQImporter, iter_records, iter_csv, validate_part, RowError
+
+TITLES = ["RFQ No", "Company", "Sales Person", "Date", "Part No", "RFQ Qty", "Unit Price ($)", "Source"]
+
+
+def rows(*lines):
+    return [TITLES, *lines]
+
+
+def run(fake, table, **kwargs):
+    saved = []
+    importer = RFQImporter(fake, created_by="u1", on_created=saved.append, **kwargs)
+    return importer.run(iter_records(table)), saved
+
+
+def lines_of(fake, rfq_no):
+    rfq = next(r for r in fake.tables["RFQ-Tracker"].values() if r["RFQ-no"] == rfq_no)
+    return sorted(p["RFQ-part-no"] for p in fake.tables["Part_details"].values() if p["rfq_id"] == rfq["id"])
+
+
+def test_groups_consecutive_rows(fake):
+    report, saved = run(fake, rows(
+        ["R1", "Acme", "kim", "01/02/2025", "A", "1,000", "1.5", "Import"],
+        ["R1", "Acme", "kim", "01/02/2025", "B", "2", "", "Local"],
+        ["R2", "Globex", "zoe", "2025-02-03", "", "", "", ""],
+        ["R3", "Initech", "kim", "", "C", "5", "1,250.50", ""],
+    ))
+    assert (report["rfqs_created"], report["parts_created"], report["error_count"]) == (3, 3, 0)
+    assert lines_of(fake, "R1") == ["A", "B"] and lines_of(fake, "R2") == []
+    assert {r["RFQ-no"]: r["created_at"][:10] for r in fake.tables["RFQ-Tracker"].values()}["R1"] == "2025-02-01"
+    parts = {p["RFQ-part-no"]: p for p in fake.tables["Part_details"].values()}
+    assert parts["A"]["RFQ Qty"] == 1000 and parts["C"]["Unit$"] == 1250.5
+    assert sorted(len(rfq["Part_details"]) for rfq in saved) == [0, 1, 2]
+
+
+def test_invalid_line_skips_the_whole_rfq(fake):
+    report, saved = run(fake, rows(
+        ["R1", "Acme", "kim", "", "A", "1", "", ""],
+        ["R1", "Acme", "kim", "", "B", "1.5", "", ""],
+        ["R1", "Acme", "kim", "", "C", "1", "", "Mars"],
+        ["R2", "Globex", "zoe", "", "D", "1", "", ""],
+        ["R3", "", "zoe", "", "E", "1", "", ""],
+        ["R3", "", "zoe", "", "F", "1", "", ""],
+    ))
+    assert (report["rfqs_created"], report["parts_created"]) == (1, 1)
+    assert [r["RFQ-no"] for r in fake.tables["RFQ-Tracker"].values()] == ["R2"]
+    errors = {e["row"]: e["error"] for e in report["errors"]}
+    assert "whole number" in errors[3] and "Source" in errors[4]
+    assert errors[2].startswith("Not imported")
+    assert "Company_name" in errors[6] and errors[7].startswith("Skipped")
+    assert report["error_count"] == 5
+    assert [rfq["RFQ-no"] for rfq in saved] == ["R2"]
+
+
+def test_failed_line_insert_rolls_back_its_rfq(fake, monkeypatch):
+    monkeypatch.setattr("src.importer.PART_BATCH", 4)
+    add = fake.add
+
+    def add_rejecting_bad(table, record):
+        if table == "Part_details" and record.get("RFQ-part-no") == "BAD":
+            raise RuntimeError("value too long")
+        return add(table, record)
+    fake.add = add_rejecting_bad
+
+    table = rows(*[[f"R{n}", "Acme", "kim", "", f"P{n}-{i}", "1", "", ""] for n in range(5) for i in range(3)])
+    table[8][4] = "BAD"  # third line of R2
+    report, saved = run(fake, table)
+    assert (report["rfqs_created"], report["parts_created"]) == (4, 12)
+    assert "R2" not in {r["RFQ-no"] for r in fake.tables["RFQ-Tracker"].values()}
+    assert not any(p["RFQ-part-no"].startswith("P2-") for p in fake.tables["Part_details"].values())
+    errors = {e["row"]: e["error"] for e in report["errors"]}
+    assert errors[9].startswith("Part insert failed") and errors[8].startswith("Not imported")
+    assert sorted(rfq["RFQ-no"] for rfq in saved) == ["R0", "R1", "R3", "R4"]
+
+
+def test_dry_run_writes_nothing(fake):
+    report, saved = run(fake, rows(["R1", "Acme", "kim", "", "A", "1", "", ""]), dry_run=True)
+    assert report["rfqs_created"] == 1 and report["dry_run"]
+    assert fake.tables["RFQ-Tracker"] == {} and saved == []
+
+
+def test_file_checks():
+    with pytest.raises(ValueError):
+        list(iter_records([]))
+    with pytest.raises(ValueError):
+        list(iter_records([["Company", "Part No"]]))
+    with pytest.raises(RowError):
+        validate_part({"RFQ Qty": "3"})
+    assert validate_part({"RFQ-part-no": "A", "Quoted Qty": " 2,500 "})["Quoted Qty"] == 2500
+
+
+def upload(body):
+    return {"file": (io.BytesIO(body), "rfqs.csv")}
+
+
+def test_import_route(fake, client):
+    body = "\n".join(",".join(line) for line in rows(["R1", "Acme", "kim", "", "A", "1", "", ""])).encode()
+    response = client("pricing").post("/api/import-rfqs", data=upload(body), content_type="multipart/form-data")
+    assert response.status_code == 200 and response.get_json()["rfqs_created"] == 1
+    assert client("sales").post("/api/import-rfqs", data=upload(body)).status_code == 403
+
+
+def test_decode_error_reports_what_was_written(fake, client, monkeypatch):
+    monkeypatch.setattr("src.importer.HEADER_BATCH", 2)
+    good = "\n".join(",".join(line) for line in rows(*[[f"R{n}", "Acme", "kim", "", "A", "1", "", ""]
+                                                       for n in range(3000)]))
+    body = good.encode() + b"\nR9,Acme,kim,,\xff\xfe,1,,\n"
+    response = client("admin").post("/api/import-rfqs", data=upload(body), content_type="multipart/form-data")
+    data = response.get_json()
+    assert response.status_code == 400 and "UTF-8" in data["error"]
+    assert data["partial"]["rfqs_created"] == len(fake.tables["RFQ-Tracker"]) > 0
+
+
+def test_iter_csv_strips_the_bom():
+    assert next(iter_csv(io.BytesIO("\ufeffRFQ No,Company\n".encode()))) == ["RFQ No", "Company"]
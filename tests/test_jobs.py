@@ -0,0 +1,109 @@
+import csv
+import io
+import os
+import threading
+import time
+import pytest
+from src import jobs
+from src.jobs import JobRunner, FINISHED
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    """A fresh runner with one worker, used by every route for this test."""
+    fresh = JobRunner(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "jobs"), workers=1, max_queued=3).start()
+    monkeypatch.setattr(jobs, "runner", fresh)
+    yield fresh
+    fresh.stop()
+
+
+@pytest.fixture
+def blocking(monkeypatch):
+    """A 'block' job kind that runs until the returned event is set or it is cancelled."""
+    release = threading.Event()
+
+    def block(ctx):
+        while not release.wait(0.01):
+            ctx.check()
+        return {"released": True}, None
+    monkeypatch.setitem(jobs.HANDLERS, "block", (block, None))
+    yield release
+    release.set()
+
+
+def wait(runner, job_id, status=FINISHED, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = runner.get(job_id)
+        if job["status"] in status or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def test_kinds_are_limited_by_role(loaded, client, runner):
+    sales = client("sales")
+    refused = sales.post("/api/jobs", json={"kind": "rebuild_indexes"})
+    assert refused.status_code == 403 and "sales cannot run rebuild_indexes" in refused.get_json()["error"]
+    assert sales.post("/api/jobs", json={"kind": "reprice", "params": {"rfq_ids": [1]}}).status_code == 403
+    assert sales.post("/api/jobs", json={"kind": "nope"}).status_code == 400
+    assert runner.list() == []
+
+    admin = client("admin")
+    accepted = admin.post("/api/jobs", json={"kind": "rebuild_indexes"})
+    assert accepted.status_code == 202
+    assert wait(runner, accepted.get_json()["job_id"])["status"] == "succeeded"
+
+
+def test_any_role_exports_its_own_columns(loaded, client, runner):
+    sales = client("sales")
+    response = sales.get("/api/export?format=csv&async=1")
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    job = wait(runner, job_id)
+    assert job["status"] == "succeeded" and job["result"]["rows"] > 0
+
+    status = sales.get(f"/api/jobs/{job_id}").get_json()["data"]
+    assert status["result_url"] == f"/api/jobs/{job_id}/result"
+    body = sales.get(status["result_url"]).get_data(as_text=True)
+    titles = next(csv.reader(io.StringIO(body.lstrip("\ufeff"))))
+    assert "Part No" in titles and "Unit Price ($)" not in titles and "Margin" not in titles
+
+    # Someone else's job is not found, except by an admin
+    assert client("sales").get(f"/api/jobs/{job_id}").status_code == 404
+    assert client("admin").get(f"/api/jobs/{job_id}").status_code == 200
+
+
+def test_cancel_running_and_queued(fake, client, runner, blocking):
+    owner = client("sales")
+    running = owner.post("/api/jobs", json={"kind": "block"}).get_json()["job_id"]
+    wait(runner, running, status=("running",))
+    queued = owner.post("/api/jobs", json={"kind": "block"}).get_json()["job_id"]
+
+    assert client("sales").post(f"/api/jobs/{queued}/cancel").status_code == 404
+    cancelled = owner.post(f"/api/jobs/{queued}/cancel").get_json()["data"]
+    assert cancelled["status"] == "cancelled"  # at once: it never started
+
+    asked = owner.post(f"/api/jobs/{running}/cancel").get_json()["data"]
+    assert asked["status"] == "running" and asked["cancel_requested"]
+    assert wait(runner, running)["status"] == "cancelled"
+    assert owner.post(f"/api/jobs/{running}/cancel").status_code == 409
+    assert runner.get(queued)["started_at"] is None
+
+
+def test_refused_import_leaves_no_upload(fake, client, runner, blocking):
+    admin = client("admin")
+    for _ in range(1 + runner.max_queued):
+        admin.post("/api/jobs", json={"kind": "block"})
+    upload = {"file": (io.BytesIO(b"RFQ No,Company,Sales Person\nR1,Acme,kim\n"), "rfqs.csv")}
+    response = admin.post("/api/import-rfqs?async=1", data=upload, content_type="multipart/form-data")
+    assert response.status_code == 429
+    assert [name for name in os.listdir(runner.directory) if name.startswith("upload-")] == []
+
+
+def test_import_job_deletes_its_upload(fake, client, runner):
+    upload = {"file": (io.BytesIO(b"RFQ No,Company,Sales Person\nR1,Acme,kim\n"), "rfqs.csv")}
+    response = client("pricing").post("/api/import-rfqs?async=1", data=upload, content_type="multipart/form-data")
+    job = wait(runner, response.get_json()["job_id"])
+    assert job["status"] == "succeeded" and job["result"]["rfqs_created"] == 1
+    assert os.listdir(runner.directory) == []
+
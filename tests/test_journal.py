@@ -0,0 +1,107 @@
+import sqlite3
+import pytest
+from src.journal import SaveJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return SaveJournal(str(tmp_path / "journal.sqlite3"), max_attempts=3).open()
+
+
+def payload(rfq_id=None, rfq_no="RFQ-1", items=()):
+    data = {"rfq_no": rfq_no, "company_name": "Acme", "sales_person": "kim",
+            "items": [{"rfq_part_no": part_no, "rfq_qty": 5} for part_no in items]}
+    if rfq_id:
+        data["id"] = rfq_id
+    return data
+
+
+def make_due(journal):
+    """Skips the backoff of every pending entry."""
+    with sqlite3.connect(journal.path) as conn:
+        conn.execute("update saves set next_attempt_at = 0")
+
+
+def fail_part_inserts(fake, times):
+    add = fake.add
+    left = {"n": times}
+
+    def failing(table, record):
+        if table == "Part_details" and left["n"]:
+            left["n"] -= 1
+            raise RuntimeError("connection reset")
+        return add(table, record)
+    fake.add = failing
+
+
+def test_saves_of_one_rfq_coalesce(fake, journal):
+    rfq_id = fake.add("RFQ-Tracker", {"RFQ-no": "RFQ-1"})["id"]
+    ids = [journal.append(payload(rfq_id, f"RFQ-1 rev {n}", ["A"] * (n + 1)), "admin", "u1") for n in range(3)]
+    other = journal.append(payload(rfq_no="RFQ-2", items=["B"]), "admin", "u1")
+
+    assert journal.flush(fake) == 4
+    assert journal.pending_count() == 0
+
+    # Only the last save of RFQ-1 was written
+    assert fake.tables["RFQ-Tracker"][rfq_id]["RFQ-no"] == "RFQ-1 rev 2"
+    assert sum(1 for p in fake.tables["Part_details"].values() if p["rfq_id"] == rfq_id) == 3
+    last = journal.status(ids[-1])
+    assert last["status"] == "committed" and last["result"]["superseded"] == ids[:-1]
+    assert all(journal.status(i)["status"] == "committed" for i in ids[:-1])
+    assert journal.status(other)["rfq_id"] != rfq_id
+
+
+def test_saves_by_different_roles_do_not_coalesce(fake, journal):
+    rfq_id = fake.add("RFQ-Tracker", {"RFQ-no": "RFQ-1"})["id"]
+    part_id = fake.add("Part_details", {"rfq_id": rfq_id, "RFQ-part-no": "A", "RFQ Qty": 5, "Unit$": None})["id"]
+    priced = payload(rfq_id, items=["A"])
+    priced["items"][0].update(id=part_id, unit_price_usd=12.5)
+    # The sales editor sends pricing blank and edits the quantity
+    edited = payload(rfq_id, items=["A"])
+    edited["items"][0].update(id=part_id, rfq_qty=8)
+    admin_save = journal.append(priced, "admin", "u1")
+    sales_save = journal.append(edited, "sales", "u2")
+
+    assert journal.flush(fake) == 2
+    part = fake.tables["Part_details"][part_id]
+    assert part["Unit$"] == 12.5 and part["RFQ Qty"] == 8
+    assert journal.status(sales_save)["result"]["superseded"] == []
+    assert journal.status(admin_save)["result"]["superseded"] == []
+
+
+def test_new_rfqs_never_coalesce(fake, journal):
+    for n in range(3):
+        journal.append(payload(rfq_no=f"NEW-{n}"), "admin", "u1")
+    assert journal.flush(fake) == 3
+    assert len(fake.tables["RFQ-Tracker"]) == 3
+
+
+def test_failed_save_retries_as_an_update(fake, journal):
+    fail_part_inserts(fake, 1)
+    save_id = journal.append(payload(items=["A", "B"]), "admin", "u1")
+    later = journal.append(payload(rfq_no="RFQ-2"), "admin", "u1")
+
+    assert journal.flush(fake) == 0
+    status = journal.status(save_id)
+    assert status["status"] == "pending" and status["attempts"] == 1
+    assert status["rfq_id"] is not None and "connection reset" in status["last_error"]
+    # Journal order: nothing overtakes the entry waiting to retry
+    assert journal.status(later)["status"] == "pending"
+    assert journal.flush(fake) == 0
+
+    make_due(journal)
+    assert journal.flush(fake) == 2
+    assert journal.status(save_id)["rfq_id"] == status["rfq_id"]
+    assert len(fake.tables["RFQ-Tracker"]) == 2  # the retry did not insert a second header
+    assert sorted(p["RFQ-part-no"] for p in fake.tables["Part_details"].values()) == ["A", "B"]
+
+
+def test_entry_fails_for_good_after_max_attempts(fake, journal):
+    fail_part_inserts(fake, 10)
+    save_id = journal.append(payload(items=["A"]), "admin", "u1")
+    for _ in range(journal.max_attempts):
+        make_due(journal)
+        journal.flush(fake)
+    status = journal.status(save_id)
+    assert status["status"] == "failed" and status["attempts"] == journal.max_attempts
+    assert journal.pending_count() == 0
@@ -0,0 +1,76 @@
+import httpx
+import pytest
+from src import metrics
+from src.SupaClient import _metered_client_class, upstream_target
+
+
+def sample(name, **labels):
+    """The value of one sample line in the rendered registry, or None."""
+    wanted = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+    for line in metrics.registry.render().splitlines():
+        if line.startswith(name + wanted + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_histogram_and_counter_exposition():
+    registry = metrics.Registry()
+    latency = registry.add(metrics.Histogram("t_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    calls = registry.add(metrics.Counter("t_total", "Calls.", ("route",)))
+    latency.observe(0.05, '/a"b')
+    latency.observe(0.5, '/a"b')
+    calls.inc('/a"b', amount=2)
+    assert registry.render().splitlines() == [
+        "# HELP t_seconds Latency.",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        't_seconds_bucket{route="/a\\"b",le="1.0"} 2',
+        't_seconds_bucket{route="/a\\"b",le="+Inf"} 2',
+        't_seconds_sum{route="/a\\"b"} 0.55',
+        't_seconds_count{route="/a\\"b"} 2',
+        "# HELP t_total Calls.",
+        "# TYPE t_total counter",
+        't_total{route="/a\\"b"} 2',
+    ]
+
+
+@pytest.mark.parametrize("path, target", [
+    ("/rest/v1/RFQ-Tracker", "RFQ-Tracker"),
+    ("/rest/v1/rpc/sync_part_details", "rpc/sync_part_details"),
+    ("/auth/v1/user", "auth/user"),
+    ("/auth/v1/admin/users/0b8c4a52-3d7e-4a4b-9a6b-2f1d7c9e8a10", "auth/admin/users"),
+    ("/storage/v1/object/x", "storage/v1"),
+])
+def test_upstream_target(path, target):
+    assert upstream_target(path) == target
+
+
+def test_metered_client_records_calls():
+    before = sample("quote_tracker_upstream_requests_total", service="supabase", target="profiles", status="200") or 0
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[{"id": 1}]))
+    with _metered_client_class()(transport=transport) as http:
+        http.get("http://supabase.invalid/rest/v1/profiles?select=*")
+    assert sample("quote_tracker_upstream_requests_total",
+                  service="supabase", target="profiles", status="200") == before + 1
+
+
+def test_requests_are_counted_by_route(loaded, client):
+    labels = dict(method="GET", route="/api/get-rfq/<int:rfq_id>", status="200")
+    before = sample("quote_tracker_http_requests_total", **labels) or 0
+    admin = client("admin")
+    response = admin.get("/api/get-rfq/1")
+    admin.get("/api/get-rfq/2")
+    assert sample("quote_tracker_http_requests_total", **labels) == before + 2
+    assert response.headers["Server-Timing"].split(", ")[-1].startswith("total;dur=")
+
+
+def test_server_timing_header():
+    header = metrics.server_timing({"auth": (0.0004, 0), "db": (0.0382, 3)}, 0.044)
+    assert header == 'auth;dur=0.4, db;dur=38.2;desc="3 calls", total;dur=44.0'
+
+
+def test_metrics_endpoint_is_admin_only(fake, client):
+    assert client("sales").get("/metrics").status_code == 403
+    response = client("admin").get("/metrics")
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    assert "# TYPE quote_tracker_http_requests_total counter" in response.get_data(as_text=True)
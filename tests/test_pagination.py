@@ -0,0 +1,86 @@
+import pytest
+from src.pagination import PageRequest, encode_cursor, decode_cursor, iter_rows, iter_changed_rows
+
+
+@pytest.fixture
+def tied(fake):
+    """RFQs whose sort values repeat, contain PostgREST punctuation and are often null."""
+    companies = ["Acme", None, "Globex, Inc.", "Acme", None, "a.b:(c)", "Acme", "Globex, Inc.", None, "Zeta"]
+    for n, company in enumerate(companies * 3):
+        fake.add("RFQ-Tracker", {"Company_name": company, "Tentative_date": None if n % 4 else f"2025-02-0{n % 3 + 1}"})
+    return fake
+
+
+def expected(rows, sort, desc):
+    present = sorted((r for r in rows if r[sort] is not None), key=lambda r: (r[sort], r["id"]), reverse=desc)
+    missing = sorted((r for r in rows if r[sort] is None), key=lambda r: r["id"], reverse=desc)
+    return [r["id"] for r in present + missing]  # nulls last either way
+
+
+def walk(supabase, sort, desc, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = PageRequest(sort, desc, limit, cursor)
+        query = page.apply(supabase.table("RFQ-Tracker").select(f"id, {sort}"))
+        rows, cursor = page.split(query.execute().data)
+        ids += [row["id"] for row in rows]
+        pages += 1
+        if cursor is None:
+            return ids, pages
+        assert pages < 100, "pagination does not advance"
+
+
+@pytest.mark.parametrize("sort", ["Company_name", "Tentative_date", "id", "created_at"])
+@pytest.mark.parametrize("desc", [True, False])
+@pytest.mark.parametrize("limit", [1, 4, 7])
+def test_pages_cover_every_row_once_in_order(tied, sort, desc, limit):
+    rows = list(tied.tables["RFQ-Tracker"].values())
+    ids, pages = walk(tied, sort, desc, limit)
+    assert ids == expected(rows, sort, desc)
+    assert pages == -(-len(rows) // limit)
+
+
+def test_cursor_round_trip():
+    for value in ("Globex, Inc.", None, 3, "2025-01-01T00:00:00+00:00", 'quote " and \\'):
+        cursor = encode_cursor("Company_name", True, value, 42)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == ("Company_name", True, value, 42)
+        assert PageRequest("Company_name", True, 10, cursor).after == (value, 42)
+
+
+def test_cursor_must_match_the_sort():
+    cursor = encode_cursor("Company_name", True, "Acme", 1)
+    with pytest.raises(ValueError):
+        PageRequest("Company_name", False, 10, cursor)
+    with pytest.raises(ValueError):
+        PageRequest("created_at", True, 10, cursor)
+    with pytest.raises(ValueError):
+        PageRequest("created_at", True, 10, "not-a-cursor")
+
+
+def test_from_args_validates():
+    page = PageRequest.from_args({"sort": "id", "order": "ASC", "limit": "100000"})
+    assert (page.sort, page.desc, page.is_first) == ("id", False, True)
+    for args in ({"sort": "Customer_phone"}, {"order": "up"}, {"limit": "ten"}):
+        with pytest.raises(ValueError):
+            PageRequest.from_args(args)
+
+
+def test_iter_rows_pages_by_id(loaded):
+    ids = [row["id"] for row in iter_rows(loaded, "RFQ-Tracker", "id", page_size=7)]
+    assert ids == sorted(loaded.tables["RFQ-Tracker"])
+    bidding = [row["id"] for row in iter_rows(loaded, "RFQ-Tracker", "id, RFQ_purpose", page_size=5,
+                                              where=lambda q: q.eq("RFQ_purpose", "Bidding"))]
+    assert bidding == sorted(i for i, r in loaded.tables["RFQ-Tracker"].items() if r["RFQ_purpose"] == "Bidding")
+
+
+def test_iter_changed_rows_keeps_rows_sharing_a_timestamp(fake):
+    for n in range(12):
+        fake.add("RFQ-Tracker", {"Company_name": f"C{n}"})
+    stamp = fake.now()
+    for row in fake.tables["RFQ-Tracker"].values():
+        row["updated_at"] = stamp  # one statement touching every row
+    seen = [row["id"] for row in iter_changed_rows(fake, "RFQ-Tracker", "id, updated_at", page_size=5)]
+    assert seen == sorted(fake.tables["RFQ-Tracker"])
+    first = list(iter_changed_rows(fake, "RFQ-Tracker", "id, updated_at", since=(stamp, seen[4]), page_size=5))
+    assert [row["id"] for row in first] == seen[5:]
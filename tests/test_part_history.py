@@ -0,0 +1,55 @@
+from index_checks import check_incremental, check_writes_before_first_build, check_writes_during_rebuild, edit
+from src.part_history import PartHistoryIndex, part_history
+
+
+def state(index):
+    return index._parts, index._rfqs
+
+
+def test_incremental_matches_rebuild(loaded):
+    check_incremental(PartHistoryIndex, state, loaded)
+
+
+def test_writes_before_the_first_build_are_ignored(loaded):
+    check_writes_before_first_build(PartHistoryIndex, state, loaded)
+
+
+def test_writes_during_a_rebuild_survive_the_swap(loaded, monkeypatch):
+    check_writes_during_rebuild(PartHistoryIndex, state, loaded, monkeypatch)
+
+
+def test_lookup_after_edits(loaded):
+    index = PartHistoryIndex(ttl=3600)
+    index.rebuild(loaded)
+    new_id = edit(loaded, index)
+
+    history = index.lookup(" new-part-1 ")
+    assert history["quotes"] == 2
+    assert [entry["rfq_id"] for entry in history["recent"]] == [new_id, 2]
+    # The newest line has a resale but no unit price: each latest_* looks back for its own field
+    assert history["latest"]["rfq_id"] == new_id
+    assert history["latest_unit_usd"]["value"] == 3.25 and history["latest_unit_usd"]["rfq_id"] == 2
+    assert history["latest_resale"]["value"] == 5.0 and history["latest_resale"]["rfq_id"] == new_id
+    assert history["latest_make"]["value"] == "ST" and history["latest_supplier"]["value"] == "Digi"
+    assert history["median_unit_usd"] == 3.25
+
+    assert index.lookup("NEW-PART-1", exclude_rfq=new_id)["quotes"] == 1
+    # Indexed under the quoted part number too, spaces and case ignored
+    assert 4 in [line[1] for line in index._parts["LM358"]]
+    assert all(3 != line[1] for lines in index._parts.values() for line in lines)
+    assert index.lookup("never-quoted") is None
+
+
+def test_part_history_routes(loaded, client):
+    part_history.rebuild(loaded)
+    part_no = loaded.tables["Part_details"][1]["RFQ-part-no"]
+    pricing = client("pricing")
+
+    single = pricing.get(f"/api/part-history/{part_no}").get_json()
+    assert single["data"]["quotes"] >= 1
+    batch = pricing.post("/api/part-history", json={"part_nos": [part_no, "never-quoted"]}).get_json()["data"]
+    assert batch == {part_no: single["data"], "never-quoted": None}
+
+    assert pricing.post("/api/part-history", json={"part_nos": "LM358"}).status_code == 400
+    assert pricing.post("/api/part-history", json={"part_nos": [], "exclude_rfq": "x"}).status_code == 400
+    assert client("sales").get(f"/api/part-history/{part_no}").status_code == 403
@@ -0,0 +1,114 @@
+import pytest
+from src import parts
+from src.parts import diff_parts, SALES_EDITABLE_COLUMNS, ITEM_FIELDS
+from src.saves import save_rfq
+
+
+def stored(part_id, **values):
+    row = {"id": part_id, "rfq_id": 7}
+    row.update({column: None for column in ITEM_FIELDS.values()})
+    row.update(values)
+    return row
+
+
+def sent(part_id=None, **values):
+    row = {"rfq_id": 7}
+    row.update({column: None for column in ITEM_FIELDS.values()})
+    row.update(values)
+    return dict(row, id=part_id)
+
+
+def test_unchanged_rows_write_nothing():
+    existing = [stored(1, **{"RFQ-part-no": "LM358", "RFQ Qty": 5}), stored(2, **{"Unit$": 1.5})]
+    incoming = [sent(1, **{"RFQ-part-no": "LM358", "RFQ Qty": "5"}), sent(2, **{"Unit$": 1.5, "Remarks": ""})]
+    assert diff_parts(existing, incoming) == ([], [], [])
+
+
+def test_changed_row_is_a_full_update():
+    existing = [stored(1, **{"RFQ-part-no": "LM358", "Make": "TI"})]
+    inserts, updates, delete_ids = diff_parts(existing, [sent(1, **{"RFQ-part-no": "LM358", "Make": "ST"})])
+    assert (inserts, delete_ids) == ([], [])
+    assert len(updates) == 1
+    assert updates[0]["id"] == 1 and updates[0]["rfq_id"] == 7
+    assert updates[0]["Make"] == "ST" and updates[0]["RFQ-part-no"] == "LM358"
+    assert set(updates[0]) == {"id", "rfq_id", *ITEM_FIELDS.values()}
+
+
+def test_new_missing_and_repeated_ids():
+    existing = [stored(1, **{"RFQ-part-no": "A"}), stored(2, **{"RFQ-part-no": "B"})]
+    incoming = [sent(None, **{"RFQ-part-no": "C"}), sent(1, **{"RFQ-part-no": "A"}),
+                sent(1, **{"RFQ-part-no": "A2"}), sent(99, **{"RFQ-part-no": "D"})]
+    inserts, updates, delete_ids = diff_parts(existing, incoming)
+    # A copied line and an id from another RFQ are new lines; line 2 was removed
+    assert [row["RFQ-part-no"] for row in inserts] == ["C", "A2", "D"]
+    assert all("id" not in row for row in inserts)
+    assert updates == []
+    assert delete_ids == [2]
+
+
+def test_sales_columns_keep_pricing():
+    existing = [stored(1, **{"RFQ-part-no": "A", "Unit$": 2.0, "Margin": 12})]
+    # The sales editor sends the pricing columns blank
+    incoming = [sent(1, **{"RFQ-part-no": "A", "Lead": "4w"})]
+    _, updates, _ = diff_parts(existing, incoming, SALES_EDITABLE_COLUMNS)
+    assert len(updates) == 1
+    assert updates[0]["Lead"] == "4w"
+    assert updates[0]["Unit$"] == 2.0 and updates[0]["Margin"] == 12
+
+    _, updates, _ = diff_parts(existing, [sent(1, **{"RFQ-part-no": "A", "Unit$": 9.0})], SALES_EDITABLE_COLUMNS)
+    assert updates == []
+
+
+@pytest.fixture
+def rfq(fake):
+    rfq_id = fake.add("RFQ-Tracker", {"RFQ-no": "R1", "Company_name": "Acme", "Sales_person": "kim"})["id"]
+    part = fake.add("Part_details", {"rfq_id": rfq_id, **{c: None for c in ITEM_FIELDS.values()},
+                                     "RFQ-part-no": "A", "Unit$": 2.0, "Margin": 12, "Lead": "2w"})
+    return rfq_id, part["id"]
+
+
+@pytest.mark.parametrize("role", ["sales", "user", "viewer"])
+def test_roles_without_pricing_keep_it(fake, rfq, role):
+    rfq_id, part_id = rfq
+    # What the editor sends when pricing is hidden from the role
+    data = {"id": rfq_id, "rfq_no": "R1", "items": [{"id": part_id, "rfq_part_no": "A", "lead_time": "4w"}]}
+    assert save_rfq(fake, data, role, "u1")[1] == {"inserted": 0, "updated": 1, "deleted": 0}
+    stored = fake.tables["Part_details"][part_id]
+    assert stored["Lead"] == "4w" and stored["Unit$"] == 2.0 and stored["Margin"] == 12
+
+
+def test_pricing_roles_write_pricing(fake, rfq):
+    rfq_id, part_id = rfq
+    data = {"id": rfq_id, "rfq_no": "R1", "items": [{"id": part_id, "rfq_part_no": "A", "unit_price_usd": 3.5}]}
+    save_rfq(fake, data, "pricing", "u1")
+    assert fake.tables["Part_details"][part_id]["Unit$"] == 3.5
+
+
+def test_missing_sync_function_is_remembered(fake, rfq, monkeypatch):
+    rfq_id, part_id = rfq
+    monkeypatch.setattr(parts, "_has_sync_function", True)
+    fake.rpcs.pop("sync_part_details")
+    rpc = fake.rpc
+    rpc_calls = []
+
+    def counting_rpc(name, params=None):
+        rpc_calls.append(name)
+        return rpc(name, params)
+    monkeypatch.setattr(fake, "rpc", counting_rpc)
+
+    for n in range(3):
+        data = {"id": rfq_id, "rfq_no": "R1", "items": [{"id": part_id, "rfq_part_no": f"A{n}"}, {"rfq_part_no": "B"}]}
+        save_rfq(fake, data, "admin", "u1")
+    assert rpc_calls == ["sync_part_details"]
+    lines = [p for p in fake.tables["Part_details"].values() if p["rfq_id"] == rfq_id]
+    assert sorted(p["RFQ-part-no"] for p in lines) == ["A2", "B"]
+
+
+def test_sync_function_used_when_installed(fake, rfq, monkeypatch):
+    rfq_id, part_id = rfq
+    monkeypatch.setattr(parts, "_has_sync_function", True)
+    calls = fake.calls
+    save_rfq(fake, {"id": rfq_id, "rfq_no": "R1", "items": [{"id": part_id, "rfq_part_no": "Z"}]}, "admin", "u1")
+    # header update, read of the stored lines, one rpc
+    assert fake.calls - calls == 3
+    assert fake.tables["Part_details"][part_id]["RFQ-part-no"] == "Z"
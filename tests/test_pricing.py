@@ -0,0 +1,123 @@
+import itertools
+import math
+from decimal import Decimal, ROUND_HALF_UP
+import pytest
+from src import pricing
+from src.pricing import PricingRates, parse_request, price_items, request_items
+
+
+def calculate_pricing(source, quoted_qty, exch_field, usd, inr_field, freight_field, global_rate):
+    """calculatePricing() from templates/rfqEditor.html, line by line; `parseFloat(x) || y` included."""
+    def parse(value):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return 0
+        return 0 if math.isnan(number) else number
+
+    quoted_qty = parse(quoted_qty) or 1
+    exch = parse(exch_field) or global_rate or 92
+    freight = insurance = bcd = bank = clearance = 0
+    if source == "Import":
+        unit_inr = (parse(usd) or 0) * exch
+        safe_qty = max(quoted_qty, 1)
+        freight = (80 * exch) / safe_qty
+        insurance = unit_inr * 0.01125
+        bcd = (unit_inr + freight + insurance) * 0.165
+        bank = (10 * exch) / safe_qty
+        clearance = 6500 / safe_qty
+    else:
+        unit_inr = parse(inr_field) or 0
+        freight = parse(freight_field) or 0
+    landed = unit_inr + freight + insurance + bcd + bank + clearance
+    margin = landed * 0.15
+    return {"unit_price_inr": unit_inr, "freight": freight, "insurance": insurance, "bcd": bcd, "bank": bank,
+            "clearance": clearance, "landed_cost": landed, "margin": margin, "resale": landed + margin}
+
+
+def to_fixed(value):
+    """Number(x.toFixed(2)): the exact binary value, ties to the larger magnitude."""
+    return float(Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+@pytest.fixture
+def cached_rate(monkeypatch):
+    def use(rate):
+        if rate is None:
+            def get():
+                raise ConnectionError("rate API down")
+        else:
+            def get():
+                return {"rate": rate, "updated": "", "fetched_at": 0}, False
+        monkeypatch.setattr(pricing.usd_inr_cache, "get", get)
+    return use
+
+
+@pytest.mark.parametrize("global_rate", [None, 84.3])
+def test_matches_the_editor(cached_rate, global_rate):
+    cached_rate(global_rate)
+    cases = list(itertools.product(
+        ["Import", "Local", None],
+        [None, "", 0, 1, "3", 250, 0.5],
+        [None, "", 0, "83.25", 90],
+        [None, 0, 1.99, "12.5"],
+        [None, "1500", 0],
+        [None, "350.5"],
+    ))
+    items = [{"source": source, "quoted_qty": qty, "exchange_rate": exch, "unit_price_usd": usd,
+              "unit_price_inr": inr, "freight": freight}
+             for source, qty, exch, usd, inr, freight in cases]
+    priced = price_items(items)
+    assert len(priced) == len(cases)
+    for case, row in zip(cases, priced):
+        expected = calculate_pricing(*case, global_rate)
+        for key, value in expected.items():
+            assert row[key] == to_fixed(value), (case, key)
+
+
+def test_rates_and_exchange_rate_override(cached_rate):
+    cached_rate(80.0)
+    item = {"source": "Import", "quoted_qty": 10, "exchange_rate": 83, "unit_price_usd": 2}
+    assert price_items([item])[0]["unit_price_inr"] == 166.0
+    moved = price_items([item], exchange_rate=90)[0]
+    assert moved["unit_price_inr"] == 180.0
+    no_margin = price_items([item], PricingRates.from_dict({"margin_rate": 0}))[0]
+    assert no_margin["resale"] == no_margin["landed_cost"]
+    fixed = price_items([dict(item, exchange_rate=None)], PricingRates.from_dict({"default_exchange_rate": 70}))[0]
+    assert fixed["unit_price_inr"] == 140.0
+    assert price_items([]) == []
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    {"rates": [1]},
+    {"rates": "fast"},
+    {"rates": {"nope": 1}},
+    {"rates": {"margin_rate": "x"}},
+    {"exchange_rate": "abc"},
+    {"items": "x"},
+    {"items": [1]},
+    {"rfq_ids": "1,2"},
+    {"rfq_ids": [1, None]},
+    {"rfq_ids": [True]},
+])
+def test_bad_requests(body):
+    with pytest.raises((TypeError, ValueError)):
+        parse_request(body)
+
+
+def test_bad_requests_are_400(fake, client):
+    admin = client("admin")
+    for body in ({"rates": [1]}, {"items": [1]}, {"rfq_ids": "7"}, [1]):
+        response = admin.post("/api/price-items", json=body)
+        assert response.status_code == 400, body
+    assert client("sales").post("/api/price-items", json={"items": []}).status_code == 403
+
+
+def test_request_items(loaded):
+    lines = loaded.children("Part_details", "rfq_id")
+    items = request_items(loaded, {"rfq_ids": [1, "2"]})
+    assert sorted(item["id"] for item in items) == sorted([*lines[1], *lines[2]])
+    bidding = [i for i, r in loaded.tables["RFQ-Tracker"].items() if r["RFQ_purpose"] == "Bidding"]
+    assert {item["rfq_id"] for item in request_items(loaded, {"open": True})} == set(bidding)
+    assert request_items(loaded, {"items": [{"source": "Local"}]}) == [{"source": "Local"}]
@@ -0,0 +1,66 @@
+import cProfile
+import pstats
+import pytest
+from src.profiling import ProfileStore, profile_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """The app's profile store, writing under tmp_path for this test."""
+    monkeypatch.setattr(profile_store, "directory", str(tmp_path))
+    return profile_store
+
+
+def test_admin_request_is_profiled(loaded, client, store):
+    admin = client("admin")
+    response = admin.get("/api/get-rfq/1", headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    [meta] = admin.get("/api/profiles").get_json()["data"]
+    assert meta["id"] == profile_id and meta["reason"] == "requested"
+    assert meta["route"] == "/api/get-rfq/<int:rfq_id>" and meta["status"] == 200
+    assert meta["user_id"] == admin.user_id
+
+    stats = pstats.Stats(store.prof_path(profile_id))
+    assert any(name == "get_rfq" for _, _, name in stats.stats)
+    text = admin.get(f"/api/profiles/{profile_id}?format=text&sort=tottime")
+    assert text.status_code == 200 and "function calls" in text.get_data(as_text=True)
+    download = admin.get(f"/api/profiles/{profile_id}")
+    assert download.status_code == 200 and download.mimetype == "application/octet-stream"
+
+
+def test_streamed_response_is_profiled_to_the_end(loaded, client, store):
+    response = client("admin").get("/api/export?format=csv&profile=1")
+    response.get_data()
+    response.close()
+    profile_id = response.headers["X-Profile-Id"]
+    stats = pstats.Stats(store.prof_path(profile_id))
+    # The rows are produced while the body streams, after the handler returned
+    assert any(name == "iter_export_rows" for _, _, name in stats.stats)
+
+
+def test_only_admins_can_request_a_profile(loaded, client, store):
+    sales = client("sales")
+    response = sales.get("/api/get-rfq/1", headers={"X-Profile": "1"})
+    assert response.status_code == 200 and "X-Profile-Id" not in response.headers
+    assert store.list() == []
+    assert sales.get("/api/profiles").status_code == 403
+
+
+def test_profile_lookups(fake, client, store):
+    admin = client("admin")
+    assert admin.get("/api/profiles/0123456789ab").status_code == 404
+    assert admin.get("/api/profiles/not-an-id").status_code == 400
+    assert admin.get("/api/profiles/0123456789ab?format=text&sort=name").status_code == 400
+
+
+def test_store_keeps_the_newest(tmp_path):
+    store = ProfileStore(str(tmp_path), keep=2)
+    for n in range(4):
+        profiler = cProfile.Profile()
+        store.save(profiler, {"id": f"{n:012x}", "at": f"2026-01-0{n + 1}T00:00:00+00:00"})
+    assert [meta["id"] for meta in store.list()] == ["000000000003", "000000000002"]
+    assert store.prof_path("000000000000") is None
+    with pytest.raises(ValueError):
+        store.prof_path("../../etc/passwd")
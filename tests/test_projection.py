@@ -0,0 +1,48 @@
+import pytest
+from src.projection import (build_select, parse_fields, project_rows, visible_part_columns, SENSITIVE_PART_FIELDS,
+                            PART_COLUMNS)
+
+
+def test_pricing_columns_only_for_privileged_roles():
+    for role in ("admin", "pricing"):
+        assert visible_part_columns(role) == PART_COLUMNS
+        assert build_select(role) == "*, Part_details(*)"
+    for role in ("sales", "user", None):
+        assert not set(visible_part_columns(role)) & set(SENSITIVE_PART_FIELDS)
+        select = build_select(role)
+        assert '"Unit$"' not in select and "Margin" not in select and '"RFQ-part-no"' in select
+
+
+def test_fields():
+    assert parse_fields("RFQ-no, Company_name,Part_details.RFQ-part-no,RFQ-no", "sales") == \
+        (["RFQ-no", "Company_name"], ["RFQ-part-no"])
+    assert parse_fields("Part_details", "sales")[1] == list(visible_part_columns("sales"))
+    assert build_select("sales", "Company_name", required=("id", "created_at")) == "created_at, id, Company_name"
+    with pytest.raises(PermissionError):
+        parse_fields("Part_details.Unit$", "sales")
+    with pytest.raises(ValueError):
+        parse_fields("Part_details.Nope", "admin")
+    with pytest.raises(ValueError):
+        parse_fields("password", "admin")
+
+
+def test_project_rows_matches_build_select(loaded):
+    full = loaded.table("RFQ-Tracker").select("*, Part_details(*)").order("id").limit(5).execute().data
+    for role, fields in (("sales", None), ("admin", None), ("sales", "RFQ-no,Part_details.Make"), ("admin", "Company_name")):
+        expected = loaded.table("RFQ-Tracker").select(build_select(role, fields)).order("id").limit(5).execute().data
+        assert project_rows(full, role, fields) == expected, (role, fields)
+
+
+def test_routes(loaded, client):
+    sales, admin = client("sales"), client("admin")
+    row = sales.get("/api/get-rfq/1").get_json()["data"]
+    assert row["Part_details"] and all("Unit$" not in p and "Margin" not in p for p in row["Part_details"])
+    assert "Unit$" in admin.get("/api/get-rfq/1").get_json()["data"]["Part_details"][0]
+
+    assert sales.get("/api/get-rfq/1?fields=Part_details.Unit$").status_code == 403
+    assert sales.get("/api/list-rfq-entry?fields=Part_details.Margin").status_code == 403
+    assert sales.get("/api/list-rfq-entry?fields=nope").status_code == 400
+    assert admin.get("/api/get-rfq/1?fields=Part_details.Unit$").status_code == 200
+
+    page = sales.get("/api/list-rfq-entry?limit=5&fields=RFQ-no").get_json()
+    assert all(set(r) == {"id", "created_at", "RFQ-no"} for r in page["data"])
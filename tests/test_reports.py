@@ -0,0 +1,59 @@
+from datetime import date, timezone
+from zoneinfo import ZoneInfo
+from index_checks import check_incremental, check_writes_before_first_build, check_writes_during_rebuild
+from src.reports import ReportRollups, local_day, report_zone
+
+IST = ZoneInfo("Asia/Kolkata")
+
+
+def state(index):
+    return index._records, index._day_keys, index._order, index._pending, index.summary()
+
+
+def test_incremental_matches_rebuild(loaded):
+    check_incremental(ReportRollups, state, loaded)
+
+
+def test_writes_before_the_first_build_are_ignored(loaded):
+    check_writes_before_first_build(ReportRollups, state, loaded)
+
+
+def test_writes_during_a_rebuild_survive_the_swap(loaded, monkeypatch):
+    check_writes_during_rebuild(ReportRollups, state, loaded, monkeypatch)
+
+
+def test_local_day():
+    assert local_day("2025-03-01T20:00:00+00:00", IST) == "2025-03-02"
+    assert local_day("2025-03-01T18:29:59.5+00:00", IST) == "2025-03-01"
+    assert local_day("2025-03-01T20:00:00", IST) == "2025-03-02"  # naive means UTC
+    assert local_day("2025-03-01T20:00:00+00:00", timezone.utc) == "2025-03-01"
+    assert local_day("", IST) == ""
+    assert report_zone("Not/AZone") is timezone.utc
+
+
+def test_days_follow_the_report_timezone(fake):
+    # 01:00 IST on 2 March is still 1 March in UTC
+    for created_at in ("2025-03-01T19:30:00+00:00", "2025-03-01T10:00:00+00:00", "2025-03-02T10:00:00+00:00"):
+        fake.add("RFQ-Tracker", {"created_at": created_at, "RFQ-no": "R", "Company_name": "Acme", "Customer_name": None,
+                                 "Sales_person": "kim", "RFQ_purpose": "Buying", "Tentative_date": None})
+    rollups = ReportRollups(ttl=3600, tz=IST)
+    rollups.rebuild(fake)
+
+    summary = rollups.summary(date_from="2025-03-02", date_to="2025-03-02", today=date(2025, 3, 2))
+    assert summary["totals"]["rfqs"] == 2
+    trend = rollups.summary(today=date(2025, 3, 2))["trend"]
+    assert trend[-2:] == [{"date": "2025-03-01", "count": 1}, {"date": "2025-03-02", "count": 2}]
+
+
+def test_summary_filters(loaded):
+    rollups = ReportRollups(ttl=3600)
+    rollups.rebuild(loaded)
+    rfqs = loaded.tables["RFQ-Tracker"].values()
+    everything = rollups.summary()
+    assert everything["totals"]["rfqs"] == len(rfqs)
+    assert everything["totals"]["items"] == len(loaded.tables["Part_details"])
+
+    kim = rollups.summary(sales_person="kim", purpose="Bidding")
+    assert kim["totals"]["rfqs"] == sum(1 for r in rfqs if r["Sales_person"] == "kim" and r["RFQ_purpose"] == "Bidding")
+    assert all(row["sales_person"] == "kim" for row in kim["recent"] + kim["pending"])
+    assert everything["sales_people"] == sorted({r["Sales_person"] for r in rfqs})
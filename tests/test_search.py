@@ -0,0 +1,57 @@
+import threading
+from index_checks import check_incremental, check_writes_before_first_build, check_writes_during_rebuild, edit
+from src.search import RFQSearchIndex
+
+
+def state(index):
+    return index._docs, {gram: ids for gram, ids in index._postings.items() if ids}
+
+
+def test_incremental_matches_rebuild(loaded):
+    check_incremental(RFQSearchIndex, state, loaded)
+
+
+def test_writes_before_the_first_build_are_ignored(loaded):
+    check_writes_before_first_build(RFQSearchIndex, state, loaded)
+
+
+def test_writes_during_a_rebuild_survive_the_swap(loaded, monkeypatch):
+    check_writes_during_rebuild(RFQSearchIndex, state, loaded, monkeypatch)
+
+
+def test_search_ranks_and_filters(loaded):
+    index = RFQSearchIndex(ttl=3600)
+    index.rebuild(loaded)
+    new_id = edit(loaded, index)
+    assert index.search("renamed corp") == (1, [1])
+    total, ids = index.search("new-part-1")
+    assert total == 2 and set(ids) == {2, new_id}
+    # Every term must match; short terms are checked without the trigram postings
+    assert index.search("renamed zz") == (0, [])
+    assert index.search("  ") == (0, [])
+    total, ids = index.search("rfq", limit=5, offset=5)
+    assert total >= 10 and len(ids) == 5
+    assert 5 not in index.search("rfq", limit=1000)[1]
+
+
+def test_stale_index_keeps_serving_during_a_rebuild(loaded, monkeypatch):
+    index = RFQSearchIndex(ttl=3600)
+    index.rebuild(loaded)
+    index.ttl = 0
+    started, release = threading.Event(), threading.Event()
+    load = index._load
+
+    def slow_load(supabase):
+        started.set()
+        release.wait(5)
+        return load(supabase)
+    monkeypatch.setattr(index, "_load", slow_load)
+
+    rebuilding = threading.Thread(target=index.ensure_fresh)
+    rebuilding.start()
+    assert started.wait(5)
+    # Answered from the old index while the reload is blocked
+    assert index.search("rfq", limit=1)[0] == 60
+    release.set()
+    rebuilding.join(5)
+    assert not rebuilding.is_alive()
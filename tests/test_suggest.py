@@ -0,0 +1,70 @@
+from index_checks import check_incremental, check_writes_before_first_build, check_writes_during_rebuild, saved_row
+from src.suggest import SuggestIndex
+
+
+def state(index):
+    fields = {field: (f.keys, f.counts, {k: +c for k, c in f.spellings.items()}) for field, f in index._fields.items()}
+    return fields, index._rfqs
+
+
+def add_rfq(fake, company, parts=()):
+    rfq_id = fake.add("RFQ-Tracker", {"RFQ-no": f"R-{company}", "Company_name": company, "Customer_name": None,
+                                      "Sales_person": "kim"})["id"]
+    for part_no, quoted_part_no in parts:
+        fake.add("Part_details", {"rfq_id": rfq_id, "RFQ-part-no": part_no, "Quoted-part-no": quoted_part_no,
+                                  "Supplier": None, "Make": None})
+    return rfq_id
+
+
+def test_incremental_matches_rebuild(loaded):
+    check_incremental(SuggestIndex, state, loaded)
+
+
+def test_writes_before_the_first_build_are_ignored(loaded):
+    check_writes_before_first_build(SuggestIndex, state, loaded)
+
+
+def test_writes_during_a_rebuild_survive_the_swap(loaded, monkeypatch):
+    check_writes_during_rebuild(SuggestIndex, state, loaded, monkeypatch)
+
+
+def test_ranked_by_use_in_the_usual_spelling(fake):
+    for company in ("Acme Components", "ACME  components", "Acme Components", "Acorn Ltd", "Acorn Ltd", "Acme Corp",
+                    "Beta"):
+        add_rfq(fake, company)
+    index = SuggestIndex(ttl=3600)
+    index.rebuild(fake)
+
+    assert index.suggest("company", "AC") == [("Acme Components", 3), ("Acorn Ltd", 2), ("Acme Corp", 1)]
+    assert index.suggest("company", "acme c", limit=1) == [("Acme Components", 3)]
+    assert index.suggest("company", "z") == []
+
+    # A save drops the memoised short prefixes
+    new_id = add_rfq(fake, "Acorn Ltd")
+    index.upsert(saved_row(fake, new_id))
+    add_rfq(fake, "acorn ltd")
+    assert index.suggest("company", "ac")[0] == ("Acme Components", 3)
+    index.upsert(saved_row(fake, new_id + 1))
+    assert index.suggest("company", "ac")[0] == ("Acorn Ltd", 4)
+    index.remove(new_id)
+    index.remove(new_id + 1)
+    assert index.suggest("company", "ac")[:2] == [("Acme Components", 3), ("Acorn Ltd", 2)]
+
+
+def test_part_quoted_as_itself_counts_once(fake):
+    add_rfq(fake, "Acme", [("LM358", "lm358"), ("LM358N", "LM358"), ("TL072", None)])
+    index = SuggestIndex(ttl=3600)
+    index.rebuild(fake)
+    assert index.suggest("part_no", "lm") == [("LM358", 2), ("LM358N", 1)]
+
+
+def test_suggest_route(fake, client, monkeypatch):
+    from src import api
+    index = SuggestIndex(ttl=3600)
+    monkeypatch.setattr(api, "suggest_index", index)
+    add_rfq(fake, "Acme Components")
+    sales = client("sales")
+    response = sales.get("/api/suggest?field=company&prefix=acm")
+    assert response.status_code == 200 and response.headers["Cache-Control"] == "private, max-age=30"
+    assert response.get_json()["data"] == [{"value": "Acme Components", "count": 1}]
+    assert sales.get("/api/suggest?field=email&prefix=a").status_code == 400